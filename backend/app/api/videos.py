@@ -19,7 +19,7 @@ from app.services.video_ingestion import (
     MAX_FILE_SIZE_MB
 )
 from app.core.database import get_collection, get_video_document_template
-from app.services.analysis.gemini_video_analyzer import GeminiVideoAnalyzer
+from app.services.analysis.gemini_video_analyzer import GeminiVideoAnalyzer, log_analysis_summary
 from app.models.video_analysis_models import VideoAnalysisResult
 
 
@@ -246,6 +246,7 @@ async def get_upload_info():
 
 @router.post("/analyze")
 async def analyze_video_sync(
+    background_tasks: BackgroundTasks,
     file: Optional[UploadFile] = File(None),
     url: Optional[str] = Form(None)
 ):
@@ -254,8 +255,8 @@ async def analyze_video_sync(
     
     1. Ingests video (Upload or Download)
     2. Runs Gemini Analysis immediately
-    3. Saves result to DB
-    4. Returns full JSON result
+    3. Returns full JSON result
+    4. Saves result to DB + logs summary (background, after response)
     """
     if not file and not url:
         raise HTTPException(status_code=400, detail="Must provide either 'file' or 'url'")
@@ -295,19 +296,14 @@ async def analyze_video_sync(
         analyzer = GeminiVideoAnalyzer()
         
         # Run blocking analysis in threadpool to avoid blocking event loop
-        analysis_result = await run_in_threadpool(analyzer.analyze_video, temp_path)
+        analysis_result = await run_in_threadpool(
+            analyzer.analyze_video, temp_path, log_summary=False
+        )
         
-        # 4. Update DB with Result
+        # 4. Persist + log off the critical path (runs after the response is sent)
         if analysis_result.get("success"):
-            update_data = {
-                "status": "analyzed",
-                "analysis": analysis_result["analysis"],
-                "title": analysis_result["analysis"]["general_info"]["title"],
-                "analyzed_at": datetime.utcnow(),
-                "updated_at": datetime.utcnow(),
-                "analysis_processing_time_ms": analysis_result.get("processing_time_ms")
-            }
-            await videos.update_one({"video_id": video_id}, {"$set": update_data})
+            background_tasks.add_task(_save_analysis_result, video_id, analysis_result)
+            background_tasks.add_task(log_analysis_summary, analysis_result)
             
             return {
                 "success": True,
@@ -387,6 +383,29 @@ async def analyze_video(video_id: str, background_tasks: BackgroundTasks):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _save_analysis_result(video_id: str, result: dict):
+    """Background task: persist a successful analysis result."""
+    from app.core.database import Database
+    
+    try:
+        videos = await Database.get_collection("videos")
+        await videos.update_one(
+            {"video_id": video_id},
+            {
+                "$set": {
+                    "status": "analyzed",
+                    "analysis": result["analysis"],
+                    "title": result["analysis"]["general_info"]["title"],
+                    "analyzed_at": datetime.utcnow(),
+                    "updated_at": datetime.utcnow(),
+                    "analysis_processing_time_ms": result.get("processing_time_ms")
+                }
+            }
+        )
+    except Exception as e:
+        print(f"❌ Failed to save analysis for video {video_id}: {e}")
+
+
 async def _run_analysis(video_id: str, video_path: str):
     """Background task to run video analysis."""
     from app.core.database import Database
@@ -0,0 +1,24 @@
+"""
+Async helpers dùng chung
+
+Usage:
+    from app.core.async_utils import run_sync
+
+    result = run_sync(some_coroutine())
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+
+def run_sync(coro):
+    """
+    Chạy coroutine từ code sync. Nếu thread hiện tại đã có event loop
+    (vd. gọi từ handler async), chạy trên thread riêng.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, coro).result()
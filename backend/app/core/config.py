@@ -56,11 +56,14 @@ class Config:
     TEMP_DIR = os.path.join(BASE_DIR, "temp")
     SCRAPER_DIR = os.path.join(BASE_DIR, "scraper_data")
     MODEL_DIR = os.path.join(BASE_DIR, "local_models")
+    CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(BASE_DIR, "cache"))
     
     # ============================================================
     # Services
     # ============================================================
     STT_API_URL = os.getenv("STT_API_URL", "http://localhost:8019/stt/simple")
+    STT_BATCH_API_URL = os.getenv("STT_BATCH_API_URL", "")  # Multi-file endpoint (empty = one request per chunk)
+    STT_IN_MEMORY_AUDIO = os.getenv("STT_IN_MEMORY_AUDIO", "true").lower() == "true"  # Short audio: ffmpeg pipe -> upload, no temp WAV
     
     # ============================================================
     # OCR Configuration (Tesseract)
@@ -68,6 +71,10 @@ class Config:
     OCR_ENABLED = os.getenv("OCR_ENABLED", "true").lower() == "true"
     OCR_LANG = os.getenv("OCR_LANG", "vie")
     OCR_MAX_FRAMES = int(os.getenv("OCR_MAX_FRAMES", "10"))
+    SCENE_CACHE_ENABLED = os.getenv("SCENE_CACHE_ENABLED", "false").lower() == "true"  # Reuse scenes + keyframes per video file (CACHE_DIR)
+    SCENE_CACHE_MAX_MB = int(os.getenv("SCENE_CACHE_MAX_MB", "500"))  # Disk bound, oldest entries evicted first
+    SCENE_CACHE_MAX_AGE_HOURS = int(os.getenv("SCENE_CACHE_MAX_AGE_HOURS", "168"))  # Entries unused this long are evicted
+    OCR_EDGE_PREFILTER = os.getenv("OCR_EDGE_PREFILTER", "true").lower() == "true"  # Skip frames with no edges in caption bands (needs opencv)
     TESSERACT_PATH = os.getenv("TESSERACT_PATH", r"C:\Program Files\Tesseract-OCR\tesseract.exe")
     
     # ============================================================
@@ -76,6 +83,9 @@ class Config:
     GEMINI_FILE_MAX_SIZE_GB = float(os.getenv("GEMINI_FILE_MAX_SIZE_GB", "2"))  # Max file size in GB
     GEMINI_PROCESSING_TIMEOUT = int(os.getenv("GEMINI_PROCESSING_TIMEOUT", "300"))  # Seconds to wait for processing
     GEMINI_UPLOAD_RETRY_COUNT = int(os.getenv("GEMINI_UPLOAD_RETRY_COUNT", "3"))  # Number of retries on upload failure
+    GEMINI_PROMPT_CACHE_ENABLED = os.getenv("GEMINI_PROMPT_CACHE_ENABLED", "true").lower() == "true"  # Context-cache the static prompt
+    GEMINI_PROMPT_CACHE_TTL = int(os.getenv("GEMINI_PROMPT_CACHE_TTL", "3600"))  # Seconds
+    GEMINI_MAX_CONCURRENT_REQUESTS = int(os.getenv("GEMINI_MAX_CONCURRENT_REQUESTS", "4"))  # Parallel generate_content calls
 
     @staticmethod
     def ensure_dirs():
@@ -0,0 +1,55 @@
+"""
+Logging Configuration
+
+Root logger ghi qua QueueHandler -> QueueListener (thread riêng) để việc
+format + ghi stderr không nằm trên request thread (vd. logger.exception
+khi bị quota storm).
+
+Usage:
+    from app.core.logging_config import setup_logging, shutdown_logging
+
+    setup_logging()      # startup
+    shutdown_logging()   # shutdown - flush queue
+"""
+
+import sys
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+LOG_FORMAT = "%(message)s"
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """Cấu hình root logger với QueueHandler (idempotent)."""
+    global _listener
+    
+    if _listener is not None:
+        return
+    
+    log_queue = queue.SimpleQueue()
+    
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+    
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Dừng listener, flush các record còn trong queue."""
+    global _listener
+    
+    if _listener is None:
+        return
+    
+    _listener.stop()
+    _listener = None
@@ -18,10 +18,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import Config
+from app.core.logging_config import setup_logging, shutdown_logging
 from app.core.database import Database, get_collection, get_video_document_template
 from app.api.videos import router as videos_router
 
 
+setup_logging()
+
+
 # ============================================================
 # LIFESPAN MANAGEMENT
 # ============================================================
@@ -36,6 +40,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     await Database.disconnect()
     print("👋 Shutdown complete")
+    shutdown_logging()
 
 
 # Initialize FastAPI app
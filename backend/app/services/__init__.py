@@ -1,4 +1,4 @@
 # Services Package - Business logic
-from .pipeline import process_tiktok
+from .pipeline import process_tiktok, process_tiktok_batch
 
-__all__ = ["process_tiktok"]
+__all__ = ["process_tiktok", "process_tiktok_batch"]
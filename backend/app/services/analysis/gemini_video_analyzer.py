@@ -17,6 +17,8 @@ import sys
 import time
 import json
 import re
+import logging
+import threading
 from typing import Dict, Optional
 from datetime import datetime
 
@@ -29,22 +31,50 @@ from app.core.config import Config
 from app.models.video_analysis_models import VideoAnalysisResult
 from app.services.ingest.gemini_uploader import GeminiFileUploader, GeminiUploadError
 
-# Import Google GenAI SDK
-try:
-    from google import genai
-    from google.genai import types
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
-    print("⚠️ [GEMINI_ANALYZER] google-genai SDK not installed")
+# google.genai + langchain_core nặng -> import lazy trong GeminiVideoAnalyzer.__init__
+# để các worker chỉ dùng models/merger không phải trả chi phí import.
+_LAZY_CACHE: Dict[str, object] = {}
+
 
-# Import LangChain for JsonOutputParser
+def _load_lazy_deps() -> Dict[str, object]:
+    """
+    Import google-genai SDK và LangChain JsonOutputParser (một lần).
+    
+    Raises:
+        ImportError: Nếu thiếu package
+    """
+    if not _LAZY_CACHE:
+        try:
+            from google import genai
+            from google.genai import types
+            from google.genai import errors as genai_errors
+        except ImportError:
+            raise ImportError("google-genai SDK not installed. Run: pip install google-genai")
+        
+        try:
+            from langchain_core.output_parsers import JsonOutputParser
+        except ImportError:
+            raise ImportError("langchain not installed. Run: pip install langchain langchain-core")
+        
+        _LAZY_CACHE.update(
+            genai=genai,
+            types=types,
+            errors=genai_errors,
+            JsonOutputParser=JsonOutputParser
+        )
+    return _LAZY_CACHE
+
+
+# Import tenacity for retrying transient Gemini errors
 try:
-    from langchain_core.output_parsers import JsonOutputParser
-    LANGCHAIN_AVAILABLE = True
+    from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+    TENACITY_AVAILABLE = True
 except ImportError:
-    LANGCHAIN_AVAILABLE = False
-    print("⚠️ [GEMINI_ANALYZER] langchain not installed")
+    TENACITY_AVAILABLE = False
+    print("⚠️ [GEMINI_ANALYZER] tenacity not installed - generate_content will not be retried")
+
+
+logger = logging.getLogger(__name__)
 
 
 # ============================================================
@@ -104,6 +134,50 @@ Chia video thành các đoạn/scene rõ ràng. Với MỖI ĐOẠN, xác địn
 Chỉ trả về JSON, không có text giải thích thêm trước hoặc sau JSON."""
 
 
+# ============================================================
+# PROMPT CONTEXT CACHE
+# ============================================================
+# Prompt (system instruction + format instructions) là static, nên được
+# đăng ký 1 lần làm Gemini cached content và dùng lại cho mọi request,
+# thay vì gửi lại + bị tính token mỗi lần. Dùng chung giữa các instance
+# vì API layer tạo analyzer mới cho mỗi request. {model_name: (cache_name, expires_at)}
+_PROMPT_CACHES: Dict[str, tuple] = {}
+_PROMPT_CACHE_LOCK = threading.Lock()
+_PROMPT_CACHE_EXPIRY_MARGIN_SECONDS = 60
+# Sau khi tạo cache thất bại: (None, expires_at) cho model đó -> mọi analyzer
+# gửi prompt inline, không gọi caches.create lại cho tới khi hết hạn
+_PROMPT_CACHE_FAILURE_TTL_SECONDS = 600
+
+
+# ============================================================
+# GENERATE RETRY / CONCURRENCY
+# ============================================================
+
+GENERATE_RETRY_ATTEMPTS = 4
+GENERATE_RETRY_MULTIPLIER = 0.5
+GENERATE_RETRY_MAX_WAIT_SECONDS = 8
+
+# Giới hạn số generate_content chạy song song trong process để retry
+# khi bị 429 không làm tăng thêm tải lên quota
+_GENERATE_SEMAPHORE = threading.BoundedSemaphore(Config.GEMINI_MAX_CONCURRENT_REQUESTS)
+
+
+def _is_transient_gemini_error(exc: BaseException) -> bool:
+    """5xx hoặc 429 (rate limit / quota) - đáng retry."""
+    genai_errors = _LAZY_CACHE["errors"]
+    if isinstance(exc, genai_errors.ServerError):
+        return True
+    return isinstance(exc, genai_errors.ClientError) and getattr(exc, "code", None) == 429
+
+
+def _log_generate_retry(retry_state) -> None:
+    logger.warning(
+        "🔁 [GEMINI_ANALYZER] Transient error, retry %d/%d: %s",
+        retry_state.attempt_number, GENERATE_RETRY_ATTEMPTS - 1,
+        retry_state.outcome.exception()
+    )
+
+
 # ============================================================
 # GEMINI VIDEO ANALYZER
 # ============================================================
@@ -128,11 +202,8 @@ class GeminiVideoAnalyzer:
             api_key: Optional API key. Lấy từ Config nếu không cung cấp.
             model_name: Gemini model để sử dụng
         """
-        if not GENAI_AVAILABLE:
-            raise ImportError("google-genai SDK not installed. Run: pip install google-genai")
-        
-        if not LANGCHAIN_AVAILABLE:
-            raise ImportError("langchain not installed. Run: pip install langchain langchain-core")
+        deps = _load_lazy_deps()
+        self._types = deps["types"]
         
         self.api_key = api_key or Config.GEMINI_API_KEY
         
@@ -140,31 +211,39 @@ class GeminiVideoAnalyzer:
         if not self.api_key:
             try:
                 from dotenv import load_dotenv
-                print("⚠️ [GEMINI_ANALYZER] API Key not found in Config, attempting manual .env load...")
+                logger.warning("⚠️ [GEMINI_ANALYZER] API Key not found in Config, attempting manual .env load...")
                 load_dotenv(override=True)
                 self.api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
             except Exception as e:
-                print(f"❌ [GEMINI_ANALYZER] Fallback load failed: {e}")
+                logger.error("❌ [GEMINI_ANALYZER] Fallback load failed: %s", e)
 
         if not self.api_key:
             raise ValueError("Missing GEMINI_API_KEY. Set it in .env file.")
         
         self.model_name = model_name
-        self.client = genai.Client(api_key=self.api_key)
+        self.client = deps["genai"].Client(api_key=self.api_key)
         self.uploader = GeminiFileUploader(api_key=self.api_key)
         
         # Initialize JSON parser with Pydantic schema
-        self.json_parser = JsonOutputParser(pydantic_object=VideoAnalysisResult)
+        self.json_parser = deps["JsonOutputParser"](pydantic_object=VideoAnalysisResult)
+        
+        # Prompt is static - render once instead of per call
+        self.prompt = ANALYSIS_PROMPT_TEMPLATE.format(
+            format_instructions=self.json_parser.get_format_instructions()
+        )
+        self.prompt_cache_enabled = Config.GEMINI_PROMPT_CACHE_ENABLED
         
-        print(f"✅ [GEMINI_ANALYZER] Initialized with model: {model_name}")
+        logger.info("✅ [GEMINI_ANALYZER] Initialized with model: %s", model_name)
     
-    def analyze_video(self, video_path: str, cleanup_after: bool = True) -> Dict:
+    def analyze_video(self, video_path: str, cleanup_after: bool = True, log_summary: bool = True) -> Dict:
         """
         Phân tích video và trả về structured result.
         
         Args:
             video_path: Đường dẫn file video local
             cleanup_after: Xóa file khỏi Gemini sau khi phân tích xong
+            log_summary: Log summary ngay khi xong. Đặt False nếu caller tự
+                schedule log_analysis_summary() (vd. FastAPI BackgroundTasks)
         
         Returns:
             {
@@ -175,89 +254,84 @@ class GeminiVideoAnalyzer:
                 "error": str (nếu thất bại)
             }
         """
-        start_time = time.time()
+        start_ns = time.perf_counter_ns()
         
-        print(f"\n{'='*60}")
-        print(f"🎬 [GEMINI_ANALYZER] Starting Video Analysis")
-        print(f"{'='*60}")
-        print(f"   Video: {os.path.basename(video_path)}")
-        print(f"   Model: {self.model_name}")
+        logger.info(
+            "🎬 [GEMINI_ANALYZER] Starting video analysis: %s (model: %s)",
+            os.path.basename(video_path), self.model_name
+        )
         
         file_name = None
         
         try:
             # Step 1: Upload video to Gemini
-            print(f"\n📤 Step 1: Uploading video to Gemini...")
-            upload_result = self.uploader.upload_video(video_path)
+            logger.debug("📤 Step 1: Uploading video to Gemini...")
+            # Dedup chỉ có ý nghĩa khi file được giữ lại trên Gemini: file sắp bị
+            # xóa thì không dùng chung với request khác (và không tốn công hash)
+            upload_result = self.uploader.upload_video(video_path, use_cache=not cleanup_after)
             
             if not upload_result.get("success"):
                 raise GeminiUploadError(f"Upload failed: {upload_result.get('error')}")
             
             file_uri = upload_result["file_uri"]
             file_name = upload_result["file_name"]
-            print(f"   ✅ Uploaded: {file_uri}")
+            logger.debug("   ✅ Uploaded: %s", file_uri)
             
-            # Step 2: Build prompt with format instructions
-            print(f"\n📝 Step 2: Building analysis prompt...")
-            format_instructions = self.json_parser.get_format_instructions()
-            prompt = ANALYSIS_PROMPT_TEMPLATE.format(format_instructions=format_instructions)
+            # Step 2: Resolve prompt (cached content if available)
+            logger.debug("📝 Step 2: Resolving analysis prompt...")
+            cache_name = self._get_prompt_cache()
             
             # Step 3: Call Gemini with video + prompt
-            print(f"\n🤖 Step 3: Calling Gemini for analysis...")
+            logger.debug("🤖 Step 3: Calling Gemini for analysis...")
             
-            # Create file reference for the uploaded video
-            video_file = self.client.files.get(name=file_name)
+            # Upload result already carries uri + mime_type, no files.get round-trip
+            parts = [
+                self._types.Part.from_uri(
+                    file_uri=file_uri,
+                    mime_type=upload_result["mime_type"]
+                )
+            ]
+            if cache_name:
+                # System instruction + prompt đã nằm trong cached content
+                config = self._types.GenerateContentConfig(
+                    temperature=0.2,
+                    max_output_tokens=8192,
+                    cached_content=cache_name
+                )
+            else:
+                parts.append(self._types.Part.from_text(text=self.prompt))
+                config = self._types.GenerateContentConfig(
+                    temperature=0.2,
+                    max_output_tokens=8192,
+                    system_instruction=SYSTEM_INSTRUCTION
+                )
             
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=[
-                    types.Content(
-                        role="user",
-                        parts=[
-                            types.Part.from_uri(
-                                file_uri=video_file.uri,
-                                mime_type=video_file.mime_type
-                            ),
-                            types.Part.from_text(text=prompt)
-                        ]
-                    )
-                ],
-                    config=types.GenerateContentConfig(
-                        temperature=0.2,
-                        max_output_tokens=8192,
-                        system_instruction=SYSTEM_INSTRUCTION
-                    )
+            # Retry chỉ bao generate_content - file đã upload được dùng lại qua các lần thử
+            response = self._generate_with_retry(
+                contents=[self._types.Content(role="user", parts=parts)],
+                config=config
             )
             
             # Step 4: Parse response
-            print(f"\n📊 Step 4: Parsing response...")
+            logger.debug("📊 Step 4: Parsing response...")
             response_text = response.text
             
             # Try to extract JSON from response
             analysis_dict = self._extract_json(response_text)
             
-            # Validate with Pydantic
-            analysis = VideoAnalysisResult.model_validate(analysis_dict)
+            # Validate / construct result
+            analysis_dict = self._build_analysis(analysis_dict)
             
             # Calculate time range seconds if missing
-            analysis_dict = self._enrich_time_data(analysis.model_dump())
-            
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            analysis_dict = self._enrich_time_data(analysis_dict)
             
-            print(f"\n{'='*60}")
-            print(f"✅ [GEMINI_ANALYZER] Analysis Complete!")
-            print(f"{'='*60}")
-            print(f"   Title: {analysis_dict['general_info']['title']}")
-            print(f"   Category: {analysis_dict['general_info']['category']}")
-            print(f"   Viral Score: {analysis_dict['virality_factors']['score']}/10")
-            print(f"   Segments: {len(analysis_dict['script_breakdown'])}")
-            print(f"   Time: {processing_time_ms}ms")
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             # Cleanup
             if cleanup_after and file_name:
                 self.uploader.delete_file(file_name)
             
-            return {
+            result = {
                 "success": True,
                 "analysis": analysis_dict,
                 "file_uri": file_uri,
@@ -265,25 +339,109 @@ class GeminiVideoAnalyzer:
                 "analyzed_at": datetime.now().isoformat()
             }
             
+            if log_summary:
+                log_analysis_summary(result)
+            
+            return result
+            
         except Exception as e:
-            import traceback
-            print(f"\n❌ [GEMINI_ANALYZER] Error: {e}")
-            traceback.print_exc()
+            logger.exception(
+                "❌ [GEMINI_ANALYZER] Gemini analysis failed: %s", e,
+                extra={"model": self.model_name}
+            )
             
-            # Try cleanup on error
+            # Cleanup on error - fire-and-forget, không chặn error response
             if cleanup_after and file_name:
-                try:
-                    self.uploader.delete_file(file_name)
-                except:
-                    pass
+                threading.Thread(
+                    target=self._delete_file_quietly,
+                    args=(file_name,),
+                    daemon=True
+                ).start()
             
             return {
                 "success": False,
                 "error": str(e),
                 "error_type": type(e).__name__,
-                "processing_time_ms": int((time.time() - start_time) * 1000)
+                "processing_time_ms": (time.perf_counter_ns() - start_ns) // 1_000_000
             }
     
+    def _delete_file_quietly(self, file_name: str) -> None:
+        """Xóa file trên Gemini, log lỗi thay vì raise (chạy ở background thread)."""
+        try:
+            self.uploader.delete_file(file_name)
+        except Exception as e:
+            logger.warning("⚠️ [GEMINI_ANALYZER] Cleanup of %s failed: %s", file_name, e)
+    
+    def _generate_content(self, contents, config):
+        with _GENERATE_SEMAPHORE:
+            return self.client.models.generate_content(
+                model=self.model_name,
+                contents=contents,
+                config=config
+            )
+    
+    def _generate_with_retry(self, contents, config):
+        """
+        Gọi generate_content, retry với exponential backoff + jitter khi gặp
+        lỗi tạm thời (5xx, 429). Lỗi khác (4xx, parse...) raise ngay.
+        """
+        if not TENACITY_AVAILABLE:
+            return self._generate_content(contents, config)
+        
+        retryer = Retrying(
+            retry=retry_if_exception(_is_transient_gemini_error),
+            wait=wait_random_exponential(
+                multiplier=GENERATE_RETRY_MULTIPLIER,
+                max=GENERATE_RETRY_MAX_WAIT_SECONDS
+            ),
+            stop=stop_after_attempt(GENERATE_RETRY_ATTEMPTS),
+            before_sleep=_log_generate_retry,
+            reraise=True
+        )
+        return retryer(self._generate_content, contents, config)
+    
+    def _get_prompt_cache(self) -> Optional[str]:
+        """
+        Lấy (hoặc tạo) Gemini cached content chứa system instruction + prompt.
+        
+        Returns:
+            Cache name, hoặc None nếu caching bị tắt / không khả dụng
+            (vd. prompt dưới minimum token count của model) -> gửi prompt inline.
+        """
+        if not self.prompt_cache_enabled:
+            return None
+        
+        with _PROMPT_CACHE_LOCK:
+            cached = _PROMPT_CACHES.get(self.model_name)
+            if cached and time.time() < cached[1]:
+                # cached[0] None = negative entry (cache không khả dụng)
+                return cached[0]
+            
+            ttl = Config.GEMINI_PROMPT_CACHE_TTL
+            try:
+                cache = self.client.caches.create(
+                    model=self.model_name,
+                    config=self._types.CreateCachedContentConfig(
+                        system_instruction=SYSTEM_INSTRUCTION,
+                        contents=[
+                            self._types.Content(
+                                role="user",
+                                parts=[self._types.Part.from_text(text=self.prompt)]
+                            )
+                        ],
+                        ttl=f"{ttl}s"
+                    )
+                )
+            except Exception as e:
+                logger.warning("⚠️ [GEMINI_ANALYZER] Prompt cache unavailable, sending prompt inline: %s", e)
+                _PROMPT_CACHES[self.model_name] = (None, time.time() + _PROMPT_CACHE_FAILURE_TTL_SECONDS)
+                return None
+            
+            expires_at = time.time() + ttl - _PROMPT_CACHE_EXPIRY_MARGIN_SECONDS
+            _PROMPT_CACHES[self.model_name] = (cache.name, expires_at)
+            logger.info("🗃️ [GEMINI_ANALYZER] Prompt cached: %s (ttl %ss)", cache.name, ttl)
+            return cache.name
+    
     def _extract_json(self, text: str) -> Dict:
         """
         Extract JSON from response text.
@@ -313,6 +471,16 @@ class GeminiVideoAnalyzer:
         
         raise ValueError(f"Could not extract valid JSON from response: {text[:500]}...")
     
+    def _build_analysis(self, analysis_dict: Dict) -> Dict:
+        """
+        Chuyển JSON từ Gemini thành analysis dict.
+        
+        Luôn full Pydantic validation: model_construct bỏ qua validate nên
+        section lồng nhau (ScriptSegment, ...) sai kiểu / thiếu field sẽ lọt
+        vào output và lỗi ở phía sau (_enrich_time_data, DB, API).
+        """
+        return VideoAnalysisResult.model_validate(analysis_dict).model_dump()
+    
     def _enrich_time_data(self, analysis_dict: Dict) -> Dict:
         """
         Enrich script_breakdown with start_seconds and end_seconds if missing.
@@ -343,8 +511,43 @@ class GeminiVideoAnalyzer:
         """
         Get the full analysis prompt (for debugging/testing).
         """
-        format_instructions = self.json_parser.get_format_instructions()
-        return ANALYSIS_PROMPT_TEMPLATE.format(format_instructions=format_instructions)
+        return self.prompt
+
+
+# ============================================================
+# SUMMARY LOGGING
+# ============================================================
+
+def log_analysis_summary(result: Dict) -> None:
+    """
+    Log summary của một lần phân tích thành công.
+    
+    Tách khỏi analyze_video() để API layer có thể chạy sau khi đã trả
+    response (FastAPI BackgroundTasks), không nằm trên critical path.
+    """
+    if not result.get("success") or not logger.isEnabledFor(logging.INFO):
+        return
+    
+    analysis = result["analysis"]
+    general_info = analysis.get("general_info", {})
+    viral_score = analysis.get("virality_factors", {}).get("score")
+    segment_count = len(analysis.get("script_breakdown", []))
+    
+    logger.info(
+        "✅ [GEMINI_ANALYZER] Analysis complete: %s | %s | viral %s/10 | %d segments | %sms",
+        general_info.get("title"),
+        general_info.get("category"),
+        viral_score,
+        segment_count,
+        result.get("processing_time_ms"),
+        extra={
+            "analysis_title": general_info.get("title"),
+            "analysis_category": general_info.get("category"),
+            "viral_score": viral_score,
+            "segment_count": segment_count,
+            "processing_time_ms": result.get("processing_time_ms"),
+        }
+    )
 
 
 # ============================================================
@@ -8,36 +8,185 @@ Features:
 - Combine text sources
 """
 
+from dataclasses import dataclass
 from typing import List, Dict, Optional
 
+import numpy as np
 
-def align_stt_to_scenes(stt_segments: List[Dict], scenes: List[Dict]) -> Dict[int, List[Dict]]:
+
+@dataclass
+class SceneMerge:
+    """Merged STT + OCR data của một scene (slotted - gọn hơn dict)."""
+    __slots__ = (
+        "scene_id", "start_time", "end_time", "duration",
+        "stt_text", "stt_starts", "stt_ends", "stt_texts", "ocr_text", "ocr_items",
+        "combined_text", "has_speech", "has_text",
+    )
+    
+    scene_id: int
+    start_time: float
+    end_time: float
+    duration: float
+    stt_text: str
+    stt_starts: np.ndarray  # float32
+    stt_ends: np.ndarray    # float32
+    stt_texts: List[str]
+    ocr_text: str
+    ocr_items: List[Dict]
+    combined_text: str
+    has_speech: bool
+    has_text: bool
+    
+    def to_dict(self) -> Dict:
+        """
+        Shallow dict (không deep-copy như dataclasses.asdict).
+        
+        stt_starts/stt_ends -> list[float] để output JSON/BSON-serializable
+        (FastAPI, MongoDB); mảng numpy chỉ dùng nội bộ.
+        """
+        data = {name: getattr(self, name) for name in self.__slots__}
+        # float32 -> float64 + làm tròn ms (tránh 2.299999952 trong JSON)
+        data["stt_starts"] = np.round(self.stt_starts.astype(np.float64), 3).tolist()
+        data["stt_ends"] = np.round(self.stt_ends.astype(np.float64), 3).tolist()
+        return data
+
+
+def _scene_bounds(scenes: List[Dict]):
+    """Scene start/end arrays (scenes sorted by start_time, non-overlapping)."""
+    starts = np.fromiter((sc["start_time"] for sc in scenes), dtype=np.float64, count=len(scenes))
+    ends = np.fromiter((sc["end_time"] for sc in scenes), dtype=np.float64, count=len(scenes))
+    return starts, ends
+
+
+def _assign_segments_to_scenes(seg_starts: np.ndarray, seg_ends: np.ndarray, scenes: List[Dict]) -> np.ndarray:
+    """
+    Index (trong `scenes`) của scene chứa midpoint mỗi segment, -1 nếu không có.
+    
+    Segment thuộc scene chứa midpoint của nó (start_time <= mid < end_time).
+    Scenes phải được sắp xếp theo start_time (như output của scene detector);
+    lookup bằng np.searchsorted -> O((N+M) log M) thay vì O(N*M).
+    """
+    mids = (seg_starts + seg_ends) * 0.5
+    starts, ends = _scene_bounds(scenes)
+    
+    # Last scene whose start <= mid, then check mid < its end
+    idx = np.searchsorted(starts, mids, side="right") - 1
+    matched = (idx >= 0) & (mids < ends[np.maximum(idx, 0)])
+    return np.where(matched, idx, -1)
+
+
+def _segment_scene_pairs(seg_starts: np.ndarray, seg_ends: np.ndarray, scenes: List[Dict], mode: str = "midpoint"):
+    """
+    (segment index, scene index) pairs, sorted by segment index.
+    
+    mode:
+        "midpoint": mỗi segment thuộc đúng 1 scene (chứa midpoint)
+        "overlap":  segment thuộc mọi scene nó giao (start_time < seg_end và
+                    end_time > seg_start) -> segment vắt qua ranh giới scene
+                    xuất hiện ở cả 2 scene. Range tìm bằng searchsorted trên
+                    ends/starts; segment không giao scene nào (vd. độ dài 0
+                    đúng tại ranh giới) dùng lại midpoint.
+    """
+    assigned = _assign_segments_to_scenes(seg_starts, seg_ends, scenes)
+    
+    if mode == "midpoint":
+        seg_idx = np.flatnonzero(assigned >= 0)
+        return seg_idx, assigned[seg_idx]
+    
+    if mode != "overlap":
+        raise ValueError(f"Unknown STT assignment mode: {mode}")
+    
+    starts, ends = _scene_bounds(scenes)
+    first = np.searchsorted(ends, seg_starts, side="right")      # first scene ending after seg start
+    last = np.searchsorted(starts, seg_ends, side="left") - 1    # last scene starting before seg end
+    counts = np.maximum(last - first + 1, 0)
+    
+    # Fallback to midpoint scene when the overlap range is empty
+    fallback = (counts == 0) & (assigned >= 0)
+    first = np.where(fallback, assigned, first)
+    counts = np.where(fallback, 1, counts)
+    
+    seg_idx = np.repeat(np.arange(len(seg_starts)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    scene_idx = np.repeat(first, counts) + offsets
+    return seg_idx, scene_idx
+
+
+def _segment_arrays(stt_segments: List[Dict]):
+    """List[Dict] segments -> (starts, ends) float64 arrays."""
+    n = len(stt_segments)
+    seg_starts = np.fromiter((s.get("start", 0) for s in stt_segments), dtype=np.float64, count=n)
+    seg_ends = np.fromiter((s.get("end", s.get("start", 0)) for s in stt_segments), dtype=np.float64, count=n)
+    return seg_starts, seg_ends
+
+
+def align_stt_to_scenes(
+    stt_segments: List[Dict],
+    scenes: List[Dict],
+    mode: str = "midpoint"
+) -> Dict[int, List[Dict]]:
     """
     Map STT segments to scenes based on timestamp overlap.
     
+    mode: "midpoint" (default) hoặc "overlap" - xem _segment_scene_pairs()
+    
     Returns: {scene_id: [segment, segment, ...]}
     """
     scene_stt = {scene["scene_id"]: [] for scene in scenes}
     
-    for segment in stt_segments:
-        seg_start = segment.get("start", 0)
-        seg_end = segment.get("end", seg_start)
-        seg_mid = (seg_start + seg_end) / 2
-        
-        # Find which scene this segment belongs to
-        for scene in scenes:
-            if scene["start_time"] <= seg_mid < scene["end_time"]:
-                scene_stt[scene["scene_id"]].append(segment)
-                break
+    if not stt_segments or not scenes:
+        return scene_stt
+    
+    seg_starts, seg_ends = _segment_arrays(stt_segments)
+    seg_idx, scene_idx = _segment_scene_pairs(seg_starts, seg_ends, scenes, mode)
+    
+    scene_ids = [scene["scene_id"] for scene in scenes]
+    for i, j in zip(seg_idx.tolist(), scene_idx.tolist()):
+        scene_stt[scene_ids[j]].append(stt_segments[i])
     
     return scene_stt
 
 
+def split_stt_by_scene(
+    stt_segments: List[Dict],
+    scenes: List[Dict],
+    mode: str = "midpoint"
+) -> List[tuple]:
+    """
+    Như align_stt_to_scenes nhưng trả về dạng Struct-of-Arrays theo từng scene
+    (cùng thứ tự với `scenes`): [(starts float32, ends float32, texts), ...].
+    
+    Tránh giữ 1 dict cho mỗi segment trong multimodal_data.
+    """
+    empty = np.empty(0, dtype=np.float32)
+    if not stt_segments or not scenes:
+        return [(empty, empty, []) for _ in scenes]
+    
+    seg_starts, seg_ends = _segment_arrays(stt_segments)
+    seg_idx, scene_idx = _segment_scene_pairs(seg_starts, seg_ends, scenes, mode)
+    texts = [s.get("text", "") for s in stt_segments]
+    
+    # Group segment indices by scene (stable -> giữ thứ tự segment)
+    order = np.argsort(scene_idx, kind="stable")
+    bounds = np.searchsorted(scene_idx[order], np.arange(len(scenes) + 1), side="left")
+    grouped = seg_idx[order]
+    starts32 = seg_starts.astype(np.float32)
+    ends32 = seg_ends.astype(np.float32)
+    
+    per_scene = []
+    for i in range(len(scenes)):
+        sel = grouped[bounds[i]:bounds[i + 1]]
+        per_scene.append((starts32[sel], ends32[sel], [texts[j] for j in sel.tolist()]))
+    
+    return per_scene
+
+
 def merge_multimodal_data(
     stt_result: Dict,
     ocr_result: Dict,
     scenes: List[Dict],
-    metadata: Dict = None
+    metadata: Dict = None,
+    stt_assign: str = "midpoint"
 ) -> Dict:
     """
     Merge STT and OCR data aligned by timeline/scene.
@@ -47,6 +196,7 @@ def merge_multimodal_data(
         ocr_result: Output from ocr_processor_v2.process_video_ocr_v2()
         scenes: List of scenes from scene_detector
         metadata: Additional video metadata
+        stt_assign: "midpoint" hoặc "overlap" (segment vắt qua nhiều scene)
     
     Returns:
     {
@@ -56,7 +206,9 @@ def merge_multimodal_data(
                 "start_time": 0.0,
                 "end_time": 5.2,
                 "stt_text": "Xin chào các bạn...",
-                "stt_segments": [...],
+                "stt_starts": [0.0, ...],
+                "stt_ends": [2.5, ...],
+                "stt_texts": [...],
                 "ocr_text": "Bước 1: Chuẩn bị",
                 "ocr_items": [...],
                 "combined_text": "..."
@@ -73,12 +225,14 @@ def merge_multimodal_data(
     
     print("   🔗 [MERGE] Aligning multimodal data...")
     
-    # Get STT segments and map to scenes
+    # Get STT segments and map to scenes (SoA per scene)
     stt_segments = stt_result.get("segments", [])
-    scene_stt = align_stt_to_scenes(stt_segments, scenes)
+    scene_stt = split_stt_by_scene(stt_segments, scenes, stt_assign)
     
     # Get OCR by scene
-    ocr_by_scene_list = ocr_result.get("ocr_by_scene", [])
+    ocr_by_scene = ocr_result.get("ocr_by_scene", [])
+    # Columnar OcrByScene -> per-keyframe dicts (list-of-dicts also accepted)
+    ocr_by_scene_list = ocr_by_scene.rows() if hasattr(ocr_by_scene, "rows") else ocr_by_scene
     
     # Group OCR items by scene_id
     scene_ocr = {}
@@ -89,15 +243,14 @@ def merge_multimodal_data(
         scene_ocr[sid].append(item)
     
     # Build merged data
-    multimodal_data = []
+    scenes_merged: List[SceneMerge] = []
     all_combined_texts = []
     
-    for scene in scenes:
+    for scene, (stt_starts, stt_ends, stt_texts) in zip(scenes, scene_stt):
         scene_id = scene["scene_id"]
         
         # Get STT for this scene
-        stt_segs = scene_stt.get(scene_id, [])
-        stt_text = " ".join(seg.get("text", "") for seg in stt_segs).strip()
+        stt_text = " ".join(stt_texts).strip()
         
         # Get OCR for this scene
         ocr_items = scene_ocr.get(scene_id, [])
@@ -113,19 +266,21 @@ def merge_multimodal_data(
         
         combined_text = "\n".join(combined_parts)
         
-        multimodal_data.append({
-            "scene_id": scene_id,
-            "start_time": scene["start_time"],
-            "end_time": scene["end_time"],
-            "duration": scene.get("duration", scene["end_time"] - scene["start_time"]),
-            "stt_text": stt_text,
-            "stt_segments": stt_segs,
-            "ocr_text": ocr_text,
-            "ocr_items": ocr_items,
-            "combined_text": combined_text,
-            "has_speech": bool(stt_text),
-            "has_text": bool(ocr_text)
-        })
+        scenes_merged.append(SceneMerge(
+            scene_id=scene_id,
+            start_time=scene["start_time"],
+            end_time=scene["end_time"],
+            duration=scene.get("duration", scene["end_time"] - scene["start_time"]),
+            stt_text=stt_text,
+            stt_starts=stt_starts,
+            stt_ends=stt_ends,
+            stt_texts=stt_texts,
+            ocr_text=ocr_text,
+            ocr_items=ocr_items,
+            combined_text=combined_text,
+            has_speech=bool(stt_text),
+            has_text=bool(ocr_text)
+        ))
         
         if combined_text:
             all_combined_texts.append(combined_text)
@@ -145,16 +300,16 @@ def merge_multimodal_data(
     
     clean_combined = "\n\n".join(clean_combined_parts)
     
-    print(f"   ✅ [MERGE] Aligned {len(multimodal_data)} scenes")
+    print(f"   ✅ [MERGE] Aligned {len(scenes_merged)} scenes")
     
     return {
-        "multimodal_data": multimodal_data,
+        "multimodal_data": [m.to_dict() for m in scenes_merged],
         "combined_text": full_combined,
         "combined_text_clean": clean_combined,
         "timeline_aligned": True,
         "scene_count": len(scenes),
-        "scenes_with_speech": sum(1 for m in multimodal_data if m["has_speech"]),
-        "scenes_with_text": sum(1 for m in multimodal_data if m["has_text"])
+        "scenes_with_speech": sum(1 for m in scenes_merged if m.has_speech),
+        "scenes_with_text": sum(1 for m in scenes_merged if m.has_text)
     }
 
 
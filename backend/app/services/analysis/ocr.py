@@ -11,12 +11,25 @@ Features:
 
 import os
 import sys
+import threading
 import time
 import re
 import tempfile
 import shutil
+import atexit
+import subprocess
+import hashlib
+import functools
+from concurrent.futures import ProcessPoolExecutor
+from types import MappingProxyType
 from typing import List, Dict, Optional
 
+import numpy as np
+
+# Tesseract's OpenMP threading is slower than running several
+# single-threaded tesseract processes side by side (see _ocr_frames)
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
 try:
     from PIL import Image
 except ImportError:
@@ -27,6 +40,26 @@ try:
 except ImportError:
     pytesseract = None
 
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    import imagehash
+except ImportError:
+    imagehash = None
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 # Ensure backend is in path
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 if BACKEND_DIR not in sys.path:
@@ -41,21 +74,65 @@ from app.services.analysis.vision import get_scene_info, detect_scenes, extract_
 # ============================================================
 
 # Noise patterns to filter out
-NOISE_PATTERNS = [
+# Plain substrings (watermarks / music tags) - matched case-insensitively
+_LITERAL_NOISE = [
+    "tiktok",
+    "douyin",
+    "capcut",
+    "♬",
+    "original sound",
+    "âm thanh gốc",
+]
+
+# Structural patterns that need a real regex
+_REGEX_NOISE = [
     r"@\w+",           # @username
     r"#\w+",           # #hashtag
-    r"tiktok",
-    r"douyin", 
-    r"capcut",
-    r"♬",
-    r"original sound",
-    r"âm thanh gốc",
     r"^\d+:\d+$",      # 0:15
     r"^\d+[km]$",      # 100k, 1m
     r"^\d{1,2}/\d{1,2}$",  # 1/5
 ]
 
-NOISE_REGEX = [re.compile(p, re.IGNORECASE) for p in NOISE_PATTERNS]
+NOISE_PATTERNS = _REGEX_NOISE + [re.escape(p) for p in _LITERAL_NOISE]
+
+# Frames taller than this are downscaled before OCR (Tesseract time ~ pixel count)
+OCR_MAX_FRAME_HEIGHT = 960
+
+# Edge-density prefilter: caption bands (top 20% / bottom 25%) with almost
+# no edges -> frame very likely has no overlay text, skip tesseract
+EDGE_PREFILTER_TOP_BAND = 0.20
+EDGE_PREFILTER_BOTTOM_BAND = 0.25
+EDGE_PREFILTER_MIN_RATIO = 0.002   # one 16px caption line on a flat background ~ 0.0036
+
+# Tesseract file-list batching
+OCR_BATCH_MAX_FRAMES = 50
+OCR_BATCH_TIMEOUT_SECONDS = 120
+
+# OCR result cache (process lifetime): byte-identical keyframes are OCR'd
+# once. Near-identical frames (static text overlay over several scenes) are
+# only matched within the same video, never reused across videos.
+OCR_CACHE_MAX_ENTRIES = 1024
+PHASH_MAX_DISTANCE = 4          # Hamming distance for near-duplicate frames
+
+# Shared result for frames that could not be OCR'd (read-only: never mutated
+# by callers). Not picklable -> pool workers send dict(_EMPTY_FAIL) instead.
+_EMPTY_FAIL = MappingProxyType({"raw_text": "", "lines": (), "char_count": 0, "success": False})
+
+_OCR_CACHE: Dict[bytes, Dict] = {}      # blake2b(file bytes) -> result
+_OCR_CACHE_LOCK = threading.Lock()      # videos are OCR'd from several threads
+
+# Literals go through one Aho-Corasick pass (pyahocorasick, optional);
+# the regex then only carries the structural patterns.
+# Single alternation -> one regex search per line instead of one per pattern
+if ahocorasick is not None:
+    _NOISE_AUTOMATON = ahocorasick.Automaton()
+    for _p in _LITERAL_NOISE:
+        _NOISE_AUTOMATON.add_word(_p.lower(), _p)
+    _NOISE_AUTOMATON.make_automaton()
+    NOISE_REGEX = re.compile("|".join(f"(?:{p})" for p in _REGEX_NOISE), re.IGNORECASE)
+else:
+    _NOISE_AUTOMATON = None
+    NOISE_REGEX = re.compile("|".join(f"(?:{p})" for p in NOISE_PATTERNS), re.IGNORECASE)
 
 
 # ============================================================
@@ -89,31 +166,113 @@ def get_tesseract_lang() -> str:
     return lang_map.get(Config.OCR_LANG, 'vie+eng')
 
 
-_ocr_ready = None
+# Config doesn't change at runtime -> resolve once
+_TESS_LANG = get_tesseract_lang()
+_TESS_CONFIG = r'--oem 3 --psm 6'
+
+
+def _get_tessdata_path() -> Optional[str]:
+    """tessdata dir next to the configured tesseract binary (Windows installs)"""
+    tesseract_path = getattr(Config, 'TESSERACT_PATH', None)
+    if tesseract_path:
+        tessdata = os.path.join(os.path.dirname(tesseract_path), "tessdata")
+        if os.path.isdir(tessdata):
+            return tessdata
+    return None
+
 
+# Persistent tesserocr API (one per process) - model loaded once instead of
+# spawning a tesseract subprocess per frame like pytesseract
+_tess_api = None
+
+def _init_tess_api() -> bool:
+    """Create the persistent tesserocr API if tesserocr is installed"""
+    global _tess_api
+    
+    if tesserocr is None:
+        return False
+    
+    try:
+        kwargs = {
+            "lang": _TESS_LANG,
+            "psm": tesserocr.PSM.SINGLE_BLOCK,   # --psm 6
+            "oem": tesserocr.OEM.DEFAULT,        # --oem 3
+        }
+        tessdata = _get_tessdata_path()
+        if tessdata:
+            kwargs["path"] = tessdata
+        
+        _tess_api = tesserocr.PyTessBaseAPI(**kwargs)
+        atexit.register(_tess_api.End)
+        return True
+    except Exception as e:
+        print(f"   ⚠️ [OCR] tesserocr init failed ({e}), using pytesseract")
+        _tess_api = None
+        return False
+
+
+@functools.lru_cache(maxsize=1)
 def init_ocr() -> bool:
-    """Initialize OCR engine"""
-    global _ocr_ready
-    
-    if _ocr_ready is None:
-        if pytesseract is None or Image is None:
-            _ocr_ready = False
-        elif configure_tesseract():
-            try:
-                pytesseract.get_tesseract_version()
-                _ocr_ready = True
-            except:
-                _ocr_ready = False
-        else:
-            _ocr_ready = False
+    """Initialize OCR engine (tesserocr if available, else pytesseract) - once per process"""
+    if Image is None:
+        return False
+    
+    if _init_tess_api():
+        return True
+    
+    if pytesseract is None or not configure_tesseract():
+        return False
     
-    return _ocr_ready
+    try:
+        pytesseract.get_tesseract_version()
+        return True
+    except:
+        return False
+
+
+def _init_ocr_worker() -> None:
+    """
+    ProcessPoolExecutor initializer: load the OCR engine (tesserocr API or
+    tesseract version probe) once per worker, before any frame is submitted
+    """
+    init_ocr()
 
 
 # ============================================================
 # OCR PROCESSING
 # ============================================================
 
+def _build_ocr_result(text: str) -> Dict:
+    """Raw tesseract output -> OCR result dict"""
+    lines = [line.strip() for line in text.split('\n') if line.strip()]
+    
+    return {
+        "raw_text": text.strip(),
+        "lines": lines,
+        "char_count": len(text.strip()),
+        "success": True
+    }
+
+
+def _load_frame(frame_path: str) -> "Image.Image":
+    """Open a keyframe as grayscale, downscaled to OCR_MAX_FRAME_HEIGHT"""
+    img = Image.open(frame_path)
+    
+    # JPEG: let libjpeg decode straight to grayscale and DCT-downscale toward
+    # the target size (no full-res RGB decode); no-op for other formats
+    if img.height > OCR_MAX_FRAME_HEIGHT:
+        img.draft('L', (img.width * OCR_MAX_FRAME_HEIGHT // img.height, OCR_MAX_FRAME_HEIGHT))
+    else:
+        img.draft('L', img.size)
+    img = img.convert('L')
+    
+    if img.height > OCR_MAX_FRAME_HEIGHT:
+        width = img.width * OCR_MAX_FRAME_HEIGHT // img.height
+        img = img.resize((width, OCR_MAX_FRAME_HEIGHT), Image.BILINEAR)
+    
+    return img
+
+
 def run_ocr_on_frame(frame_path: str) -> Dict:
     """
     Run OCR on a single frame.
@@ -127,50 +286,278 @@ def run_ocr_on_frame(frame_path: str) -> Dict:
     }
     """
     if not init_ocr():
-        return {"raw_text": "", "lines": [], "char_count": 0, "success": False}
+        return _EMPTY_FAIL
     
     try:
-        img = Image.open(frame_path)
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
+        if _tess_api is not None:
+            with Image.open(frame_path) as probe:  # header only
+                needs_resize = probe.height > OCR_MAX_FRAME_HEIGHT
+            
+            if needs_resize:
+                _tess_api.SetImage(_load_frame(frame_path))
+            else:
+                # Leptonica reads the file natively - no PIL decode at all
+                _tess_api.SetImageFile(frame_path)
+            text = _tess_api.GetUTF8Text()
+        else:
+            img = _load_frame(frame_path)
+            text = pytesseract.image_to_string(img, lang=_TESS_LANG, config=_TESS_CONFIG)
         
-        lang = get_tesseract_lang()
-        custom_config = r'--oem 3 --psm 6'
+        return _build_ocr_result(text)
         
-        text = pytesseract.image_to_string(img, lang=lang, config=custom_config)
+    except Exception as e:
+        return {**_EMPTY_FAIL, "error": str(e)}
+
+
+def _ocr_list_file(list_path: str, frame_count: int) -> Optional[List[Dict]]:
+    """One tesseract call on a file listing frame_count image paths"""
+    cmd = [
+        pytesseract.pytesseract.tesseract_cmd, list_path, "stdout",
+        "-l", _TESS_LANG, *_TESS_CONFIG.split()
+    ]
+    proc = subprocess.run(cmd, capture_output=True, timeout=OCR_BATCH_TIMEOUT_SECONDS)
+    if proc.returncode != 0:
+        return None
+    
+    pages = proc.stdout.decode("utf-8", errors="replace").split("\x0c")
+    # The form feed after the last page leaves one empty trailing piece
+    if len(pages) == frame_count + 1 and not pages[-1].strip():
+        pages.pop()
+    # Any other count means pages can't be matched to frames -> per-frame OCR
+    if len(pages) != frame_count:
+        return None
+    
+    return [_build_ocr_result(text) for text in pages]
+
+
+def _ocr_frames_batch(frame_paths: List[str]) -> Optional[List[Dict]]:
+    """
+    OCR frames with tesseract's file-list mode, so the language model is
+    loaded once per list instead of once per frame. Lists are capped at
+    OCR_BATCH_MAX_FRAMES (very long lists have been reported to hang).
+    
+    Tesseract writes a form feed (\\x0c) after every page; stdout is split on
+    it to get per-frame text in list order.
+    
+    Returns:
+        List of OCR results (same order as frame_paths), or None on failure
+    """
+    if pytesseract is None:
+        return None
+    
+    # Per-process name: pool workers batch different chunks in the same dir
+    list_path = os.path.join(os.path.dirname(frame_paths[0]), f"imagelist_{os.getpid()}.txt")
+    
+    try:
+        # Same preprocessing as run_ocr_on_frame, written next to the frame
+        prepared_paths = []
+        for path in frame_paths:
+            prepared = os.path.splitext(path)[0] + "_ocr.png"
+            _load_frame(path).save(prepared)
+            prepared_paths.append(prepared)
         
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        results = []
+        for i in range(0, len(prepared_paths), OCR_BATCH_MAX_FRAMES):
+            chunk = prepared_paths[i:i + OCR_BATCH_MAX_FRAMES]
+            with open(list_path, "w", encoding="utf-8") as f:
+                f.write("\n".join(chunk) + "\n")
+            
+            chunk_results = _ocr_list_file(list_path, len(chunk))
+            if chunk_results is None:
+                return None
+            results.extend(chunk_results)
         
-        return {
-            "raw_text": text.strip(),
-            "lines": lines,
-            "char_count": len(text.strip()),
-            "success": True
-        }
+        return results
         
-    except Exception as e:
-        return {"raw_text": "", "lines": [], "char_count": 0, "success": False, "error": str(e)}
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"   ⚠️ [OCR] Batch OCR failed ({e}), falling back to per-frame")
+        return None
+    
+    finally:
+        try:
+            os.remove(list_path)
+        except OSError:
+            pass
 
 
-def is_noise_text(text: str) -> bool:
-    """Check if text is noise (watermarks, UI elements)"""
-    text_lower = text.lower().strip()
+def _ocr_chunk(frame_paths: List[str]) -> List[Dict]:
+    """
+    OCR a contiguous chunk of frames in the current process.
     
-    if len(text) < 2:
+    - tesserocr: the process's persistent API, frame by frame
+    - pytesseract: one batched tesseract call (file-list mode), falling
+      back to one tesseract call per frame
+    """
+    if _tess_api is None:
+        results = _ocr_frames_batch(frame_paths)
+        if results is not None:
+            return results
+    
+    # Plain dicts only: this runs in pool workers and the result is pickled
+    return [
+        result if type(result) is dict else dict(result)
+        for result in map(run_ocr_on_frame, frame_paths)
+    ]
+
+
+# Cap on OCR worker processes (None = one per CPU). Lowered by callers that
+# already run videos in parallel processes (process_phase2_batch), so the
+# per-video OCR pools don't multiply into ~cpu^2 processes.
+_OCR_MAX_WORKERS: Optional[int] = None
+
+
+def set_ocr_max_workers(max_workers: Optional[int]) -> None:
+    """Limit the OCR process pool of this process (None = one per CPU)."""
+    global _OCR_MAX_WORKERS
+    _OCR_MAX_WORKERS = max_workers
+
+
+def _run_ocr_backend(frame_paths: List[str]) -> List[Dict]:
+    """
+    Run OCR on many frames.
+    
+    Frames are split into one contiguous chunk per worker process (one task
+    per worker instead of one per frame -> less pickling/IPC, and each worker
+    reuses its tesseract API / batch call across its chunk).
+    
+    Results are returned in the same order as frame_paths.
+    Falls back to OCR in the current process if the pool cannot be used.
+    """
+    max_workers = min(_OCR_MAX_WORKERS or os.cpu_count() or 1, len(frame_paths))
+    
+    if max_workers > 1:
+        chunk_size = -(-len(frame_paths) // max_workers)
+        chunks = [frame_paths[i:i + chunk_size] for i in range(0, len(frame_paths), chunk_size)]
+        try:
+            with ProcessPoolExecutor(max_workers=len(chunks), initializer=_init_ocr_worker) as pool:
+                return [result for chunk in pool.map(_ocr_chunk, chunks) for result in chunk]
+        except Exception as e:
+            print(f"   ⚠️ [OCR] Process pool failed ({e}), falling back to sequential")
+    
+    return _ocr_chunk(frame_paths)
+
+
+def _has_overlay_text(frame_path: str) -> bool:
+    """
+    Cheap text-presence check: Canny edge density in the caption bands.
+    
+    Returns True (=> run OCR) if either band has enough edges, or if the
+    check cannot be done.
+    """
+    gray = cv2.imread(frame_path, cv2.IMREAD_GRAYSCALE)
+    if gray is None:
         return True
     
-    for pattern in NOISE_REGEX:
-        if pattern.search(text_lower):
+    height = gray.shape[0]
+    bands = (
+        gray[:int(height * EDGE_PREFILTER_TOP_BAND)],
+        gray[height - int(height * EDGE_PREFILTER_BOTTOM_BAND):],
+    )
+    
+    for band in bands:
+        if band.size == 0:
+            continue
+        edges = cv2.Canny(band, 80, 200)
+        if np.count_nonzero(edges) / edges.size >= EDGE_PREFILTER_MIN_RATIO:
             return True
     
     return False
 
 
-def clean_ocr_lines(lines: List[str]) -> List[str]:
-    """Clean and filter OCR lines"""
-    seen = set()
-    clean = []
+def _cache_get(key: bytes) -> Optional[Dict]:
+    with _OCR_CACHE_LOCK:
+        return _OCR_CACHE.get(key)
+
+
+def _cache_put(key: bytes, result: Dict) -> None:
+    """Insert into the bounded OCR cache (evict oldest)"""
+    with _OCR_CACHE_LOCK:
+        if len(_OCR_CACHE) >= OCR_CACHE_MAX_ENTRIES:
+            del _OCR_CACHE[next(iter(_OCR_CACHE))]
+        _OCR_CACHE[key] = result
+
+
+def _ocr_frames(frame_paths: List[str]) -> List[Dict]:
+    """
+    OCR frames, skipping frames already seen: exact content hash across
+    videos, or perceptual hash within PHASH_MAX_DISTANCE of another frame
+    of this call (= same video) if imagehash is installed.
     
+    Results are returned in the same order as frame_paths.
+    """
+    results: List[Optional[Dict]] = [None] * len(frame_paths)
+    keys = []
+    pending: Dict[bytes, int] = {}   # content key -> index of the frame to OCR
+    phashes = {}                     # pending index -> perceptual hash
+    aliases = {}                     # index -> pending index of a near-duplicate
+    
+    for i, path in enumerate(frame_paths):
+        with open(path, "rb") as f:
+            key = hashlib.blake2b(f.read(), digest_size=16).digest()
+        keys.append(key)
+        
+        cached = _cache_get(key)
+        if cached is not None:
+            results[i] = cached
+            continue
+        if key in pending:
+            continue
+        
+        if imagehash is not None:
+            with Image.open(path) as img:
+                phash = imagehash.phash(img)
+            twin = next((j for j, h in phashes.items() if phash - h <= PHASH_MAX_DISTANCE), None)
+            if twin is not None:
+                aliases[i] = twin
+                continue
+            phashes[i] = phash
+        
+        pending[key] = i
+    
+    if len(pending) < len(frame_paths):
+        print(f"   ♻️ [OCR] {len(frame_paths) - len(pending)}/{len(frame_paths)} frames reused from cache")
+    
+    todo = list(pending.values())
+    
+    if todo and cv2 is not None and Config.OCR_EDGE_PREFILTER:
+        with_text = []
+        for i in todo:
+            if _has_overlay_text(frame_paths[i]):
+                with_text.append(i)
+            else:
+                results[i] = _build_ocr_result("")
+                _cache_put(keys[i], results[i])
+        
+        if len(with_text) < len(todo):
+            print(f"   ⏭️ [OCR] Skipped {len(todo) - len(with_text)} frames without caption edges")
+        todo = with_text
+    
+    if todo:
+        for i, result in zip(todo, _run_ocr_backend([frame_paths[i] for i in todo])):
+            results[i] = result
+            if result["success"]:
+                _cache_put(keys[i], result)
+    
+    # Duplicates within this batch share the result of the frame that was OCR'd
+    for i, result in enumerate(results):
+        if result is None:
+            results[i] = results[aliases[i]] if i in aliases else results[pending[keys[i]]]
+    
+    return results
+
+
+def is_noise_text(text: str) -> bool:
+    """Check if text is noise (watermarks, UI elements)"""
+    if len(text) < 2:
+        return True
+    text = text.strip()
+    if _NOISE_AUTOMATON is not None and next(_NOISE_AUTOMATON.iter(text.lower()), None) is not None:
+        return True
+    return NOISE_REGEX.search(text) is not None
+
+
+def _clean_stream(lines: List[str], seen: set):
+    """Yield cleaned lines, dropping noise and lines already in `seen` (set of casefolded UTF-8 bytes)"""
     for line in lines:
         line = line.strip()
         
@@ -180,22 +567,85 @@ def clean_ocr_lines(lines: List[str]) -> List[str]:
         if is_noise_text(line):
             continue
         
-        # Deduplicate (case-insensitive)
-        key = line.lower()
+        # Deduplicate (case-insensitive, casefold handles Unicode properly)
+        key = line.casefold().encode("utf-8")
         if key in seen:
             continue
         seen.add(key)
         
-        clean.append(line)
+        yield line
+
+
+def clean_ocr_lines(lines: List[str]) -> List[str]:
+    """Clean and filter OCR lines"""
+    return list(_clean_stream(lines, set()))
+
+
+# ============================================================
+# COLUMNAR RESULT
+# ============================================================
+
+class OcrByScene(dict):
+    """
+    OCR results per keyframe, stored column-wise (Struct-of-Arrays):
+    
+        {
+            "scene_id":    np.ndarray[int32],
+            "timestamp":   np.ndarray[float32],
+            "frame_id":    [...],
+            "text":        [str, ...],
+            "clean_lines": [[str, ...], ...],
+            "raw_lines":   [[str, ...], ...],
+            "char_count":  np.ndarray[int32],
+        }
+    
+    rows() re-materializes per-keyframe dicts for callers that need them.
+    """
     
-    return clean
+    def __init__(
+        self,
+        scene_id=(), timestamp=(), frame_id=(), text=(),
+        clean_lines=(), raw_lines=(), char_count=()
+    ):
+        super().__init__(
+            scene_id=np.asarray(scene_id, dtype=np.int32),
+            timestamp=np.asarray(timestamp, dtype=np.float32),
+            frame_id=list(frame_id),
+            text=list(text),
+            clean_lines=list(clean_lines),
+            raw_lines=list(raw_lines),
+            char_count=np.asarray(char_count, dtype=np.int32),
+        )
+    
+    @classmethod
+    def from_rows(cls, rows: List[Dict]) -> "OcrByScene":
+        """Build from the old list-of-dicts layout"""
+        return cls(
+            scene_id=[r.get("scene_id", 0) for r in rows],
+            timestamp=[r.get("timestamp", 0.0) for r in rows],
+            frame_id=[r.get("frame_id") for r in rows],
+            text=[r.get("text", "") for r in rows],
+            clean_lines=[r.get("clean_lines", []) for r in rows],
+            raw_lines=[r.get("raw_lines", []) for r in rows],
+            char_count=[r.get("char_count", 0) for r in rows],
+        )
+    
+    @property
+    def n_rows(self) -> int:
+        return len(self["text"])
+    
+    def rows(self):
+        """Yield one dict per keyframe (plain Python values)"""
+        columns = {k: (v.tolist() if isinstance(v, np.ndarray) else v) for k, v in self.items()}
+        for i in range(self.n_rows):
+            yield {k: v[i] for k, v in columns.items()}
 
 
 # ============================================================
 # QUALITY ASSESSMENT
 # ============================================================
 
-def assess_ocr_quality(ocr_by_scene: List[Dict], total_frames: int) -> Dict:
+def assess_ocr_quality(ocr_by_scene: OcrByScene, total_frames: int) -> Dict:
     """
     Assess OCR quality based on various metrics.
     
@@ -215,27 +665,20 @@ def assess_ocr_quality(ocr_by_scene: List[Dict], total_frames: int) -> Dict:
     """
     issues = []
     
-    # Aggregate stats
-    total_chars = 0
-    total_lines = 0
-    readable_frames = 0
-    noise_count = 0
-    total_raw_lines = 0
-    
-    for item in ocr_by_scene:
-        char_count = item.get("char_count", 0)
-        lines = item.get("clean_lines", [])
-        raw_lines = item.get("raw_lines", [])
-        
-        total_chars += char_count
-        total_lines += len(lines)
-        total_raw_lines += len(raw_lines)
-        
-        if char_count > 5 and lines:
-            readable_frames += 1
-        
-        # Count filtered noise
-        noise_count += len(raw_lines) - len(lines)
+    if not isinstance(ocr_by_scene, OcrByScene):
+        ocr_by_scene = OcrByScene.from_rows(ocr_by_scene)
+    
+    # Aggregate stats (vectorized over frames)
+    n = ocr_by_scene.n_rows
+    char_counts = ocr_by_scene["char_count"]
+    clean_lens = np.fromiter((len(x) for x in ocr_by_scene["clean_lines"]), dtype=np.int32, count=n)
+    raw_lens = np.fromiter((len(x) for x in ocr_by_scene["raw_lines"]), dtype=np.int32, count=n)
+    
+    total_chars = int(char_counts.sum())
+    total_lines = int(clean_lens.sum())
+    total_raw_lines = int(raw_lens.sum())
+    readable_frames = int(((char_counts > 5) & (clean_lens > 0)).sum())
+    noise_count = total_raw_lines - total_lines  # Filtered noise
     
     # Calculate ratios
     readable_ratio = readable_frames / max(total_frames, 1)
@@ -300,10 +743,10 @@ def process_video_ocr_v2(
     Returns:
     {
         "ocr_text": "Combined text...",
-        "ocr_by_scene": [
-            {"scene_id": 0, "timestamp": 2.5, "text": "Bước 1: ...", "char_count": 15},
-            ...
-        ],
+        "ocr_by_scene": OcrByScene({
+            "scene_id": [0, ...], "timestamp": [2.5, ...],
+            "text": ["Bước 1: ...", ...], "char_count": [15, ...], ...
+        }),
         "ocr_quality": "good" | "low",
         "quality_metrics": {...},
         "frames_processed": int,
@@ -319,7 +762,7 @@ def process_video_ocr_v2(
     if not init_ocr():
         return {
             "ocr_text": "",
-            "ocr_by_scene": [],
+            "ocr_by_scene": OcrByScene(),
             "ocr_quality": "low",
             "quality_metrics": {"issues": ["ocr_not_available"]},
             "frames_processed": 0,
@@ -346,7 +789,7 @@ def process_video_ocr_v2(
         if not keyframes:
             return {
                 "ocr_text": "",
-                "ocr_by_scene": [],
+                "ocr_by_scene": OcrByScene(),
                 "ocr_quality": "low",
                 "quality_metrics": {"issues": ["no_frames_extracted"]},
                 "frames_processed": 0,
@@ -356,40 +799,40 @@ def process_video_ocr_v2(
         # Step 2: Run OCR on each keyframe
         print(f"   📝 [OCR] Running OCR on {len(keyframes)} keyframes...")
         
-        ocr_by_scene = []
+        columns = {k: [] for k in ("scene_id", "timestamp", "frame_id", "text",
+                                   "clean_lines", "raw_lines", "char_count")}
         all_clean_lines = []
+        seen = set()  # cross-frame dedup, only for combined_text
         
-        for kf in keyframes:
-            ocr_result = run_ocr_on_frame(kf["frame_path"])
-            
+        ocr_results = _ocr_frames([kf["frame_path"] for kf in keyframes])
+        
+        for kf, ocr_result in zip(keyframes, ocr_results):
             if ocr_result["success"]:
                 raw_lines = ocr_result["lines"]
+                # Per-frame dedup: an overlay repeated on later frames still
+                # counts for those frames' metrics and per-scene text
                 clean_lines = clean_ocr_lines(raw_lines)
+                text = "\n".join(clean_lines)
                 
-                ocr_by_scene.append({
-                    "scene_id": kf["scene_id"],
-                    "timestamp": kf["timestamp"],
-                    "frame_id": kf["frame_id"],
-                    "text": "\n".join(clean_lines),
-                    "clean_lines": clean_lines,
-                    "raw_lines": raw_lines,
-                    "char_count": len("\n".join(clean_lines))
-                })
+                for line in clean_lines:
+                    key = line.casefold().encode("utf-8")
+                    if key not in seen:
+                        seen.add(key)
+                        all_clean_lines.append(line)
                 
-                all_clean_lines.extend(clean_lines)
+                columns["scene_id"].append(kf["scene_id"])
+                columns["timestamp"].append(kf["timestamp"])
+                columns["frame_id"].append(kf["frame_id"])
+                columns["text"].append(text)
+                columns["clean_lines"].append(clean_lines)
+                columns["raw_lines"].append(raw_lines)
+                columns["char_count"].append(len(text))
         
-        # Step 3: Deduplicate across all frames
-        seen = set()
-        deduped_lines = []
-        for line in all_clean_lines:
-            key = line.lower()
-            if key not in seen:
-                seen.add(key)
-                deduped_lines.append(line)
+        ocr_by_scene = OcrByScene(**columns)
         
-        combined_text = "\n".join(deduped_lines)
+        combined_text = "\n".join(all_clean_lines)
         
-        # Step 4: Assess quality
+        # Step 3: Assess quality
         quality_result = assess_ocr_quality(ocr_by_scene, len(keyframes))
         
         elapsed_ms = int((time.time() - start_time) * 1000)
@@ -417,7 +860,7 @@ def process_video_ocr_v2(
         print(f"   ❌ [OCR] Error: {e}")
         return {
             "ocr_text": "",
-            "ocr_by_scene": [],
+            "ocr_by_scene": OcrByScene(),
             "ocr_quality": "low",
             "quality_metrics": {"issues": ["processing_error"]},
             "frames_processed": 0,
@@ -12,7 +12,8 @@ Output: Complete multimodal data ready for Phase 3 (analysis, classification)
 import os
 import sys
 import time
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Dict, List, Optional
 from datetime import datetime
 
 # Ensure backend is in path
@@ -22,7 +23,7 @@ if BACKEND_DIR not in sys.path:
 
 from app.services.analysis.stt import transcribe_with_timestamps
 from app.services.analysis.vision import detect_scenes
-from app.services.analysis.ocr import process_video_ocr_v2
+from app.services.analysis.ocr import process_video_ocr_v2, set_ocr_max_workers
 from app.services.analysis.merger import merge_multimodal_data
 from app.services.analysis.quality import assess_global_quality, get_content_richness_score
 
@@ -94,19 +95,37 @@ def process_phase2(video_path: str, phase1_data: Dict = None) -> Dict:
     }
     
     try:
-        # ============================================================
-        # STEP 1: Scene Detection
-        # ============================================================
-        print(f"\n📍 [PHASE 2] Step 1: Scene Detection")
-        scenes = detect_scenes(video_path)
-        result["scenes"] = scenes
-        print(f"   ✅ Detected {len(scenes)} scenes")
-        
-        # ============================================================
-        # STEP 2: Audio Branch - STT
-        # ============================================================
-        print(f"\n📍 [PHASE 2] Step 2: Speech-to-Text (STT)")
-        stt_result = transcribe_with_timestamps(video_path, has_audio=has_audio)
+        # STT (audio) and scenes -> OCR (frames) are independent branches and
+        # spend their time in ffmpeg / tesseract / STT server, so run them in
+        # parallel threads: wall time ~ max(STT, scenes + OCR) + merge
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix="phase2") as pool:
+            # ============================================================
+            # STEP 2 (background): Audio Branch - STT
+            # ============================================================
+            print(f"\n📍 [PHASE 2] Step 2: Speech-to-Text (STT) - started in background")
+            stt_future = pool.submit(transcribe_with_timestamps, video_path, has_audio=has_audio)
+            
+            # ============================================================
+            # STEP 1: Scene Detection
+            # ============================================================
+            print(f"\n📍 [PHASE 2] Step 1: Scene Detection")
+            scenes = detect_scenes(video_path)
+            result["scenes"] = scenes
+            print(f"   ✅ Detected {len(scenes)} scenes")
+            
+            # ============================================================
+            # STEP 3 (background): Visual Branch - OCR
+            # ============================================================
+            print(f"\n📍 [PHASE 2] Step 3: OCR Processing - started in background")
+            ocr_future = pool.submit(
+                process_video_ocr_v2,
+                video_path, 
+                metadata=phase1_data, 
+                scenes=scenes
+            )
+            
+            stt_result = stt_future.result()
+            ocr_result = ocr_future.result()
         
         result["transcript"] = stt_result.get("transcript", "")
         result["stt_segments"] = stt_result.get("segments", [])
@@ -116,18 +135,11 @@ def process_phase2(video_path: str, phase1_data: Dict = None) -> Dict:
         
         print(f"   ✅ STT Quality: {result['stt_quality']}")
         
-        # ============================================================
-        # STEP 3: Visual Branch - OCR
-        # ============================================================
-        print(f"\n📍 [PHASE 2] Step 3: OCR Processing")
-        ocr_result = process_video_ocr_v2(
-            video_path, 
-            metadata=phase1_data, 
-            scenes=scenes
-        )
-        
         result["ocr_text"] = ocr_result.get("ocr_text", "")
-        result["ocr_by_scene"] = ocr_result.get("ocr_by_scene", [])
+        # Columnar OcrByScene stays internal (merger / quality); output is
+        # plain per-keyframe dicts so the result is JSON/BSON-serializable
+        ocr_by_scene = ocr_result.get("ocr_by_scene", [])
+        result["ocr_by_scene"] = list(ocr_by_scene.rows()) if hasattr(ocr_by_scene, "rows") else ocr_by_scene
         result["ocr_quality"] = ocr_result.get("ocr_quality", "low")
         result["ocr_metrics"] = ocr_result.get("quality_metrics", {})
         
@@ -194,6 +206,53 @@ def process_phase2(video_path: str, phase1_data: Dict = None) -> Dict:
         return result
 
 
+def _init_batch_worker(ocr_workers: int) -> None:
+    """Pool initializer: cap the nested OCR pool of each batch process."""
+    set_ocr_max_workers(ocr_workers)
+
+
+def process_phase2_batch(
+    video_paths: List[str],
+    phase1_data_list: Optional[List[Dict]] = None,
+    workers: Optional[int] = None
+) -> List[Dict]:
+    """
+    Batch entry point: run process_phase2 for many videos in parallel
+    processes (each video's ffmpeg / OCR / STT work is independent).
+    
+    Useful for ranking a backlog of videos by result["content_richness"]
+    before in-depth analysis.
+    
+    Args:
+        video_paths: Paths to video files
+        phase1_data_list: Phase 1 output per video (same order), optional
+        workers: Number of processes (default: one per CPU, at most one per video)
+    
+    Returns:
+        List of process_phase2 results, in the same order as video_paths
+    """
+    if not video_paths:
+        return []
+    
+    if phase1_data_list is None:
+        phase1_data_list = [None] * len(video_paths)
+    
+    workers = workers or min(os.cpu_count() or 1, len(video_paths))
+    if workers <= 1:
+        return [process_phase2(path, data) for path, data in zip(video_paths, phase1_data_list)]
+    
+    # Split the CPUs between videos: each batch process gets its share for OCR
+    ocr_workers = max(1, (os.cpu_count() or 1) // workers)
+    
+    print(f"\n📦 [PHASE 2] Batch: {len(video_paths)} videos on {workers} processes")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_batch_worker,
+        initargs=(ocr_workers,)
+    ) as pool:
+        return list(pool.map(process_phase2, video_paths, phase1_data_list))
+
+
 def get_phase2_output_schema() -> Dict:
     """
     Returns the expected output schema for Phase 2.
@@ -212,7 +271,7 @@ def get_phase2_output_schema() -> Dict:
         
         "scenes": "List[Dict] - Scene boundaries with start/end times",
         
-        "multimodal_data": "List[Dict] - Merged STT+OCR per scene",
+        "multimodal_data": "List[Dict] - Merged STT+OCR per scene (stt_starts/stt_ends/stt_texts lists)",
         "combined_text": "str - Full combined text with [SPOKEN]/[ON-SCREEN] tags",
         "combined_text_clean": "str - Clean combined text without tags",
         
@@ -234,6 +293,9 @@ def get_phase2_output_schema() -> Dict:
 
 if __name__ == "__main__":
     import json
+    import logging
+    
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     print("=" * 60)
     print("🧪 Phase 2 Processor Test")
@@ -271,8 +333,17 @@ if __name__ == "__main__":
         serializable = {k: v for k, v in result.items() 
                        if not callable(v) and k != "processed_at"}
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(serializable, f, ensure_ascii=False, indent=2, default=str)
+        try:
+            import orjson
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(
+                    serializable,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                    default=str
+                ))
+        except ImportError:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(serializable, f, ensure_ascii=False, indent=2, default=str)
         
         print(f"\n📁 Result saved to: {output_path}")
     else:
@@ -8,8 +8,68 @@ Features:
 - Recommend processing approach for Phase 3+
 """
 
+import bisect
+import logging
 from typing import Dict, List
 
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# CONTENT RICHNESS BUCKETS
+# ============================================================
+
+# score = SCORES[i] where i = number of bins strictly below the count
+# (word_count > 100 -> 50, > 50 -> 40, ..., <= 5 -> 0)
+_STT_BINS = [5, 10, 20, 50, 100]
+_STT_SCORES = [0, 10, 20, 30, 40, 50]
+
+_OCR_BINS = [10, 20, 50, 100, 200]
+_OCR_SCORES = [0, 10, 20, 30, 40, 50]
+
+# level: score >= 70 -> high, >= 40 -> medium, else low
+_LEVEL_BINS = [40, 70]
+_LEVELS = ["low", "medium", "high"]
+
+
+# ============================================================
+# GLOBAL QUALITY DECISION TABLE
+# ============================================================
+
+# (data_status, recommendation, quality_summary)
+_WEAK_DECISION = (
+    "weak",
+    "Limited analysis - use metadata, scene structure, and any available text",
+    "Both STT and OCR returned low quality. Analysis will be limited.",
+)
+
+# primary_source -> decision when data is not weak
+_QUALITY_DECISION = {
+    "both": (
+        "valid",
+        "Full multimodal analysis with STT and OCR",
+        "Both STT and OCR are usable for comprehensive analysis.",
+    ),
+    "stt": (
+        "valid",
+        "Focus on audio/speech analysis, supplement with OCR where available",
+        "Good STT quality. OCR is weak - prioritize spoken content analysis.",
+    ),
+    "ocr": (
+        "valid",
+        "Focus on visual/text analysis, supplement with STT where available",
+        "Good OCR quality. STT is weak - prioritize on-screen text analysis.",
+    ),
+    "none": (
+        "valid",
+        "Metadata-only analysis",
+        "No usable content sources.",
+    ),
+}
+
 
 def assess_global_quality(stt_result: Dict, ocr_result: Dict) -> Dict:
     """
@@ -38,46 +98,27 @@ def assess_global_quality(stt_result: Dict, ocr_result: Dict) -> Dict:
     ocr_quality = ocr_result.get("ocr_quality", "low")
     
     # Check what's usable
-    usable_sources = []
-    
-    if stt_quality == "good":
-        usable_sources.append("stt")
-    
-    if ocr_quality == "good":
-        usable_sources.append("ocr")
+    has_stt = stt_quality == "good"
+    has_ocr = ocr_quality == "good"
     
     # Determine primary source
-    if "stt" in usable_sources and "ocr" in usable_sources:
+    if has_stt and has_ocr:
         primary_source = "both"
-    elif "stt" in usable_sources:
+    elif has_stt:
         primary_source = "stt"
-    elif "ocr" in usable_sources:
+    elif has_ocr:
         primary_source = "ocr"
     else:
         primary_source = "none"
-        usable_sources = ["metadata_only"]
+    
+    usable_sources = [src for src, ok in (("stt", has_stt), ("ocr", has_ocr)) if ok] or ["metadata_only"]
     
     # Global status decision
     # WEAK only if BOTH are low quality
     if stt_quality == "low" and ocr_quality == "low":
-        data_status = "weak"
-        recommendation = "Limited analysis - use metadata, scene structure, and any available text"
-        quality_summary = "Both STT and OCR returned low quality. Analysis will be limited."
+        data_status, recommendation, quality_summary = _WEAK_DECISION
     else:
-        data_status = "valid"
-        
-        if primary_source == "both":
-            recommendation = "Full multimodal analysis with STT and OCR"
-            quality_summary = "Both STT and OCR are usable for comprehensive analysis."
-        elif primary_source == "stt":
-            recommendation = "Focus on audio/speech analysis, supplement with OCR where available"
-            quality_summary = "Good STT quality. OCR is weak - prioritize spoken content analysis."
-        elif primary_source == "ocr":
-            recommendation = "Focus on visual/text analysis, supplement with STT where available"
-            quality_summary = "Good OCR quality. STT is weak - prioritize on-screen text analysis."
-        else:
-            recommendation = "Metadata-only analysis"
-            quality_summary = "No usable content sources."
+        data_status, recommendation, quality_summary = _QUALITY_DECISION[primary_source]
     
     # Collect all issues
     stt_issues = stt_result.get("quality_metrics", {}).get("issues", [])
@@ -88,9 +129,9 @@ def assess_global_quality(stt_result: Dict, ocr_result: Dict) -> Dict:
     stt_metrics = stt_result.get("quality_metrics", {})
     ocr_metrics = ocr_result.get("quality_metrics", {})
     
-    print(f"   📊 [QUALITY] Global assessment: {data_status}")
-    print(f"   📊 [QUALITY] STT: {stt_quality}, OCR: {ocr_quality}")
-    print(f"   📊 [QUALITY] Primary source: {primary_source}")
+    logger.info("📊 [QUALITY] Global assessment: %s", data_status)
+    logger.info("📊 [QUALITY] STT: %s, OCR: %s", stt_quality, ocr_quality)
+    logger.info("📊 [QUALITY] Primary source: %s", primary_source)
     
     return {
         "data_status": data_status,
@@ -131,18 +172,7 @@ def get_content_richness_score(
     stt_metrics = stt_result.get("quality_metrics", {})
     word_count = stt_metrics.get("word_count", 0)
     
-    if word_count > 100:
-        stt_score = 50
-    elif word_count > 50:
-        stt_score = 40
-    elif word_count > 20:
-        stt_score = 30
-    elif word_count > 10:
-        stt_score = 20
-    elif word_count > 5:
-        stt_score = 10
-    else:
-        stt_score = 0
+    stt_score = _STT_SCORES[bisect.bisect_left(_STT_BINS, word_count)]
     
     factors["stt_word_count"] = word_count
     factors["stt_score"] = stt_score
@@ -152,30 +182,14 @@ def get_content_richness_score(
     ocr_metrics = ocr_result.get("quality_metrics", {})
     char_count = ocr_metrics.get("total_chars", 0)
     
-    if char_count > 200:
-        ocr_score = 50
-    elif char_count > 100:
-        ocr_score = 40
-    elif char_count > 50:
-        ocr_score = 30
-    elif char_count > 20:
-        ocr_score = 20
-    elif char_count > 10:
-        ocr_score = 10
-    else:
-        ocr_score = 0
+    ocr_score = _OCR_SCORES[bisect.bisect_left(_OCR_BINS, char_count)]
     
     factors["ocr_char_count"] = char_count
     factors["ocr_score"] = ocr_score
     score += ocr_score
     
     # Determine level
-    if score >= 70:
-        level = "high"
-    elif score >= 40:
-        level = "medium"
-    else:
-        level = "low"
+    level = _LEVELS[bisect.bisect_right(_LEVEL_BINS, score)]
     
     return {
         "score": score,
@@ -184,11 +198,50 @@ def get_content_richness_score(
     }
 
 
+def get_content_richness_scores_batch(stt_results: List[Dict], ocr_results: List[Dict]) -> List[Dict]:
+    """
+    get_content_richness_score for many videos at once (same output per
+    video); bucketing is done with np.digitize over the whole batch.
+    """
+    word_counts = np.fromiter(
+        (r.get("quality_metrics", {}).get("word_count", 0) for r in stt_results),
+        dtype=np.int64, count=len(stt_results)
+    )
+    char_counts = np.fromiter(
+        (r.get("quality_metrics", {}).get("total_chars", 0) for r in ocr_results),
+        dtype=np.int64, count=len(ocr_results)
+    )
+    
+    stt_scores = np.asarray(_STT_SCORES)[np.digitize(word_counts, _STT_BINS, right=True)]
+    ocr_scores = np.asarray(_OCR_SCORES)[np.digitize(char_counts, _OCR_BINS, right=True)]
+    scores = stt_scores + ocr_scores
+    levels = np.digitize(scores, _LEVEL_BINS)
+    
+    return [
+        {
+            "score": int(score),
+            "level": _LEVELS[level],
+            "factors": {
+                "stt_word_count": int(wc),
+                "stt_score": int(ss),
+                "ocr_char_count": int(cc),
+                "ocr_score": int(os_),
+            }
+        }
+        for score, level, wc, ss, cc, os_ in zip(
+            scores.tolist(), levels.tolist(), word_counts.tolist(),
+            stt_scores.tolist(), char_counts.tolist(), ocr_scores.tolist()
+        )
+    ]
+
+
 # ============================================================
 # TEST
 # ============================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("=" * 60)
     print("🧪 Quality Assessor Test")
     print("=" * 60)
@@ -10,12 +10,27 @@ Features:
 """
 
 import os
+import logging
 import sys
 import subprocess
 import requests
-import glob
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import io
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+import wave
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from requests_toolbelt import MultipartEncoder
+except ImportError:
+    MultipartEncoder = None
 
 # Ensure backend is in path
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -23,41 +38,80 @@ if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
 
 from app.core.config import Config
+from app.services.analysis.vision import parse_ffmpeg_duration
+from app.services.ingest.normalizer import (
+    AUDIO_CHANNELS,
+    AUDIO_SAMPLE_RATE,
+    AUDIO_SAMPLE_WIDTH,
+    extract_audio_stream,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 # ============================================================
 # AUDIO EXTRACTION
 # ============================================================
 
+STT_SAMPLE_RATE = AUDIO_SAMPLE_RATE
+STT_CHUNK_DURATION = 120    # seconds per chunk sent to the STT server
+
+@functools.lru_cache(maxsize=256)
+def _probe_audio_duration(audio_path: str, mtime_ns: int, size: int) -> float:
+    """
+    FFprobe duration, memoized per file version (mtime/size in the key, so a
+    regenerated file at the same path is probed again). Raises on failure,
+    so errors are never cached.
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-show_entries", "format=duration",
+        "-of", "default=noprint_wrappers=1:nokey=1", audio_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    return float(result.stdout.strip())
+
+
 def get_audio_duration(audio_path: str) -> float:
-    """Get duration of audio file in seconds using FFprobe"""
+    """Get duration of audio file in seconds using FFprobe (0.0 if unknown)"""
     try:
-        cmd = f'ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "{audio_path}"'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
-        return float(result.stdout.strip())
-    except:
+        st = os.stat(audio_path)
+        return _probe_audio_duration(audio_path, st.st_mtime_ns, st.st_size)
+    except Exception:
         return 0.0
 
 
-def extract_audio(video_path: str) -> Optional[str]:
+def _audio_base(video_path: str) -> str:
+    """<video>.mp4 -> <video>_audio (prefix of the extracted WAV and its chunks)"""
+    stem = video_path[:-4] if video_path.endswith(".mp4") else video_path
+    return f"{stem}_audio"
+
+
+def extract_audio(video_path: str, audio_path: Optional[str] = None) -> Tuple[Optional[str], float]:
     """
     Extract audio from video file as WAV (16kHz, mono).
-    Returns path to audio file or None if failed.
+    Returns (path to audio file or None if failed, duration in seconds).
+    
+    The duration is read from the same ffmpeg run (stderr banner), so no
+    separate ffprobe is needed; 0.0 if unknown.
     """
     if not os.path.exists(video_path):
-        return None
+        return None, 0.0
     
-    audio_path = video_path.replace(".mp4", "_audio.wav")
+    audio_path = audio_path or f"{_audio_base(video_path)}.wav"
     
     # Skip if already exists
     if os.path.exists(audio_path):
-        return audio_path
+        return audio_path, get_audio_duration(audio_path)
     
-    cmd = f'ffmpeg -i "{video_path}" -vn -acodec pcm_s16le -ar 16000 -ac 1 "{audio_path}" -y'
+    cmd = [
+        "ffmpeg", "-i", video_path, "-vn", "-acodec", "pcm_s16le",
+        "-ar", "16000", "-ac", "1", audio_path, "-y"
+    ]
     
     try:
         result = subprocess.run(
-            cmd, shell=True, 
+            cmd,
             stdout=subprocess.DEVNULL, 
             stderr=subprocess.PIPE,
             text=True,
@@ -65,29 +119,73 @@ def extract_audio(video_path: str) -> Optional[str]:
         )
         
         if os.path.exists(audio_path) and os.path.getsize(audio_path) > 1000:
-            return audio_path
+            return audio_path, parse_ffmpeg_duration(result.stderr)
         
         # Check if video has no audio
         if "does not contain any stream" in result.stderr:
-            print("   ⚠️ [STT] Video không có audio track")
-            return None
+            logger.warning("⚠️ [STT] Video không có audio track")
+            return None, 0.0
             
-        return None
+        return None, 0.0
         
     except subprocess.TimeoutExpired:
-        print("   ⚠️ [STT] Audio extraction timeout")
-        return None
+        logger.warning("⚠️ [STT] Audio extraction timeout")
+        return None, 0.0
     except Exception as e:
-        print(f"   ⚠️ [STT] Audio extraction error: {e}")
-        return None
+        logger.warning("⚠️ [STT] Audio extraction error: %s", e)
+        return None, 0.0
 
 
-def split_audio_chunks(audio_path: str, chunk_duration: int = 120) -> List[Dict]:
+def extract_audio_bytes(video_path: str) -> Tuple[Optional[bytes], float]:
+    """
+    Extract audio (16kHz, mono, PCM16) through an ffmpeg pipe, without a
+    temp WAV file on disk.
+    
+    Raw PCM comes from normalizer.extract_audio_stream (a WAV written to a
+    pipe has no valid size fields); the WAV header is added in memory.
+    
+    Returns (WAV bytes or None if failed, duration in seconds)
+    """
+    pcm = extract_audio_stream(video_path)
+    if not pcm or len(pcm) <= 1000:
+        return None, 0.0
+    
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wav:
+        wav.setnchannels(AUDIO_CHANNELS)
+        wav.setsampwidth(AUDIO_SAMPLE_WIDTH)
+        wav.setframerate(STT_SAMPLE_RATE)
+        wav.writeframes(pcm)
+    
+    return buf.getvalue(), len(pcm) / (AUDIO_CHANNELS * AUDIO_SAMPLE_WIDTH * STT_SAMPLE_RATE)
+
+
+def _list_chunk_files(base_path: str) -> List[str]:
+    """
+    Sorted paths of '<base_path>_chunk_*.wav' files.
+    os.scandir + prefix/suffix check instead of glob (no fnmatch, no extra stat).
+    """
+    directory, prefix = os.path.split(base_path)
+    prefix += "_chunk_"
+    try:
+        with os.scandir(directory or ".") as entries:
+            return sorted(
+                entry.path for entry in entries
+                if entry.name.startswith(prefix) and entry.name.endswith(".wav")
+            )
+    except OSError:
+        return []
+
+
+def split_audio_chunks(audio_path: str, chunk_duration: int = 120, duration: Optional[float] = None) -> List[Dict]:
     """
     Split audio into chunks with timestamps.
     Returns list of {path, start_time, end_time}
+    
+    duration: audio length if already known (skips ffprobe)
     """
-    duration = get_audio_duration(audio_path)
+    if not duration:
+        duration = get_audio_duration(audio_path)
     if duration <= 0:
         return [{"path": audio_path, "start_time": 0.0, "end_time": 0.0}]
     
@@ -96,31 +194,40 @@ def split_audio_chunks(audio_path: str, chunk_duration: int = 120) -> List[Dict]
         return [{"path": audio_path, "start_time": 0.0, "end_time": duration}]
     
     chunks = []
-    base_path = audio_path.replace(".wav", "")
+    base_path = audio_path[:-4] if audio_path.endswith(".wav") else audio_path
     num_chunks = int(duration / chunk_duration) + 1
     
-    print(f"   📌 [STT] Audio dài {duration:.0f}s, chia thành {num_chunks} chunks...")
+    logger.info("📌 [STT] Audio dài %.0fs, chia thành %s chunks...", duration, num_chunks)
     
-    for i in range(num_chunks):
-        start_time = i * chunk_duration
-        end_time = min((i + 1) * chunk_duration, duration)
-        chunk_path = f"{base_path}_chunk_{i:03d}.wav"
-        
-        cmd = f'ffmpeg -i "{audio_path}" -ss {start_time} -t {chunk_duration} -acodec pcm_s16le -ar 16000 -ac 1 "{chunk_path}" -y'
-        
+    # Leftovers from an earlier run would be picked up by the listing below
+    for stale in _list_chunk_files(base_path):
         try:
-            subprocess.run(cmd, shell=True, check=True, 
-                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
-                          timeout=30)
-            if os.path.exists(chunk_path) and os.path.getsize(chunk_path) > 1000:
-                chunks.append({
-                    "path": chunk_path,
-                    "start_time": start_time,
-                    "end_time": end_time
-                })
-        except:
+            os.remove(stale)
+        except OSError:
             pass
     
+    # One ffmpeg pass with the segment muxer (stream copy, input is already
+    # 16kHz mono PCM) instead of one ffmpeg process per chunk
+    cmd = [
+        "ffmpeg", "-i", audio_path, "-f", "segment", "-segment_time", str(chunk_duration),
+        "-c", "copy", "-reset_timestamps", "1", f"{base_path}_chunk_%03d.wav", "-y"
+    ]
+    
+    try:
+        subprocess.run(cmd, check=True,
+                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                      timeout=120)
+    except Exception:
+        pass
+    
+    for i, chunk_path in enumerate(_list_chunk_files(base_path)):
+        if os.path.getsize(chunk_path) > 1000:
+            chunks.append({
+                "path": chunk_path,
+                "start_time": i * chunk_duration,
+                "end_time": min((i + 1) * chunk_duration, duration)
+            })
+    
     return chunks if chunks else [{"path": audio_path, "start_time": 0.0, "end_time": duration}]
 
 
@@ -128,17 +235,82 @@ def split_audio_chunks(audio_path: str, chunk_duration: int = 120) -> List[Dict]
 # STT API CALL
 # ============================================================
 
-def transcribe_chunk(audio_path: str, timeout: int = 120) -> Dict:
+# Max chunks sent to the STT server at the same time
+STT_MAX_PARALLEL_CHUNKS = 8
+
+# Brief retry of transient STT server errors
+STT_RETRY_TOTAL = 2
+STT_RETRY_BACKOFF_SECONDS = 0.2
+STT_RETRY_STATUSES = frozenset({502, 503, 504})
+
+def _build_stt_session(retries: bool = True) -> requests.Session:
+    """
+    Shared session: keep-alive connections to the STT server are reused
+    across chunks and videos. Pool sized for STT_MAX_PARALLEL_CHUNKS
+    concurrent requests; 502/503/504 from the server are retried briefly.
+    
+    retries=False: no adapter-level retry, for streamed bodies that urllib3
+    cannot rewind (transcribe_chunk retries those itself with a new body).
+    """
+    retry = Retry(
+        total=STT_RETRY_TOTAL,
+        backoff_factor=STT_RETRY_BACKOFF_SECONDS,
+        status_forcelist=sorted(STT_RETRY_STATUSES),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    ) if retries else 0
+    adapter = HTTPAdapter(
+        pool_connections=STT_MAX_PARALLEL_CHUNKS,
+        pool_maxsize=STT_MAX_PARALLEL_CHUNKS,
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_STT_SESSION = _build_stt_session()
+_STT_STREAM_SESSION = _build_stt_session(retries=False)
+
+
+def _post_streamed(session: requests.Session, api_url: str, f, timeout: int) -> requests.Response:
+    """
+    POST the file as a streamed multipart body (flat memory with many
+    concurrent chunks). The encoder is consumed by the first send, so each
+    retry of a 502/503/504 rewinds the file and builds a fresh encoder.
+    """
+    for attempt in range(STT_RETRY_TOTAL + 1):
+        f.seek(0)
+        encoder = MultipartEncoder(fields={'file': ('audio.wav', f, 'audio/wav')})
+        response = session.post(
+            api_url, data=encoder,
+            headers={'Content-Type': encoder.content_type},
+            timeout=timeout
+        )
+        if response.status_code not in STT_RETRY_STATUSES or attempt == STT_RETRY_TOTAL:
+            return response
+        time.sleep(STT_RETRY_BACKOFF_SECONDS * (2 ** attempt))
+
+
+def transcribe_chunk(audio: Union[str, bytes], timeout: int = 120, session: Optional[requests.Session] = None) -> Dict:
     """
-    Transcribe a single audio chunk.
+    Transcribe a single audio chunk (WAV file path, or WAV bytes in memory).
     Returns {text, segments (if available)}
     """
     api_url = Config.STT_API_URL
+    session = session or _STT_SESSION
     
     try:
-        with open(audio_path, 'rb') as f:
-            files = {'file': ('audio.wav', f, 'audio/wav')}
-            response = requests.post(api_url, files=files, timeout=timeout)
+        with (io.BytesIO(audio) if isinstance(audio, bytes) else open(audio, 'rb')) as f:
+            if MultipartEncoder is not None:
+                # Adapter retries would re-send the consumed encoder (empty
+                # body) -> use the no-retry session, retried in _post_streamed
+                stream_session = _STT_STREAM_SESSION if session is _STT_SESSION else session
+                response = _post_streamed(stream_session, api_url, f, timeout)
+            else:
+                files = {'file': ('audio.wav', f, 'audio/wav')}
+                response = session.post(api_url, files=files, timeout=timeout)
         
         if response.status_code == 200:
             data = response.json()
@@ -156,14 +328,77 @@ def transcribe_chunk(audio_path: str, timeout: int = 120) -> Dict:
         return {"text": "", "segments": [], "success": False, "error": str(e)}
 
 
+def transcribe_batch(audio_paths: List[str], timeout: int = 300, session: Optional[requests.Session] = None) -> List[Dict]:
+    """
+    Transcribe several chunks in one request to Config.STT_BATCH_API_URL, so
+    the server can batch them on the model.
+    
+    The endpoint takes repeated 'file' fields and returns the per-file
+    results in upload order, either as a list or as {"results": [...]}.
+    
+    Falls back to concurrent single-chunk requests if no batch endpoint is
+    configured or the batch call fails.
+    
+    Returns:
+        List of {text, segments, success} in the same order as audio_paths
+    """
+    batch_url = Config.STT_BATCH_API_URL
+    session = session or _STT_SESSION
+    
+    if batch_url and len(audio_paths) > 1:
+        handles = []
+        try:
+            handles = [open(path, 'rb') for path in audio_paths]
+            files = [('file', (f"audio_{i:03d}.wav", f, 'audio/wav')) for i, f in enumerate(handles)]
+            response = session.post(batch_url, files=files, timeout=timeout)
+            
+            if response.status_code == 200:
+                data = response.json()
+                items = data.get("results", []) if isinstance(data, dict) else data
+                if len(items) == len(audio_paths):
+                    return [
+                        {
+                            "text": item.get("text", ""),
+                            "segments": item.get("segments", []),
+                            "success": True
+                        }
+                        for item in items
+                    ]
+                logger.warning("⚠️ [STT] Batch returned %s results for %s chunks, falling back", len(items), len(audio_paths))
+            else:
+                logger.warning("⚠️ [STT] Batch HTTP %s, falling back", response.status_code)
+        except Exception as e:
+            logger.warning("⚠️ [STT] Batch error (%s), falling back", e)
+        finally:
+            for f in handles:
+                f.close()
+    
+    # Independent HTTP calls -> sent concurrently, results in input order
+    with ThreadPoolExecutor(max_workers=max(1, min(len(audio_paths), STT_MAX_PARALLEL_CHUNKS))) as ex:
+        return list(ex.map(lambda path: transcribe_chunk(path, session=session), audio_paths))
+
+
 # ============================================================
 # QUALITY ASSESSMENT
 # ============================================================
 
-def assess_stt_quality(transcript: str, segments: List[Dict], audio_duration: float) -> Dict:
+# Issues assess_stt_quality reports for an empty transcript without segments
+_NO_SPEECH_ISSUES = ("very_few_words", "mostly_silence", "fragmented_words")
+
+
+def assess_stt_quality(
+    transcript: str,
+    segments: List[Dict],
+    audio_duration: float,
+    starts: Optional[np.ndarray] = None,
+    ends: Optional[np.ndarray] = None
+) -> Dict:
     """
     Assess STT quality based on various metrics.
     
+    starts/ends: segment start/end times as arrays, if the caller already
+    has them (otherwise they are read from segments).
+    
     Returns:
     {
         "quality": "good" | "low",
@@ -177,10 +412,26 @@ def assess_stt_quality(transcript: str, segments: List[Dict], audio_duration: fl
         }
     }
     """
-    issues = []
-    
     # Basic text analysis
     text = transcript.strip()
+    
+    # No speech at all (silent / music-only video, common on TikTok):
+    # result is fixed, skip the metric computations
+    if not text and not segments:
+        return {
+            "quality": "low",
+            "metrics": {
+                "word_count": 0,
+                "char_count": 0,
+                "words_per_second": 0.0,
+                "silence_ratio": 1.0,
+                "repetition_ratio": 0.0,
+                "avg_word_length": 0.0,
+                "issues": list(_NO_SPEECH_ISSUES)
+            }
+        }
+    
+    issues = []
     words = text.split() if text else []
     word_count = len(words)
     char_count = len(text)
@@ -191,7 +442,10 @@ def assess_stt_quality(transcript: str, segments: List[Dict], audio_duration: fl
     # Silence ratio estimation (if segments available)
     silence_ratio = 0.0
     if segments and audio_duration > 0:
-        spoken_time = sum(s.get("end", 0) - s.get("start", 0) for s in segments)
+        if starts is None or ends is None:
+            starts = np.fromiter((s.get("start", 0) for s in segments), dtype=np.float64, count=len(segments))
+            ends = np.fromiter((s.get("end", 0) for s in segments), dtype=np.float64, count=len(segments))
+        spoken_time = float((ends - starts).sum())
         silence_ratio = 1.0 - (spoken_time / audio_duration)
     elif word_count == 0:
         silence_ratio = 1.0
@@ -199,9 +453,16 @@ def assess_stt_quality(transcript: str, segments: List[Dict], audio_duration: fl
     # Repetition check
     repetition_ratio = 0.0
     if word_count > 5:
-        word_lower = [w.lower() for w in words]
-        unique_words = set(word_lower)
-        repetition_ratio = 1.0 - (len(unique_words) / len(word_lower))
+        # Single pass: count repeats of already-seen words (no extra list)
+        seen = set()
+        duplicates = 0
+        for w in words:
+            w = w.lower()
+            if w in seen:
+                duplicates += 1
+            else:
+                seen.add(w)
+        repetition_ratio = duplicates / word_count
     
     # Fragmentation check (very short words/segments)
     avg_word_len = char_count / max(word_count, 1)
@@ -254,6 +515,18 @@ def assess_stt_quality(transcript: str, segments: List[Dict], audio_duration: fl
 # MAIN ENTRY POINT
 # ============================================================
 
+def _cleanup_audio_files(audio_path: Optional[str], audio_base: str):
+    """Delete the extracted WAV and its chunk files (errors ignored)"""
+    try:
+        if audio_path and os.path.exists(audio_path):
+            os.remove(audio_path)
+        
+        for chunk_file in _list_chunk_files(audio_base):
+            os.remove(chunk_file)
+    except OSError:
+        pass
+
+
 def transcribe_with_timestamps(video_path: str, has_audio: bool = True) -> Dict:
     """
     Complete STT processing with timestamps and quality assessment.
@@ -275,11 +548,11 @@ def transcribe_with_timestamps(video_path: str, has_audio: bool = True) -> Dict:
         "success": True
     }
     """
-    print(f"   🎧 [STT] Processing: {os.path.basename(video_path)}")
+    logger.info("🎧 [STT] Processing: %s", os.path.basename(video_path))
     
     # Handle videos without audio
     if not has_audio:
-        print("   ⚠️ [STT] Video không có audio - skipping STT")
+        logger.warning("⚠️ [STT] Video không có audio - skipping STT")
         return {
             "transcript": "",
             "segments": [],
@@ -295,11 +568,23 @@ def transcribe_with_timestamps(video_path: str, has_audio: bool = True) -> Dict:
         }
     
     # Step 1: Extract audio
-    print("   🔄 [STT] Extracting audio...")
-    audio_path = extract_audio(video_path)
+    logger.info("🔄 [STT] Extracting audio...")
+    audio_base = _audio_base(video_path)
+    audio_path, audio_bytes = None, None
+    
+    if Config.STT_IN_MEMORY_AUDIO:
+        audio_bytes, audio_duration = extract_audio_bytes(video_path)
+        if audio_bytes is not None and audio_duration > STT_CHUNK_DURATION + 10:
+            # Long audio gets split into chunk files anyway -> write it once
+            audio_path = f"{audio_base}.wav"
+            with open(audio_path, "wb") as f:
+                f.write(audio_bytes)
+            audio_bytes = None
+    else:
+        audio_path, audio_duration = extract_audio(video_path, f"{audio_base}.wav")
     
-    if not audio_path:
-        print("   ⚠️ [STT] Could not extract audio")
+    if not audio_path and audio_bytes is None:
+        logger.warning("⚠️ [STT] Could not extract audio")
         return {
             "transcript": "",
             "segments": [],
@@ -313,25 +598,33 @@ def transcribe_with_timestamps(video_path: str, has_audio: bool = True) -> Dict:
             "error": "audio_extraction_failed"
         }
     
-    audio_duration = get_audio_duration(audio_path)
-    print(f"   ✅ [STT] Audio duration: {audio_duration:.1f}s")
-    
-    # Step 2: Split into chunks
-    chunks = split_audio_chunks(audio_path, chunk_duration=120)
+    if audio_duration <= 0 and audio_path:
+        audio_duration = get_audio_duration(audio_path)
+    logger.info("✅ [STT] Audio duration: %.1fs", audio_duration)
     
-    # Step 3: Transcribe each chunk
-    print(f"   🚀 [STT] Transcribing {len(chunks)} chunk(s)...")
+    if audio_bytes is not None:
+        # Short audio held in memory: one chunk, uploaded straight from RAM
+        chunks = [{"path": None, "start_time": 0.0, "end_time": audio_duration}]
+        logger.info("🚀 [STT] Transcribing 1 chunk(s) (in memory)...")
+        results = [transcribe_chunk(audio_bytes)]
+    else:
+        # Step 2: Split into chunks
+        chunks = split_audio_chunks(audio_path, chunk_duration=STT_CHUNK_DURATION, duration=audio_duration)
+        
+        # Step 3: Transcribe chunks (one batch request if the server supports it,
+        # otherwise concurrent single requests; results come back in chunk order)
+        logger.info("🚀 [STT] Transcribing %s chunk(s)...", len(chunks))
+        
+        results = transcribe_batch([c["path"] for c in chunks])
     
     all_segments = []
     all_texts = []
+    seg_starts = []     # same order as all_segments (for vectorized quality metrics)
+    seg_ends = []
     
-    for i, chunk in enumerate(chunks):
-        chunk_path = chunk["path"]
+    for i, (chunk, result) in enumerate(zip(chunks, results)):
         chunk_start = chunk["start_time"]
         
-        print(f"   📤 [STT] Processing chunk {i+1}/{len(chunks)}...")
-        result = transcribe_chunk(chunk_path)
-        
         if result["success"] and result["text"]:
             all_texts.append(result["text"])
             
@@ -339,12 +632,16 @@ def transcribe_with_timestamps(video_path: str, has_audio: bool = True) -> Dict:
             # If API provides segments, adjust timestamps
             if result.get("segments"):
                 for seg in result["segments"]:
+                    start = chunk_start + seg.get("start", 0)
+                    end = chunk_start + seg.get("end", 0)
                     all_segments.append({
-                        "start": chunk_start + seg.get("start", 0),
-                        "end": chunk_start + seg.get("end", 0),
+                        "start": start,
+                        "end": end,
                         "text": seg.get("text", ""),
                         "chunk_id": i
                     })
+                    seg_starts.append(start)
+                    seg_ends.append(end)
             else:
                 # Create single segment for chunk
                 all_segments.append({
@@ -353,33 +650,32 @@ def transcribe_with_timestamps(video_path: str, has_audio: bool = True) -> Dict:
                     "text": result["text"],
                     "chunk_id": i
                 })
+                seg_starts.append(chunk_start)
+                seg_ends.append(chunk["end_time"])
             
-            preview = result["text"][:50] + "..." if len(result["text"]) > 50 else result["text"]
-            print(f"   ✅ [STT] Chunk {i+1}: {preview}")
+            if logger.isEnabledFor(logging.DEBUG):
+                preview = result["text"][:50] + "..." if len(result["text"]) > 50 else result["text"]
+                logger.debug("✅ [STT] Chunk %s: %s", i+1, preview)
         else:
             error = result.get("error", "unknown")
-            print(f"   ⚠️ [STT] Chunk {i+1} failed: {error}")
+            logger.warning("⚠️ [STT] Chunk %s failed: %s", i+1, error)
     
     # Step 4: Merge transcripts
     full_transcript = " ".join(all_texts)
     
     # Step 5: Assess quality
-    quality_result = assess_stt_quality(full_transcript, all_segments, audio_duration)
+    quality_result = assess_stt_quality(
+        full_transcript, all_segments, audio_duration,
+        starts=np.asarray(seg_starts, dtype=np.float64),
+        ends=np.asarray(seg_ends, dtype=np.float64)
+    )
     
-    print(f"   📊 [STT] Quality: {quality_result['quality']} ({quality_result['metrics']['word_count']} words)")
+    logger.info("📊 [STT] Quality: %s (%s words)", quality_result['quality'], quality_result['metrics']['word_count'])
     if quality_result["metrics"]["issues"]:
-        print(f"   ⚠️ [STT] Issues: {', '.join(quality_result['metrics']['issues'])}")
+        logger.warning("⚠️ [STT] Issues: %s", ', '.join(quality_result['metrics']['issues']))
     
-    # Step 6: Cleanup temp files
-    try:
-        if os.path.exists(audio_path):
-            os.remove(audio_path)
-        
-        base_path = video_path.replace(".mp4", "_audio")
-        for chunk_file in glob.glob(f"{base_path}_chunk_*.wav"):
-            os.remove(chunk_file)
-    except:
-        pass
+    # Step 6: Cleanup temp files (in the background, the result doesn't need it)
+    threading.Thread(target=_cleanup_audio_files, args=(audio_path, audio_base), daemon=True).start()
     
     return {
         "transcript": full_transcript,
@@ -396,6 +692,8 @@ def transcribe_with_timestamps(video_path: str, has_audio: bool = True) -> Dict:
 # ============================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     import json
     
     print("=" * 60)
@@ -9,11 +9,21 @@ Features:
 """
 
 import os
+import logging
 import sys
 import subprocess
 import json
 import re
-from typing import List, Dict, Optional
+import threading
+import time
+import functools
+import atexit
+import shutil
+import tempfile
+import uuid
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 
 # Ensure backend is in path
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -22,19 +32,102 @@ if BACKEND_DIR not in sys.path:
 
 from app.core.config import Config
 
+try:
+    import av
+except ImportError:
+    av = None
+
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
+
+logger = logging.getLogger(__name__)
+
 
 # ============================================================
 # SCENE DETECTION (FFmpeg based)
 # ============================================================
 
-def get_video_duration(video_path: str) -> float:
-    """Get video duration using FFprobe"""
+# "  Duration: 00:01:15.03, start: ..." in ffmpeg's input banner (stderr)
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+# metadata=print line of a selected (scene change) frame
+PTS_TIME_PATTERN = re.compile(r"pts_time:(\d+\.?\d*)")
+
+SCENE_DETECT_TIMEOUT_SECONDS = 120
+
+# Windows: don't flash a console window per ffmpeg call (0 elsewhere)
+_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+
+# single-pass keyframe extraction decodes the video once up to the last frame
+KEYFRAME_EXTRACT_TIMEOUT_SECONDS = 120
+
+
+@functools.lru_cache(maxsize=256)
+def _probe_video_cached(video_path: str, mtime_ns: int, size: int) -> Tuple[float, float]:
+    """
+    probe_video memoized per file version (mtime/size in the key, so a
+    re-downloaded file at the same path is probed again). Raises if ffprobe
+    fails, so failures are never cached.
+    """
+    cmd = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=avg_frame_rate:format=duration",
+        "-of", "json", video_path
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffprobe exited with {result.returncode}")
+    probe = json.loads(result.stdout or "{}")
+    
+    fps, duration = 0.0, 0.0
     try:
-        cmd = f'ffprobe -v error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "{video_path}"'
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True, timeout=10)
-        return float(result.stdout.strip())
+        num, _, den = probe["streams"][0]["avg_frame_rate"].partition("/")
+        fps = float(num) / float(den or 1)
     except:
+        pass
+    try:
+        duration = float(probe["format"]["duration"])
+    except:
+        pass
+    return fps, duration
+
+
+def probe_video(video_path: str) -> Tuple[float, float]:
+    """
+    One FFprobe call for both frame rate and duration (memoized per file).
+    Returns (fps, duration), 0.0 for whatever is unknown.
+    """
+    try:
+        st = os.stat(video_path)
+        return _probe_video_cached(video_path, st.st_mtime_ns, st.st_size)
+    except Exception:
+        return 0.0, 0.0
+
+
+def get_video_duration(video_path: str) -> float:
+    """Get video duration using FFprobe (memoized per file)"""
+    return probe_video(video_path)[1]
+
+
+def get_video_fps(video_path: str) -> float:
+    """Get video frame rate using FFprobe (memoized per file), 0.0 if unknown"""
+    return probe_video(video_path)[0]
+
+
+def parse_ffmpeg_duration(stderr: str) -> float:
+    """
+    Read the input duration from ffmpeg's stderr banner, so a command that
+    runs ffmpeg anyway doesn't need a separate ffprobe call.
+    Returns 0.0 if not found (e.g. "Duration: N/A").
+    """
+    match = DURATION_PATTERN.search(stderr or "")
+    if not match:
         return 0.0
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
 
 
 def detect_scenes(video_path: str, threshold: float = 0.3) -> List[Dict]:
@@ -55,11 +148,7 @@ def detect_scenes(video_path: str, threshold: float = 0.3) -> List[Dict]:
     if not os.path.exists(video_path):
         return []
     
-    duration = get_video_duration(video_path)
-    if duration <= 0:
-        return []
-    
-    print(f"   🎬 [SCENE] Detecting scenes in {duration:.1f}s video...")
+    logger.info("🎬 [SCENE] Detecting scenes...")
     
     # Use FFmpeg scene detection filter
     # This outputs timestamps where scene changes occur
@@ -74,11 +163,18 @@ def detect_scenes(video_path: str, threshold: float = 0.3) -> List[Dict]:
         '-print_format', 'json'
     ]
     
+    # Alternative approach: use ffmpeg with scene detection
+    # This is more reliable across different systems.
+    # The same ffmpeg run also reports the duration (no extra ffprobe)
+    scene_times, duration = detect_scenes_ffmpeg(video_path, threshold)
+    if duration <= 0:
+        duration = get_video_duration(video_path)
+    if duration <= 0:
+        return []
+    
+    logger.info("🎬 [SCENE] Video duration: %.1fs", duration)
+    
     try:
-        # Alternative approach: use ffmpeg with scene detection
-        # This is more reliable across different systems
-        scene_times = detect_scenes_ffmpeg(video_path, threshold, duration)
-        
         if not scene_times:
             # No scene changes detected - treat entire video as one scene
             return [{
@@ -116,11 +212,11 @@ def detect_scenes(video_path: str, threshold: float = 0.3) -> List[Dict]:
                 "duration": duration
             }]
         
-        print(f"   ✅ [SCENE] Detected {len(scenes)} scenes")
+        logger.info("✅ [SCENE] Detected %s scenes", len(scenes))
         return scenes
         
     except Exception as e:
-        print(f"   ⚠️ [SCENE] Detection error: {e}")
+        logger.warning("⚠️ [SCENE] Detection error: %s", e)
         # Fallback: return single scene
         return [{
             "scene_id": 0,
@@ -130,74 +226,319 @@ def detect_scenes(video_path: str, threshold: float = 0.3) -> List[Dict]:
         }]
 
 
-def detect_scenes_ffmpeg(video_path: str, threshold: float, duration: float) -> List[float]:
+def detect_scenes_ffmpeg(video_path: str, threshold: float) -> Tuple[List[float], float]:
     """
     Use FFmpeg to detect scene changes.
-    Returns list of timestamps where scene changes occur.
-    """
-    # Create a temp file for scene detection output
-    import tempfile
+    Returns (timestamps where scene changes occur, video duration from the
+    ffmpeg banner or 0.0 if unknown).
     
+    Selected frames are printed by the metadata filter to stdout (two short
+    key=value lines per scene change instead of a verbose showinfo line) and
+    read line by line while ffmpeg runs. stderr only carries the banner
+    (-nostats), drained in a helper thread for the Duration line.
+    """
     scene_times = []
+    banner = {"duration": 0.0}
+    
+    # FFmpeg command to detect scene changes
+    # Output: "frame:N pts:P pts_time:T" + "lavfi.scene_score=S" per selected frame
+    cmd = [
+        "ffmpeg", "-nostats", "-i", video_path,
+        "-vf", f"select='gt(scene,{threshold})',metadata=print:key=lavfi.scene_score:file=-",
+        "-an", "-f", "null", "-"
+    ]
     
     try:
-        # FFmpeg command to detect scene changes
-        # Output format: frame_number, pts_time, scene_score
-        cmd = f'ffmpeg -i "{video_path}" -vf "select=\'gt(scene,{threshold})\',showinfo" -f null - 2>&1'
-        
-        result = subprocess.run(
-            cmd, shell=True,
-            capture_output=True,
+        proc = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=120
+            errors="replace",
+            bufsize=1
         )
+    except Exception as e:
+        logger.warning("⚠️ [SCENE] FFmpeg error: %s", e)
+        return [], 0.0
+    
+    def _drain_stderr():
+        for line in proc.stderr:
+            if not banner["duration"] and "Duration:" in line:
+                banner["duration"] = parse_ffmpeg_duration(line)
+    
+    stderr_reader = threading.Thread(target=_drain_stderr, daemon=True)
+    stderr_reader.start()
+    
+    # Kill ffmpeg if it runs too long; the read loop then ends on EOF
+    timer = threading.Timer(SCENE_DETECT_TIMEOUT_SECONDS, proc.kill)
+    timer.start()
+    
+    try:
+        for line in proc.stdout:
+            # Every other line is "lavfi.scene_score=..." -> skip without regex
+            if not line.startswith("frame:"):
+                continue
+            match = PTS_TIME_PATTERN.search(line)
+            if match:
+                t = float(match.group(1))
+                # Frames arrive in order: keep changes >= 1s apart (min gap)
+                if not scene_times or t - scene_times[-1] >= 1.0:
+                    scene_times.append(t)
         
-        # Parse output for pts_time
-        # Format: [Parsed_showinfo_0 @ ...] n:  XX pts:  XXXX pts_time:XX.XXXX
-        pattern = r'pts_time:(\d+\.?\d*)'
-        matches = re.findall(pattern, result.stderr)
-        
-        scene_times = [float(t) for t in matches]
-        
-        # Remove duplicates and sort
-        scene_times = sorted(list(set(scene_times)))
+        proc.wait()
+        stderr_reader.join(timeout=5)
         
-        # Filter out scene changes too close together
-        if scene_times:
-            filtered = [scene_times[0]]
-            for t in scene_times[1:]:
-                if t - filtered[-1] >= 1.0:  # Min 1 second between scenes
-                    filtered.append(t)
-            scene_times = filtered
+        if not timer.is_alive():
+            logger.warning("⚠️ [SCENE] Detection timeout")
+            return [], banner["duration"]
         
-        return scene_times
+        return scene_times, banner["duration"]
         
-    except subprocess.TimeoutExpired:
-        print("   ⚠️ [SCENE] Detection timeout")
-        return []
     except Exception as e:
-        print(f"   ⚠️ [SCENE] FFmpeg error: {e}")
-        return []
+        proc.kill()
+        logger.warning("⚠️ [SCENE] FFmpeg error: %s", e)
+        return [], banner["duration"]
+    
+    finally:
+        timer.cancel()
+        proc.stdout.close()
 
 
 # ============================================================
 # KEYFRAME EXTRACTION
 # ============================================================
 
+def _keyframe_timestamps(scene: Dict, frames_per_scene: int) -> List[float]:
+    """Extraction points within one scene"""
+    start = scene["start_time"]
+    end = scene["end_time"]
+    scene_duration = end - start
+    
+    # Avoid very start/end of scene (often transition frames)
+    margin = min(0.2, scene_duration * 0.1)
+    usable_start = start + margin
+    usable_end = end - margin
+    usable_duration = usable_end - usable_start
+    
+    if usable_duration <= 0:
+        # Very short scene - extract middle frame
+        return [(start + end) / 2]
+    if frames_per_scene == 1:
+        # Single frame - extract middle
+        return [(start + end) / 2]
+    # Multiple frames - distribute evenly
+    step = usable_duration / frames_per_scene
+    return [usable_start + (i + 0.5) * step for i in range(frames_per_scene)]
+
+
+def _extract_frames_pyav(
+    video_path: str,
+    targets: List[Tuple[int, float]],
+    output_dir: str
+) -> Optional[List[Dict]]:
+    """
+    Extract target frames in-process with PyAV: the container is opened once
+    and each timestamp is reached by seeking to the previous keyframe and
+    decoding forward (no ffmpeg process per frame).
+    
+    Returns None if PyAV is not installed or decoding fails, so the caller
+    can fall back to ffmpeg.
+    """
+    if av is None:
+        return None
+    
+    keyframes = []
+    try:
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            stream.thread_type = "AUTO"
+            time_base = stream.time_base
+            
+            for scene_id, ts in targets:
+                container.seek(int(ts / time_base), stream=stream, backward=True, any_frame=False)
+                frame = None
+                for frame in container.decode(stream):
+                    if frame.pts is not None and frame.pts * time_base >= ts:
+                        break
+                if frame is None:
+                    continue
+                
+                # same size as ffmpeg's scale=1280:-1 (even height)
+                height = max(2, round(frame.height * 1280 / frame.width / 2) * 2)
+                frame_path = os.path.join(output_dir, f"f{len(keyframes):03d}.jpg")
+                frame.reformat(width=1280, height=height).to_image().save(frame_path, "JPEG", quality=90)
+                
+                keyframes.append({
+                    "scene_id": scene_id,
+                    "timestamp": round(ts, 2),
+                    "frame_path": frame_path,
+                    "frame_id": len(keyframes)
+                })
+    except Exception as e:
+        logger.warning("⚠️ [SCENE] PyAV extraction error: %s", e)
+        return None
+    
+    return keyframes
+
+
+def _extract_frames_select(
+    video_path: str,
+    targets: List[Tuple[int, float]],
+    output_dir: str,
+    fps: Optional[float] = None
+) -> Optional[List[Dict]]:
+    """
+    Extract all target frames in ONE ffmpeg pass: timestamps are converted to
+    frame numbers and picked with select='eq(n,N1)+eq(n,N2)+...', written as
+    f000.jpg, f001.jpg, ... in frame order (= target order).
+    
+    Returns None if the pass can't be used (unknown fps, ffmpeg error,
+    missing output) so the caller can fall back to per-frame extraction.
+    """
+    if not fps:
+        fps = get_video_fps(video_path)
+    if fps <= 0:
+        return None
+    
+    # frame number -> (scene_id, timestamp); two targets on the same frame
+    # would give the same image, keep the first
+    frames = {}
+    for scene_id, ts in targets:
+        frames.setdefault(int(ts * fps), (scene_id, ts))
+    frame_numbers = sorted(frames)
+    
+    frame_paths = [os.path.join(output_dir, f"f{i:03d}.jpg") for i in range(len(frame_numbers))]
+    for frame_path in frame_paths:
+        if os.path.exists(frame_path):
+            os.remove(frame_path)
+    
+    select = "+".join(f"eq(n,{n})" for n in frame_numbers)
+    cmd = [
+        "ffmpeg", "-i", video_path,
+        "-an", "-vf", f"select='{select}',scale=1280:-1",
+        "-vsync", "0", "-frames:v", str(len(frame_numbers)),
+        "-q:v", "2", "-start_number", "0",
+        os.path.join(output_dir, "f%03d.jpg"), "-y", "-loglevel", "error"
+    ]
+    
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=KEYFRAME_EXTRACT_TIMEOUT_SECONDS,
+            creationflags=_NO_WINDOW
+        )
+    except Exception as e:
+        logger.warning("⚠️ [SCENE] Keyframe pass error: %s", e)
+        return None
+    
+    if result.returncode != 0 or not all(os.path.exists(p) for p in frame_paths):
+        return None
+    
+    keyframes = []
+    for frame_id, (n, frame_path) in enumerate(zip(frame_numbers, frame_paths)):
+        scene_id, ts = frames[n]
+        keyframes.append({
+            "scene_id": scene_id,
+            "timestamp": round(ts, 2),
+            "frame_path": frame_path,
+            "frame_id": frame_id
+        })
+    return keyframes
+
+
+def _extract_one(video_path: str, ts: float, frame_path: str) -> bool:
+    """Extract a single frame at ts with its own ffmpeg call"""
+    # (-ss before -i = input seek: jumps near ts instead of decoding
+    # from the start - keep this order; -noaccurate_seek takes the nearest
+    # keyframe, fine since scene margins are already applied; -an skips
+    # the audio stream)
+    cmd = [
+        "ffmpeg", "-ss", f"{ts:.2f}", "-noaccurate_seek", "-i", video_path,
+        "-an", "-vframes", "1", "-vf", "scale=1280:-1", "-q:v", "2",
+        "-threads", "2", frame_path, "-y", "-loglevel", "error"
+    ]
+    
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            timeout=15,
+            creationflags=_NO_WINDOW
+        )
+        # ffmpeg exits 0 without writing a frame when ts is past the end
+        return result.returncode == 0 and os.path.exists(frame_path)
+    except:
+        return False
+
+
+def _extract_frames_per_frame(
+    video_path: str,
+    targets: List[Tuple[int, float]],
+    output_dir: str,
+    workers: Optional[int] = None
+) -> List[Dict]:
+    """
+    Fallback: one ffmpeg call per frame, run side by side in threads
+    (each call is an independent ffmpeg process).
+    """
+    if not targets:
+        return []
+    
+    workers = workers or min(os.cpu_count() or 1, len(targets))
+    frame_paths = [os.path.join(output_dir, f"f{i:03d}.jpg") for i in range(len(targets))]
+    
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="keyframe") as pool:
+        ok = list(pool.map(
+            _extract_one,
+            [video_path] * len(targets),
+            [ts for _, ts in targets],
+            frame_paths
+        ))
+    
+    # Number successful frames consecutively (f000, f001, ...)
+    keyframes = []
+    for (scene_id, ts), frame_path, extracted in zip(targets, frame_paths, ok):
+        if not extracted:
+            continue
+        frame_id = len(keyframes)
+        final_path = os.path.join(output_dir, f"f{frame_id:03d}.jpg")
+        if final_path != frame_path:
+            os.replace(frame_path, final_path)
+        keyframes.append({
+            "scene_id": scene_id,
+            "timestamp": round(ts, 2),
+            "frame_path": final_path,
+            "frame_id": frame_id
+        })
+    
+    return keyframes
+
+
 def extract_keyframes_per_scene(
     video_path: str, 
     scenes: List[Dict],
     output_dir: str,
-    frames_per_scene: int = 2
+    frames_per_scene: int = 2,
+    workers: Optional[int] = None,
+    fps: Optional[float] = None
 ) -> List[Dict]:
     """
     Extract keyframes from each scene.
     
+    Frames are decoded in-process with PyAV when installed, otherwise in a
+    single ffmpeg pass; if that fails, each frame is extracted with its own
+    ffmpeg call.
+    
     Args:
         video_path: Path to video file
         scenes: List of scenes from detect_scenes()
         output_dir: Directory to save frames
         frames_per_scene: Number of frames to extract per scene
+        workers: Threads for the per-frame fallback (default: one per CPU)
+        fps: Video frame rate if already known (otherwise probed once)
     
     Returns:
     [
@@ -212,71 +553,147 @@ def extract_keyframes_per_scene(
     
     os.makedirs(output_dir, exist_ok=True)
     
-    keyframes = []
-    frame_id = 0
-    
     max_total_frames = getattr(Config, 'OCR_MAX_FRAMES', 10)
     frames_per_scene = min(frames_per_scene, max(1, max_total_frames // len(scenes)))
     
-    print(f"   📸 [SCENE] Extracting {frames_per_scene} frame(s) per scene...")
+    logger.info("📸 [SCENE] Extracting %s frame(s) per scene...", frames_per_scene)
     
-    for scene in scenes:
-        scene_id = scene["scene_id"]
-        start = scene["start_time"]
-        end = scene["end_time"]
-        scene_duration = end - start
-        
-        # Calculate extraction points within scene
-        # Avoid very start/end of scene (often transition frames)
-        margin = min(0.2, scene_duration * 0.1)
-        usable_start = start + margin
-        usable_end = end - margin
-        usable_duration = usable_end - usable_start
-        
-        if usable_duration <= 0:
-            # Very short scene - extract middle frame
-            timestamps = [(start + end) / 2]
-        elif frames_per_scene == 1:
-            # Single frame - extract middle
-            timestamps = [(start + end) / 2]
-        else:
-            # Multiple frames - distribute evenly
-            step = usable_duration / frames_per_scene
-            timestamps = [usable_start + (i + 0.5) * step for i in range(frames_per_scene)]
-        
-        for ts in timestamps:
-            if frame_id >= max_total_frames:
-                break
-            
-            frame_path = os.path.join(output_dir, f"f{frame_id:03d}.jpg")
-            
-            # FFmpeg command to extract single frame
-            cmd = f'ffmpeg -ss {ts:.2f} -i "{video_path}" -vframes 1 -vf "scale=1280:-1" -q:v 2 "{frame_path}" -y -loglevel error'
-            
-            try:
-                subprocess.run(cmd, shell=True, timeout=15)
-                if os.path.exists(frame_path) and os.path.getsize(frame_path) > 1000:
-                    keyframes.append({
-                        "scene_id": scene_id,
-                        "timestamp": round(ts, 2),
-                        "frame_path": frame_path,
-                        "frame_id": frame_id
-                    })
-                    frame_id += 1
-            except:
-                pass
-        
-        if frame_id >= max_total_frames:
-            break
+    # (scene_id, timestamp) in scene order
+    targets = [
+        (scene["scene_id"], ts)
+        for scene in scenes
+        for ts in _keyframe_timestamps(scene, frames_per_scene)
+    ]
+    
+    targets = targets[:max_total_frames]
     
-    print(f"   ✅ [SCENE] Extracted {len(keyframes)} keyframes")
+    keyframes = _extract_frames_pyav(video_path, targets, output_dir)
+    if keyframes is None:
+        keyframes = _extract_frames_select(video_path, targets, output_dir, fps)
+    if keyframes is None:
+        logger.info("📸 [SCENE] Single-pass extraction failed, extracting frame by frame")
+        keyframes = _extract_frames_per_frame(video_path, targets, output_dir, workers)
+    
+    logger.info("✅ [SCENE] Extracted %s keyframes", len(keyframes))
     return keyframes
 
 
-def get_scene_info(video_path: str, output_dir: str = None) -> Dict:
+_SCENE_TMP_DIR = None
+_SCENE_TMP_LOCK = threading.Lock()
+
+# get_scene_info() cache: key -> result (in-process, oldest dropped first);
+# the key hashes only the head of the file
+_SCENE_INFO_CACHE: Dict[str, Dict] = {}
+_SCENE_INFO_CACHE_SIZE = 64
+_SCENE_INFO_LOCK = threading.Lock()
+_CACHE_HEAD_BYTES = 64 * 1024
+
+
+def _scene_tmp_root() -> str:
+    """
+    One temp directory per process for get_scene_info() frames (one subdir
+    per call inside it), removed at interpreter exit.
+    """
+    global _SCENE_TMP_DIR
+    with _SCENE_TMP_LOCK:
+        if _SCENE_TMP_DIR is None:
+            _SCENE_TMP_DIR = tempfile.mkdtemp(prefix="scene_")
+            atexit.register(shutil.rmtree, _SCENE_TMP_DIR, ignore_errors=True)
+    return _SCENE_TMP_DIR
+
+
+def _video_cache_key(video_path: str) -> Optional[str]:
+    """
+    Cheap content key for a video: hash of size + mtime + first 64 KB
+    (blake3 if installed, else blake2b), plus the settings that change the
+    keyframe output. None if the file can't be read.
+    """
+    try:
+        stat = os.stat(video_path)
+        with open(video_path, "rb") as f:
+            head = f.read(_CACHE_HEAD_BYTES)
+    except OSError:
+        return None
+    
+    hasher = blake3() if blake3 is not None else hashlib.blake2b(digest_size=16)
+    hasher.update(f"{stat.st_size}:{stat.st_mtime_ns}:{getattr(Config, 'OCR_MAX_FRAMES', 10)}:".encode())
+    hasher.update(head)
+    return hasher.hexdigest()[:32]
+
+
+def _load_scene_cache(cache_dir: str) -> Optional[Dict]:
+    """Cached get_scene_info() result, None if missing or a frame is gone"""
+    try:
+        with open(os.path.join(cache_dir, "scene_info.json"), "r", encoding="utf-8") as f:
+            info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(os.path.exists(kf["frame_path"]) for kf in info["keyframes"]):
+        return None
+    return info
+
+
+def _prune_scene_cache(root: str, keep: str) -> None:
+    """
+    Bound the on-disk scene cache: drop entries not used for
+    SCENE_CACHE_MAX_AGE_HOURS, then the least recently used ones until the
+    total is under SCENE_CACHE_MAX_MB. `keep` (the entry just written) stays.
+    """
+    max_age = getattr(Config, "SCENE_CACHE_MAX_AGE_HOURS", 168) * 3600
+    max_bytes = getattr(Config, "SCENE_CACHE_MAX_MB", 500) * 1024 * 1024
+    now = time.time()
+    
+    entries = []  # (last_used, size, path)
+    try:
+        names = os.listdir(root)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(root, name)
+        try:
+            # scene_info.json mtime = last use (touched on every hit)
+            last_used = os.path.getmtime(os.path.join(path, "scene_info.json"))
+            size = sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+        except OSError:
+            continue
+        entries.append((last_used, size, path))
+    
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for last_used, size, path in entries:
+        if os.path.basename(path) == keep:
+            continue
+        if now - last_used <= max_age and total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+    
+    with _SCENE_INFO_LOCK:
+        for key in [k for k in _SCENE_INFO_CACHE if k != keep and not os.path.isdir(os.path.join(root, k))]:
+            del _SCENE_INFO_CACHE[key]
+
+
+def _copy_scene_info(info: Dict, output_dir: str) -> Dict:
+    """Copy cached frames into the caller's output_dir (cache stays intact)"""
+    os.makedirs(output_dir, exist_ok=True)
+    keyframes = []
+    for kf in info["keyframes"]:
+        frame_path = os.path.join(output_dir, os.path.basename(kf["frame_path"]))
+        shutil.copyfile(kf["frame_path"], frame_path)
+        keyframes.append({**kf, "frame_path": frame_path})
+    return {**info, "keyframes": keyframes, "output_dir": output_dir}
+
+
+def get_scene_info(video_path: str, output_dir: str = None, use_cache: bool = True) -> Dict:
     """
     Complete scene analysis: detection + keyframe extraction.
     
+    Results (scene list + keyframe JPEGs) are cached on disk under
+    Config.CACHE_DIR/scene_info/<key>, key = hash of the video file (see
+    _video_cache_key), with an in-process layer on top; a hit skips both
+    ffmpeg passes. With output_dir, frames are copied there. The disk cache
+    is off by default and bounded by size/age (see _prune_scene_cache).
+    
     Returns:
     {
         "scenes": [...],
@@ -286,25 +703,61 @@ def get_scene_info(video_path: str, output_dir: str = None) -> Dict:
         "success": True
     }
     """
-    import tempfile
+    cache_dir = None
+    if use_cache and getattr(Config, "SCENE_CACHE_ENABLED", False):
+        key = _video_cache_key(video_path)
+        if key:
+            cache_dir = os.path.join(Config.CACHE_DIR, "scene_info", key)
+            with _SCENE_INFO_LOCK:
+                info = _SCENE_INFO_CACHE.get(key)
+            if info is None or not all(os.path.exists(kf["frame_path"]) for kf in info["keyframes"]):
+                info = _load_scene_cache(cache_dir)
+            if info is not None:
+                logger.info("♻️ [SCENE] Cache hit: %s", key)
+                try:
+                    # Mark as recently used for _prune_scene_cache
+                    os.utime(os.path.join(cache_dir, "scene_info.json"))
+                except OSError:
+                    pass
+                with _SCENE_INFO_LOCK:
+                    _SCENE_INFO_CACHE[key] = info
+                return _copy_scene_info(info, output_dir) if output_dir else info
     
-    if output_dir is None:
-        output_dir = tempfile.mkdtemp(prefix="scene_")
+    frames_dir = cache_dir or output_dir
+    if frames_dir is None:
+        frames_dir = os.path.join(_scene_tmp_root(), uuid.uuid4().hex[:8])
     
     # Step 1: Detect scenes
     scenes = detect_scenes(video_path)
     
-    # Step 2: Extract keyframes
-    keyframes = extract_keyframes_per_scene(video_path, scenes, output_dir)
+    # Step 2: Extract keyframes (fps/duration probed once and cached)
+    fps = get_video_fps(video_path)
+    keyframes = extract_keyframes_per_scene(video_path, scenes, frames_dir, fps=fps)
     
-    return {
+    info = {
         "scenes": scenes,
         "keyframes": keyframes,
         "scene_count": len(scenes),
         "total_frames": len(keyframes),
-        "output_dir": output_dir,
+        "output_dir": frames_dir,
         "success": True
     }
+    
+    if cache_dir and keyframes:
+        try:
+            with open(os.path.join(cache_dir, "scene_info.json"), "w", encoding="utf-8") as f:
+                json.dump(info, f, ensure_ascii=False)
+            with _SCENE_INFO_LOCK:
+                _SCENE_INFO_CACHE[key] = info
+                if len(_SCENE_INFO_CACHE) > _SCENE_INFO_CACHE_SIZE:
+                    _SCENE_INFO_CACHE.pop(next(iter(_SCENE_INFO_CACHE)))
+        except OSError as e:
+            logger.warning("⚠️ [SCENE] Cache write error: %s", e)
+        _prune_scene_cache(os.path.dirname(cache_dir), keep=key)
+    
+    if cache_dir and output_dir:
+        return _copy_scene_info(info, output_dir)
+    return info
 
 
 # ============================================================
@@ -312,8 +765,7 @@ def get_scene_info(video_path: str, output_dir: str = None) -> Dict:
 # ============================================================
 
 if __name__ == "__main__":
-    import tempfile
-    import shutil
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     
     print("=" * 60)
     print("🧪 Scene Detector Test")
@@ -1,11 +1,13 @@
 import os
 import sys
 import json
+import mmap
 import re
 import shutil
 import time
 import sqlite3
-from moviepy import VideoFileClip
+import threading
+import subprocess
 
 # Ensure backend is in path
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
@@ -25,9 +27,26 @@ except ImportError:
     print("⚠️ Cảnh báo: Không tìm thấy module 'TT_Content_Scraper'. Hãy đảm bảo folder này nằm ở root.")
     TT_Content_Scraper = None
 
+# orjson (tùy chọn): đọc/ghi JSON metadata nhanh hơn json chuẩn
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Theo dõi file bằng inotify (Linux, tùy chọn) thay vì poll
+try:
+    from inotify_simple import INotify, flags as inotify_flags
+except ImportError:
+    INotify = None
+    inotify_flags = None
+
 # Định nghĩa đường dẫn DB của Scraper
 DB_PATH = os.path.join(Config.SCRAPER_DIR, "progress.db")
 
+# Kết nối dùng chung cho _force_reset_ids_in_db (xem _db)
+_DB_CONN = None
+_DB_LOCK = threading.Lock()
+
 # --- 2. QUẢN LÝ SCRAPER ENGINE (SINGLETON) ---
 scraper_engine = None
 
@@ -50,6 +69,15 @@ def init_scraper():
         except Exception as e:
             print(f"❌ Lỗi khởi tạo Scraper: {e}")
 
+def ensure_scraper_ready():
+    """
+    Khởi tạo Scraper ở lần dùng đầu tiên (không mở Chrome lúc import module).
+    Returns: scraper_engine hoặc None nếu không khởi tạo được.
+    """
+    if scraper_engine is None:
+        init_scraper()
+    return scraper_engine
+
 def close_scraper():
     """Đóng kết nối Scraper an toàn (Giải phóng file DB)."""
     global scraper_engine
@@ -62,12 +90,14 @@ def close_scraper():
             pass
         finally: 
             scraper_engine = None
-
-# Tự động khởi tạo khi import
-init_scraper()
+    _close_db()
 
 # --- 3. CÁC HÀM TIỆN ÍCH (HELPER FUNCTIONS) ---
 
+# Regex cho extract_video_id (compile một lần)
+_PAT_VIDEO_PHOTO = re.compile(r"/(?:video|photo)/(\d+)")
+_PAT_LONG_ID = re.compile(r"(\d{15,})")
+
 def extract_video_id(url):
     """
     Trích xuất ID video từ URL TikTok.
@@ -76,65 +106,106 @@ def extract_video_id(url):
     - https://www.tiktok.com/@user/photo/1234567890
     - https://vm.tiktok.com/ABC123/ (shortened)
     - https://www.tiktok.com/t/ABC123/ (shortened)
+    Trả về None nếu không tìm thấy (caller tự log lỗi).
     """
-    print(f"   🔍 [URL] Parsing URL: {url}")
-    
     # Pattern 1: Standard /video/ or /photo/ URL
-    match = re.search(r"/(?:video|photo)/(\d+)", url)
+    match = _PAT_VIDEO_PHOTO.search(url)
     if match:
-        video_id = match.group(1)
-        print(f"   ✅ [URL] Found video ID: {video_id}")
-        return video_id
+        return match.group(1)
     
     # Pattern 2: Check if URL is just a number (raw ID)
     if url.strip().isdigit():
-        print(f"   ✅ [URL] Raw ID detected: {url.strip()}")
         return url.strip()
     
     # Pattern 3: Short URL - try to find any long number sequence
-    match = re.search(r"(\d{15,})", url)
+    match = _PAT_LONG_ID.search(url)
     if match:
-        video_id = match.group(1)
-        print(f"   ✅ [URL] Found long number ID: {video_id}")
-        return video_id
+        return match.group(1)
     
-    print(f"   ❌ [URL] Could not extract video ID from URL")
     return None
 
 def _convert_video_to_audio(video_path, audio_path):
     """
     Tách Audio từ Video MP4 (Dùng cho video thường).
+    FFmpeg chỉ đọc luồng audio (-vn) và encode thẳng sang MP3, không decode video.
     """
-    if not VideoFileClip: return False
     try:
         if os.path.exists(audio_path): return True
         
-        clip = VideoFileClip(video_path)
-        clip.audio.write_audiofile(audio_path, logger=None)
-        clip.close()
+        cmd = [
+            "ffmpeg", "-y", "-i", video_path, "-vn",
+            "-acodec", "libmp3lame", "-q:a", "2",
+            "-loglevel", "error", audio_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
+        if result.returncode != 0 or not os.path.exists(audio_path):
+            print(f"⚠️ Lỗi tách audio: {result.stderr.strip()[:200]}")
+            return False
         return True
     except Exception as e:
         print(f"⚠️ Lỗi tách audio: {e}")
         return False
 
-def _force_reset_id_in_db(video_id):
+def _link_or_copy(src, dst):
     """
-    Xóa ID khỏi SQLite của Scraper để ép buộc tải lại (Re-download).
+    Đưa file từ folder Scraper sang Temp: hardlink nếu cùng ổ đĩa (không copy
+    dữ liệu), ngược lại copyfile (Linux dùng sendfile, không qua Python).
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)  # file cũ (có thể là hardlink của lần tải trước)
+    try:
+        os.link(src, dst)
+    except (OSError, NotImplementedError):
+        shutil.copyfile(src, dst)
+
+def _db():
+    """
+    Kết nối SQLite dùng chung tới DB của Scraper (mở một lần, WAL mode).
+    Gọi trong _DB_LOCK. Returns: connection hoặc None nếu chưa có DB.
+    """
+    global _DB_CONN
+    if _DB_CONN is None and os.path.exists(DB_PATH):
+        _DB_CONN = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _DB_CONN.execute("PRAGMA journal_mode=WAL")
+        _DB_CONN.execute("PRAGMA synchronous=NORMAL")
+    return _DB_CONN
+
+def _close_db():
+    """Đóng kết nối SQLite dùng chung (Giải phóng file DB)."""
+    global _DB_CONN
+    with _DB_LOCK:
+        if _DB_CONN is not None:
+            try: _DB_CONN.close()
+            except: pass
+            _DB_CONN = None
+
+def _force_reset_ids_in_db(video_ids):
+    """
+    Xóa các ID khỏi SQLite của Scraper để ép buộc tải lại (Re-download).
+    Một transaction cho cả batch.
     """
-    if not os.path.exists(DB_PATH): return
     try:
-        with sqlite3.connect(DB_PATH) as conn:
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM objects WHERE id = ?", (video_id,))
+        with _DB_LOCK:
+            conn = _db()
+            if conn is None: return
+            conn.executemany("DELETE FROM objects WHERE id = ?", [(v,) for v in video_ids])
             conn.commit()
     except: 
         pass
 
-
+def _force_reset_id_in_db(video_id):
+    """
+    Xóa ID khỏi SQLite của Scraper để ép buộc tải lại (Re-download).
+    """
+    _force_reset_ids_in_db([video_id])
 
 
 # --- 4. XỬ LÝ METADATA ---
 
+# diversification_labels (lowercase) -> video_type
+_EDU_LABELS = frozenset({'education', 'learnontiktok'})
+_ENT_LABELS = frozenset({'entertainment', 'comedy'})
+
 def parse_metadata(raw_data, video_id, tiktok_url):
     """
     Chuẩn hóa dữ liệu JSON thô từ Scraper thành định dạng chuẩn của TikVault.
@@ -154,13 +225,16 @@ def parse_metadata(raw_data, video_id, tiktok_url):
         
         # Xác định video_type theo nội dung
         # Phân loại dựa trên diversification_labels từ TikTok
+        # (EDUCATE thắng ENTERTAIN nếu có cả hai)
         labels = vid.get('diversification_labels', [])
-        if any(l.lower() in ['education', 'learnontiktok'] for l in labels):
-            video_type = "EDUCATE"
-        elif any(l.lower() in ['entertainment', 'comedy'] for l in labels):
-            video_type = "ENTERTAIN"
-        else:
-            video_type = "VIDEO"  # Default
+        video_type = "VIDEO"  # Default
+        for label in labels:
+            label = label.lower()
+            if label in _EDU_LABELS:
+                video_type = "EDUCATE"
+                break
+            if label in _ENT_LABELS:
+                video_type = "ENTERTAIN"
         
         source_metadata = {
             "source_video_id": str(vid.get('id', video_id)),
@@ -172,7 +246,7 @@ def parse_metadata(raw_data, video_id, tiktok_url):
                 "height": file_meta.get('height', 0)
             },
             "has_audio": file_meta.get('has_original_audio', True) or file_meta.get('enable_audio_caption', True),
-            "tiktok_labels": vid.get('diversification_labels', []),
+            "tiktok_labels": labels,
             "suggested_words": vid.get('suggested_words', [])
         }
         
@@ -251,51 +325,59 @@ def parse_metadata(raw_data, video_id, tiktok_url):
 
 # --- 5. HÀM CHÍNH (MAIN FUNCTION) ---
 
-def download_tiktok_full_data(tiktok_url):
+def _raw_paths(video_id):
     """
-    Quy trình tải và xử lý video TikTok toàn diện:
-    1. Reset DB -> Scrape Video/Audio/JSON.
-    2. Di chuyển file từ folder Scraper sang folder Temp.
-    3. Xử lý Slideshow (Convert MP3 -> MP4 giả).
-    4. Parse Metadata chuẩn.
+    Đường dẫn file thô (trong folder scraper_data) của một video.
+    Cấu trúc của thư viện này lưu file theo tên ID.
+    Returns: (raw_video_path, raw_audio_path, raw_json_path)
     """
-    print(f"\n--- 📥 BẮT ĐẦU XỬ LÝ: {tiktok_url} ---")
+    return (
+        os.path.join(Config.SCRAPER_DIR, "content_files", f"tiktok_video_{video_id}.mp4"),
+        os.path.join(Config.SCRAPER_DIR, "content_files", f"tiktok_audio_{video_id}.mp3"),
+        os.path.join(Config.SCRAPER_DIR, "content_metadata", f"{video_id}.json"),
+    )
 
-    # 🛑 BLOCK PHOTO/SLIDESHOW LINKS
-    if "/photo/" in tiktok_url:
-        print(f"❌ [BLOCKED] Link Photo/Slideshow không được hỗ trợ: {tiktok_url}")
-        return None
+def _wait_for_files(path_groups, timeout=5):
+    """
+    Đợi đến khi mỗi nhóm có ít nhất một file tồn tại, tối đa `timeout` giây
+    (Fix lỗi hệ thống file ghi chậm trên máy chậm).
+    Linux + inotify_simple: thức dậy ngay khi file được ghi xong;
+    nếu không có thì poll mỗi giây.
+    """
+    def _pending(groups):
+        return [group for group in groups if not any(os.path.exists(p) for p in group)]
     
-    if not scraper_engine: init_scraper()
-    if not scraper_engine: return None
+    pending = _pending(path_groups)
+    if not pending: return
     
-    # B1: Lấy ID và Reset trạng thái tải cũ
-    video_id = extract_video_id(tiktok_url)
-    if not video_id:
-        print("❌ Lỗi: URL TikTok không hợp lệ.")
-        return None
-    _force_reset_id_in_db(video_id)
-
-    # B2: Chạy lệnh Scrape
-    try:
-        print(f"   🔄 Đang quét ID: {video_id}...")
-        scraper_engine.add_objects(ids=[video_id], type="content")
-        scraper_engine.scrape_pending(scrape_files=True)
-    except Exception as e:
-        # Lỗi "No more pending" là bình thường (nghĩa là đã tải xong list)
-        print(f"   ℹ️ Scraper Note: {e}")
-
-    # B3: Xác định đường dẫn file thô (trong folder scraper_data)
-    # Cấu trúc của thư viện này lưu file theo tên ID
-    raw_video_path = os.path.join(Config.SCRAPER_DIR, "content_files", f"tiktok_video_{video_id}.mp4")
-    raw_audio_path = os.path.join(Config.SCRAPER_DIR, "content_files", f"tiktok_audio_{video_id}.mp3")
-    raw_json_path = os.path.join(Config.SCRAPER_DIR, "content_metadata", f"{video_id}.json")
-
-    # Đợi một chút để hệ thống file kịp ghi (Fix lỗi trên máy chậm)
-    timeout = 0
-    while not (os.path.exists(raw_video_path) or os.path.exists(raw_audio_path)) and timeout < 5:
+    watch_dirs = {os.path.dirname(p) for group in pending for p in group}
+    if INotify is not None and all(os.path.isdir(d) for d in watch_dirs):
+        deadline = time.monotonic() + timeout
+        with INotify() as inotify:
+            for d in watch_dirs:
+                inotify.add_watch(d, inotify_flags.CLOSE_WRITE | inotify_flags.MOVED_TO)
+            # Kiểm tra lại sau khi đăng ký watch (file có thể vừa ghi xong)
+            pending = _pending(pending)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0: break
+                if inotify.read(timeout=int(remaining * 1000)):
+                    pending = _pending(pending)
+        return
+    
+    waited = 0
+    while pending and waited < timeout:
         time.sleep(1)
-        timeout += 1
+        waited += 1
+        pending = _pending(pending)
+
+def _finalize_download(video_id, tiktok_url, extract_audio=True):
+    """
+    Xử lý file đã tải của một video:
+    kiểm tra file -> chuyển sang TEMP -> tách nhạc (nếu extract_audio) -> parse Metadata.
+    Returns: dict kết quả cho Pipeline hoặc None nếu lỗi.
+    """
+    raw_video_path, raw_audio_path, raw_json_path = _raw_paths(video_id)
 
     # B4: Kiểm tra file tải về
     if not os.path.exists(raw_video_path):
@@ -305,18 +387,19 @@ def download_tiktok_full_data(tiktok_url):
              print(f"❌ Lỗi: Đây là Slideshow (đã bị block), không hỗ trợ xử lý.")
         return None
 
-    print("   🎥 Phát hiện: VIDEO (.mp4)")
+    print(f"   🎥 Phát hiện: VIDEO (.mp4) (ID: {video_id})")
 
     # B5: Di chuyển và Đổi tên sang thư mục TEMP
     final_video_path = os.path.join(Config.TEMP_DIR, f"{video_id}.mp4")
-    final_music_path = os.path.join(Config.TEMP_DIR, f"{video_id}_music.mp3")
+    final_music_path = os.path.join(Config.TEMP_DIR, f"{video_id}_music.mp3") if extract_audio else None
     final_meta_path = os.path.join(Config.TEMP_DIR, f"{video_id}_meta.json")
 
     try:
-        # 1. Copy Video MP4
-        shutil.copy(raw_video_path, final_video_path)
-        # 2. Tách nhạc ra file MP3 riêng (để nghe/upload)
-        _convert_video_to_audio(final_video_path, final_music_path)
+        # 1. Link/Copy Video MP4
+        _link_or_copy(raw_video_path, final_video_path)
+        # 2. Tách nhạc ra file MP3 riêng (để nghe/upload) - bỏ qua nếu caller không cần
+        if extract_audio:
+            _convert_video_to_audio(final_video_path, final_music_path)
     except Exception as e:
         print(f"❌ Lỗi copy/convert file: {e}")
         return None
@@ -327,15 +410,26 @@ def download_tiktok_full_data(tiktok_url):
             print("❌ Lỗi: Không tìm thấy file Metadata JSON.")
             return None
             
-        with open(raw_json_path, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
+        if orjson:
+            # Parse thẳng từ page cache (mmap), không tạo bản copy bytes
+            with open(raw_json_path, 'rb') as f, \
+                 mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                 memoryview(mm) as view:
+                raw_data = orjson.loads(view)
+        else:
+            with open(raw_json_path, 'r', encoding='utf-8') as f:
+                raw_data = json.load(f)
 
         # Parse về định dạng chuẩn
         clean_metadata = parse_metadata(raw_data, video_id, tiktok_url)
         
         # Lưu file Meta đã xử lý vào Temp
-        with open(final_meta_path, 'w', encoding='utf-8') as f:
-            json.dump(clean_metadata, f, ensure_ascii=False, indent=4)
+        if orjson:
+            with open(final_meta_path, 'wb') as f:
+                f.write(orjson.dumps(clean_metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(final_meta_path, 'w', encoding='utf-8') as f:
+                json.dump(clean_metadata, f, ensure_ascii=False, indent=4)
 
         print(f"   ✅ Xử lý hoàn tất: {clean_metadata.get('title', 'No Title')[:40]}...")
         
@@ -350,4 +444,70 @@ def download_tiktok_full_data(tiktok_url):
 
     except Exception as e:
         print(f"❌ Lỗi xử lý Metadata: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def download_tiktok_batch(tiktok_urls, extract_audio: bool = True):
+    """
+    Tải nhiều video TikTok trong một lần chạy Scraper:
+    1. Lấy ID + Reset DB cho tất cả URL.
+    2. add_objects một lần với toàn bộ ID -> scrape_pending một lần.
+    3. Đợi file của tất cả video, rồi xử lý từng video (TEMP + Metadata).
+    
+    extract_audio=False: không tách MP3 (music_path=None), dùng khi chỉ cần video.
+    
+    Returns: list kết quả (cùng thứ tự với tiktok_urls), None cho URL lỗi.
+    """
+    results = [None] * len(tiktok_urls)
+    
+    # B1: Lấy ID và Reset trạng thái tải cũ
+    jobs = []  # (index, video_id, url)
+    for index, tiktok_url in enumerate(tiktok_urls):
+        print(f"\n--- 📥 BẮT ĐẦU XỬ LÝ: {tiktok_url} ---")
+        
+        # 🛑 BLOCK PHOTO/SLIDESHOW LINKS
+        if "/photo/" in tiktok_url:
+            print(f"❌ [BLOCKED] Link Photo/Slideshow không được hỗ trợ: {tiktok_url}")
+            continue
+        
+        video_id = extract_video_id(tiktok_url)
+        if not video_id:
+            print(f"❌ Lỗi: URL TikTok không hợp lệ: {tiktok_url}")
+            continue
+        jobs.append((index, video_id, tiktok_url))
+    
+    if not jobs: return results
+    if not ensure_scraper_ready(): return results
+    
+    video_ids = list(dict.fromkeys(video_id for _, video_id, _ in jobs))
+    _force_reset_ids_in_db(video_ids)
+
+    # B2: Chạy lệnh Scrape (một lần cho cả batch)
+    try:
+        print(f"   🔄 Đang quét {len(video_ids)} ID: {', '.join(video_ids)}...")
+        scraper_engine.add_objects(ids=video_ids, type="content")
+        scraper_engine.scrape_pending(scrape_files=True)
+    except Exception as e:
+        # Lỗi "No more pending" là bình thường (nghĩa là đã tải xong list)
+        print(f"   ℹ️ Scraper Note: {e}")
+
+    # B3: Đợi file video (hoặc audio) của từng ID
+    _wait_for_files([_raw_paths(video_id)[:2] for video_id in video_ids])
+
+    # B4-B6: Xử lý từng video
+    for index, video_id, tiktok_url in jobs:
+        results[index] = _finalize_download(video_id, tiktok_url, extract_audio)
+    
+    return results
+
+def download_tiktok_full_data(tiktok_url, extract_audio: bool = True):
+    """
+    Quy trình tải và xử lý video TikTok toàn diện:
+    1. Reset DB -> Scrape Video/Audio/JSON.
+    2. Di chuyển file từ folder Scraper sang folder Temp.
+    3. Xử lý Slideshow (Convert MP3 -> MP4 giả).
+    4. Parse Metadata chuẩn.
+    (= download_tiktok_batch với một URL)
+    
+    extract_audio=False: bỏ qua bước tách MP3, music_path=None.
+    """
+    return download_tiktok_batch([tiktok_url], extract_audio=extract_audio)[0]
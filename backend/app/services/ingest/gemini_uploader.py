@@ -15,24 +15,89 @@ Features:
 import os
 import sys
 import time
-import mimetypes
-from typing import Dict, Optional
+import json
+import asyncio
+import logging
+import random
+import stat
+import hashlib
+import threading
+import functools
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from datetime import datetime
 
+# httpx (dependency của google-genai): upload resumable trực tiếp
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# h2: HTTP/2 cho httpx (tùy chọn)
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# blake3: hash file nhanh (SIMD) cho dedup upload (tùy chọn, fallback blake2b)
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+
 # Ensure backend is in path
 BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 if BACKEND_DIR not in sys.path:
     sys.path.insert(0, BACKEND_DIR)
 
 from app.core.config import Config
+from app.core.async_utils import run_sync
+from app.services.ingest.media_types import SUPPORTED_VIDEO_MIMES, get_mime_type
 
-# Import Google GenAI SDK
-try:
-    from google import genai
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
-    print("⚠️ [GEMINI_UPLOADER] google-genai SDK not installed. Run: pip install google-genai")
+logger = logging.getLogger(__name__)
+
+# Google GenAI SDK: import nặng -> import lazy ở lần dùng đầu tiên (_get_genai)
+_GENAI = None
+
+
+def _get_genai():
+    """
+    Import google-genai SDK (một lần, cache lại ở module).
+    
+    Raises:
+        ImportError: Nếu chưa cài google-genai
+    """
+    global _GENAI
+    if _GENAI is None:
+        try:
+            from google import genai
+        except ImportError:
+            raise ImportError("google-genai SDK not installed. Run: pip install google-genai")
+        _GENAI = genai
+    return _GENAI
+
+
+@functools.lru_cache(maxsize=4)
+def _shared_client(api_key: str):
+    """
+    genai.Client dùng chung theo API key: mọi GeminiFileUploader (và
+    upload_video_to_gemini) dùng lại cùng connection pool keep-alive thay vì
+    bắt tay TCP+TLS mới cho mỗi lần upload/get/delete/list.
+    """
+    genai = _get_genai()
+    
+    if httpx is not None:
+        client_args = {"limits": httpx.Limits(max_keepalive_connections=16, keepalive_expiry=60)}
+        if HTTP2_AVAILABLE:
+            client_args["http2"] = True
+        try:
+            return genai.Client(api_key=api_key, http_options={"client_args": client_args})
+        except Exception:
+            pass  # SDK cũ chưa có http_options.client_args
+    
+    return genai.Client(api_key=api_key)
 
 
 # ============================================================
@@ -78,22 +143,86 @@ PROCESSING_TIMEOUT_SECONDS = 300  # 5 minutes
 UPLOAD_RETRY_COUNT = 3
 UPLOAD_RETRY_DELAY_SECONDS = 2
 
-# Polling interval for processing state
-POLLING_INTERVAL_SECONDS = 5
+# Polling processing state: exponential backoff 0.5s, 1s, 2s, ... (max 15s) + jitter
+POLLING_INITIAL_DELAY_SECONDS = 0.5
+POLLING_MAX_DELAY_SECONDS = 15.0
+POLLING_JITTER_SECONDS = 0.25
+
+# Resumable upload (X-Goog-Upload protocol)
+GEMINI_UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MiB (bội số của 256 KiB)
+UPLOAD_HTTP_TIMEOUT_SECONDS = 120
+UPLOAD_SESSION_SUFFIX = ".gemini_upload.json"  # sidecar: session URL + offset để resume
+
+# Dedup upload: hash nội dung file -> file đã upload (Gemini giữ file 48h)
+UPLOAD_CACHE_FILE = os.path.join(Config.CACHE_DIR, "gemini_uploads.json")
+UPLOAD_CACHE_DEFAULT_TTL_SECONDS = 47 * 3600
+UPLOAD_CACHE_MIN_REMAINING_SECONDS = 600  # bỏ entry sắp hết hạn
+HASH_READ_SIZE = 1024 * 1024  # 1 MiB
 
-# Supported video MIME types
-SUPPORTED_VIDEO_MIMES = {
-    "video/mp4",
-    "video/mpeg",
-    "video/mov",
-    "video/avi",
-    "video/x-flv",
-    "video/mpg",
-    "video/webm",
-    "video/wmv",
-    "video/3gpp",
-    "video/quicktime",
-}
+# Bulk get/delete: số request song song trên client dùng chung
+BULK_REQUEST_CONCURRENCY = 16
+
+
+# ============================================================
+# UPLOAD DEDUP CACHE
+# ============================================================
+
+_UPLOAD_CACHE_LOCK = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1024)
+def _file_digest(real_path: str, size: int, mtime_ns: int) -> str:
+    """Hash toàn bộ nội dung file (blake3 nếu có, else blake2b); cache theo (path, size, mtime)."""
+    hasher = blake3() if blake3 is not None else hashlib.blake2b(digest_size=32)
+    with open(real_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_READ_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _hash_file(video_path: str) -> str:
+    """Digest nội dung video (không hash lại nếu file chưa đổi)."""
+    st = os.stat(video_path)
+    return _file_digest(os.path.realpath(video_path), st.st_size, st.st_mtime_ns)
+
+
+def _read_upload_cache() -> Dict:
+    try:
+        with open(UPLOAD_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _update_upload_cache(digest: str, entry: Optional[Dict]) -> None:
+    """Ghi (entry) hoặc xóa (None) một digest; ghi atomic qua file tạm + os.replace."""
+    with _UPLOAD_CACHE_LOCK:
+        cache = _read_upload_cache()
+        now = time.time()
+        cache = {k: v for k, v in cache.items() if v.get("expires_at", 0) > now}
+        if entry is None:
+            cache.pop(digest, None)
+        else:
+            cache[digest] = entry
+        try:
+            os.makedirs(os.path.dirname(UPLOAD_CACHE_FILE), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(UPLOAD_CACHE_FILE), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, UPLOAD_CACHE_FILE)
+        except OSError:
+            pass
+
+
+def _evict_upload_cache(file_name: str) -> None:
+    """Xóa entry dedup trỏ tới file_name (file đã bị xóa khỏi Gemini)."""
+    with _UPLOAD_CACHE_LOCK:
+        cache = _read_upload_cache()
+        digest_by_file_name = {entry.get("file_name"): digest for digest, entry in cache.items()}
+        if file_name not in digest_by_file_name:
+            return
+    _update_upload_cache(digest_by_file_name[file_name], None)
 
 
 # ============================================================
@@ -122,26 +251,29 @@ class GeminiFileUploader:
         Raises:
             AuthenticationError: Nếu không có API key
         """
-        if not GENAI_AVAILABLE:
-            raise ImportError("google-genai SDK not installed. Run: pip install google-genai")
+        _get_genai()  # ImportError ngay nếu chưa cài SDK
         
         self.api_key = api_key or Config.GEMINI_API_KEY
         
         if not self.api_key:
             raise AuthenticationError("Missing GEMINI_API_KEY. Set it in .env file.")
         
-        # Initialize GenAI client
-        self.client = genai.Client(api_key=self.api_key)
+        # GenAI client (dùng chung, keep-alive)
+        self.client = _shared_client(self.api_key)
         
-        print(f"✅ [GEMINI_UPLOADER] Initialized with API key")
+        logger.info("✅ [GEMINI_UPLOADER] Initialized with API key")
     
-    def upload_video(self, video_path: str, wait_for_ready: bool = True) -> Dict:
+    def upload_video(self, video_path: str, wait_for_ready: bool = True, use_cache: bool = True) -> Dict:
         """
         Upload video lên Gemini File API.
         
+        Nếu cùng nội dung file đã được upload trước đó (hash khớp) và file
+        trên Gemini vẫn ACTIVE, trả về file đó luôn thay vì upload lại.
+        
         Args:
             video_path: Đường dẫn file video local
             wait_for_ready: True = chờ file ACTIVE trước khi return
+            use_cache: False = luôn upload lại (bỏ qua dedup)
         
         Returns:
             {
@@ -163,24 +295,28 @@ class GeminiFileUploader:
         """
         start_time = time.time()
         
-        print(f"\n{'='*60}")
-        print(f"📤 [GEMINI_UPLOADER] Starting upload")
-        print(f"{'='*60}")
-        print(f"   File: {os.path.basename(video_path)}")
-        
         try:
-            # Step 1: Validate file
-            self._validate_video(video_path)
-            
-            # Step 2: Detect MIME type
+            # Step 1: Detect MIME type (một lần, dùng cho cả validate + upload)
             mime_type = self._get_mime_type(video_path)
-            print(f"   MIME: {mime_type}")
+            logger.info("📤 [GEMINI_UPLOADER] Starting upload: %s (%s)", os.path.basename(video_path), mime_type)
+            
+            # Step 2: Validate file
+            file_size = self._validate_video(video_path, mime_type)
+            
+            # Step 2b: Dedup - file cùng nội dung đã upload và còn ACTIVE
+            digest = None
+            if use_cache:
+                digest = _hash_file(video_path)
+                cached = self._get_cached_upload(digest)
+                if cached is not None:
+                    cached["upload_time_ms"] = int((time.time() - start_time) * 1000)
+                    logger.info("♻️ [GEMINI_UPLOADER] Reusing uploaded file: %s", cached["file_name"])
+                    return cached
             
             # Step 3: Upload with retry
             uploaded_file = self._upload_with_retry(video_path, mime_type)
             
-            print(f"   ✅ Upload successful: {uploaded_file.name}")
-            print(f"   State: {uploaded_file.state}")
+            logger.info("✅ [GEMINI_UPLOADER] Uploaded %s (state: %s)", uploaded_file.name, uploaded_file.state)
             
             # Step 4: Wait for ACTIVE state if requested
             if wait_for_ready:
@@ -194,28 +330,37 @@ class GeminiFileUploader:
                 "file_uri": uploaded_file.uri,
                 "file_name": uploaded_file.name,
                 "display_name": getattr(uploaded_file, 'display_name', os.path.basename(video_path)),
-                "mime_type": uploaded_file.mime_type,
+                "mime_type": uploaded_file.mime_type or mime_type,
                 "state": str(uploaded_file.state),
-                "size_bytes": getattr(uploaded_file, 'size_bytes', os.path.getsize(video_path)),
+                "size_bytes": getattr(uploaded_file, 'size_bytes', None) or file_size,
                 "upload_time_ms": upload_time_ms,
                 "uploaded_at": datetime.now().isoformat()
             }
             
-            print(f"\n✅ [GEMINI_UPLOADER] Complete in {upload_time_ms}ms")
-            print(f"   URI: {result['file_uri']}")
+            if digest is not None and "ACTIVE" in result["state"].upper():
+                expiration = getattr(uploaded_file, 'expiration_time', None)
+                _update_upload_cache(digest, {
+                    "file_name": result["file_name"],
+                    "file_uri": result["file_uri"],
+                    "display_name": result["display_name"],
+                    "mime_type": result["mime_type"],
+                    "size_bytes": result["size_bytes"],
+                    "expires_at": expiration.timestamp() if hasattr(expiration, "timestamp")
+                                  else time.time() + UPLOAD_CACHE_DEFAULT_TTL_SECONDS
+                })
+            
+            logger.info("✅ [GEMINI_UPLOADER] Complete in %dms: %s", upload_time_ms, result["file_uri"])
             
             return result
             
         except (FileValidationError, UploadFailedError, ProcessingTimeoutError) as e:
             # Known errors - re-raise
-            print(f"\n❌ [GEMINI_UPLOADER] Error: {e}")
+            logger.error("❌ [GEMINI_UPLOADER] Error: %s", e)
             raise
             
         except Exception as e:
             # Unexpected errors
-            print(f"\n❌ [GEMINI_UPLOADER] Unexpected error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ [GEMINI_UPLOADER] Unexpected error uploading %s: %s", video_path, e)
             
             return {
                 "success": False,
@@ -224,25 +369,61 @@ class GeminiFileUploader:
                 "upload_time_ms": int((time.time() - start_time) * 1000)
             }
     
-    def _validate_video(self, video_path: str) -> None:
+    def _get_cached_upload(self, digest: str) -> Optional[Dict]:
+        """
+        Result của lần upload trước cho digest này nếu file trên Gemini
+        còn hạn và vẫn ACTIVE; None nếu phải upload lại.
+        """
+        entry = _read_upload_cache().get(digest)
+        if not entry or entry.get("expires_at", 0) < time.time() + UPLOAD_CACHE_MIN_REMAINING_SECONDS:
+            return None
+        
+        try:
+            file_info = self.client.files.get(name=entry["file_name"])
+        except Exception:
+            file_info = None
+        
+        if file_info is None or "ACTIVE" not in str(file_info.state).upper():
+            _update_upload_cache(digest, None)
+            return None
+        
+        return {
+            "success": True,
+            "file_uri": file_info.uri or entry["file_uri"],
+            "file_name": file_info.name,
+            "display_name": entry.get("display_name"),
+            "mime_type": file_info.mime_type or entry.get("mime_type"),
+            "state": str(file_info.state),
+            "size_bytes": entry.get("size_bytes"),
+            "uploaded_at": datetime.now().isoformat(),
+            "deduplicated": True
+        }
+    
+    def _validate_video(self, video_path: str, mime_type: Optional[str] = None) -> int:
         """
         Validate file trước khi upload.
         
+        Args:
+            mime_type: MIME đã detect (None = tự detect)
+        
+        Returns:
+            Kích thước file (bytes)
+        
         Raises:
             FileValidationError: Nếu file không hợp lệ
         """
-        print(f"   🔍 Validating file...")
-        
-        # Check file exists
-        if not os.path.exists(video_path):
+        # Một lần stat: tồn tại + là file + kích thước
+        try:
+            st = os.stat(video_path)
+        except FileNotFoundError:
             raise FileValidationError(f"File not found: {video_path}")
         
         # Check is file (not directory)
-        if not os.path.isfile(video_path):
+        if not stat.S_ISREG(st.st_mode):
             raise FileValidationError(f"Path is not a file: {video_path}")
         
         # Check file size
-        file_size = os.path.getsize(video_path)
+        file_size = st.st_size
         
         if file_size == 0:
             raise FileValidationError("File is empty (0 bytes)")
@@ -254,36 +435,21 @@ class GeminiFileUploader:
             )
         
         # Check MIME type
-        mime_type = self._get_mime_type(video_path)
+        mime_type = mime_type or self._get_mime_type(video_path)
         
         if mime_type not in SUPPORTED_VIDEO_MIMES:
             raise FileValidationError(
                 f"Unsupported video format: {mime_type}. "
-                f"Supported: {', '.join(SUPPORTED_VIDEO_MIMES)}"
+                f"Supported: {', '.join(sorted(SUPPORTED_VIDEO_MIMES))}"
             )
         
-        print(f"   ✅ Validation passed ({file_size / (1024*1024):.1f}MB)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("✅ [GEMINI_UPLOADER] Validation passed (%.1fMB)", file_size / (1024 * 1024))
+        return file_size
     
     def _get_mime_type(self, video_path: str) -> str:
         """Detect MIME type từ file extension."""
-        mime_type, _ = mimetypes.guess_type(video_path)
-        
-        # Default fallback for common video extensions
-        if not mime_type:
-            ext = os.path.splitext(video_path)[1].lower()
-            mime_map = {
-                ".mp4": "video/mp4",
-                ".mov": "video/quicktime",
-                ".avi": "video/avi",
-                ".webm": "video/webm",
-                ".mkv": "video/x-matroska",
-                ".flv": "video/x-flv",
-                ".wmv": "video/x-ms-wmv",
-                ".3gp": "video/3gpp",
-            }
-            mime_type = mime_map.get(ext, "video/mp4")
-        
-        return mime_type
+        return get_mime_type(video_path)
     
     def _upload_with_retry(self, video_path: str, mime_type: str):
         """
@@ -299,7 +465,12 @@ class GeminiFileUploader:
         
         for attempt in range(1, UPLOAD_RETRY_COUNT + 1):
             try:
-                print(f"   📤 Upload attempt {attempt}/{UPLOAD_RETRY_COUNT}...")
+                logger.debug("📤 [GEMINI_UPLOADER] Upload attempt %d/%d", attempt, UPLOAD_RETRY_COUNT)
+                
+                if httpx is not None:
+                    # Resumable upload: lần retry tiếp tục từ offset đã gửi
+                    file_name = run_sync(self._upload_resumable(video_path, mime_type))
+                    return self.client.files.get(name=file_name)
                 
                 # Upload using GenAI SDK
                 uploaded_file = self.client.files.upload(
@@ -314,19 +485,223 @@ class GeminiFileUploader:
                 
             except Exception as e:
                 last_error = e
-                print(f"   ⚠️ Attempt {attempt} failed: {e}")
+                logger.warning("⚠️ [GEMINI_UPLOADER] Attempt %d failed: %s", attempt, e, exc_info=True)
                 
                 if attempt < UPLOAD_RETRY_COUNT:
-                    print(f"   ⏳ Retrying in {UPLOAD_RETRY_DELAY_SECONDS}s...")
+                    logger.info("⏳ [GEMINI_UPLOADER] Retrying in %ss", UPLOAD_RETRY_DELAY_SECONDS)
                     time.sleep(UPLOAD_RETRY_DELAY_SECONDS)
         
         raise UploadFailedError(
             f"Upload failed after {UPLOAD_RETRY_COUNT} attempts. Last error: {last_error}"
         )
     
+    async def _upload_resumable(self, video_path: str, mime_type: str) -> str:
+        """
+        Upload file theo từng chunk UPLOAD_CHUNK_SIZE qua resumable upload
+        endpoint (không đọc cả file vào RAM).
+        
+        Session URL + offset được lưu vào sidecar JSON cạnh file video, nên
+        lần gọi sau (retry) hỏi server offset đã nhận (query) và gửi tiếp
+        thay vì upload lại từ đầu.
+        
+        Returns:
+            Tên file trên Gemini (files/...)
+        """
+        st = os.stat(video_path)
+        size = st.st_size
+        session_path = video_path + UPLOAD_SESSION_SUFFIX
+        
+        async with httpx.AsyncClient(
+            http2=HTTP2_AVAILABLE,
+            timeout=UPLOAD_HTTP_TIMEOUT_SECONDS,
+            headers={"x-goog-api-key": self.api_key}
+        ) as client:
+            session_url, offset = await self._resume_session(client, session_path, size, st.st_mtime_ns)
+            
+            if session_url is None:
+                response = await client.post(
+                    GEMINI_UPLOAD_URL,
+                    headers={
+                        "X-Goog-Upload-Protocol": "resumable",
+                        "X-Goog-Upload-Command": "start",
+                        "X-Goog-Upload-Header-Content-Length": str(size),
+                        "X-Goog-Upload-Header-Content-Type": mime_type,
+                    },
+                    json={"file": {"display_name": os.path.basename(video_path)}}
+                )
+                response.raise_for_status()
+                session_url = response.headers["x-goog-upload-url"]
+                offset = 0
+            else:
+                logger.info("↩️ [GEMINI_UPLOADER] Resuming upload at %.1fMB", offset / (1024 * 1024))
+            
+            response = await self._upload_parallel_chunks(
+                client, video_path, session_url, offset, size,
+                on_progress=lambda sent: self._save_session(session_path, session_url, sent, size, st.st_mtime_ns)
+            )
+        
+        # Upload xong -> session không còn dùng được
+        try:
+            os.remove(session_path)
+        except OSError:
+            pass
+        
+        return response.json()["file"]["name"]
+    
+    async def _upload_parallel_chunks(
+        self,
+        client,
+        video_path: str,
+        session_url: str,
+        offset: int,
+        size: int,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        on_progress=None
+    ):
+        """
+        Gửi file từ `offset` đến hết theo từng chunk, chunk cuối kèm finalize.
+        
+        Server chỉ nhận chunk đúng offset đã nhận (không gửi song song nhiều
+        chunk của cùng một session được), nên phần song song là: đọc chunk kế
+        tiếp từ đĩa (thread) trong lúc chunk hiện tại đang gửi qua mạng.
+        
+        Đọc chunk bằng os.pread trên file unbuffered (1 syscall, không qua
+        buffer của BufferedReader, không seek); Windows không có pread thì
+        seek + read.
+        
+        Returns:
+            Response của request finalize
+        """
+        with open(video_path, "rb", buffering=0) as f:
+            if hasattr(os, "posix_fadvise"):
+                # Hint đọc tuần tự -> kernel readahead mạnh hơn
+                try:
+                    os.posix_fadvise(f.fileno(), offset, 0, os.POSIX_FADV_SEQUENTIAL)
+                except OSError:
+                    pass
+            
+            if hasattr(os, "pread"):
+                def read_at(position):
+                    return os.pread(f.fileno(), chunk_size, position)
+            else:
+                def read_at(position):
+                    f.seek(position)
+                    return f.read(chunk_size)
+            
+            next_read = asyncio.ensure_future(asyncio.to_thread(read_at, offset))
+            try:
+                while True:
+                    chunk = await next_read
+                    if not chunk:
+                        raise UploadFailedError(f"File shrank during upload at offset {offset}: {video_path}")
+                    last = offset + len(chunk) >= size
+                    if not last:
+                        next_read = asyncio.ensure_future(asyncio.to_thread(read_at, offset + len(chunk)))
+                    
+                    if on_progress:
+                        on_progress(offset)
+                    
+                    response = await client.post(
+                        session_url,
+                        content=chunk,
+                        headers={
+                            "X-Goog-Upload-Command": "upload, finalize" if last else "upload",
+                            "X-Goog-Upload-Offset": str(offset),
+                        }
+                    )
+                    response.raise_for_status()
+                    offset += len(chunk)
+                    
+                    if last:
+                        return response
+            finally:
+                # Lỗi giữa chừng: chờ lượt đọc đang chạy xong trước khi đóng file
+                if not next_read.done():
+                    await asyncio.wait([next_read])
+    
+    async def _resume_session(self, client, session_path: str, size: int, mtime_ns: int):
+        """
+        Đọc sidecar của lần upload trước và hỏi server offset đã nhận.
+        
+        Returns:
+            (session_url, offset), hoặc (None, 0) nếu phải bắt đầu session mới
+        """
+        try:
+            with open(session_path, "r", encoding="utf-8") as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            return None, 0
+        
+        # File đã thay đổi -> session cũ không còn đúng
+        if session.get("size") != size or session.get("mtime_ns") != mtime_ns:
+            return None, 0
+        
+        try:
+            response = await client.post(
+                session["session_url"],
+                headers={"X-Goog-Upload-Command": "query"}
+            )
+            response.raise_for_status()
+            if response.headers.get("x-goog-upload-status") != "active":
+                return None, 0
+            return session["session_url"], int(response.headers.get("x-goog-upload-size-received", 0))
+        except Exception:
+            return None, 0
+    
+    @staticmethod
+    def _save_session(session_path: str, session_url: str, offset: int, size: int, mtime_ns: int) -> None:
+        """Ghi sidecar (session URL + offset) để retry có thể resume."""
+        try:
+            with open(session_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "session_url": session_url,
+                    "offset": offset,
+                    "size": size,
+                    "mtime_ns": mtime_ns
+                }, f)
+        except OSError:
+            pass
+    
+    @staticmethod
+    def _poll_delay(attempt: int) -> float:
+        """Backoff delay cho lần poll thứ `attempt` (0, 1, 2, ...)."""
+        delay = min(POLLING_MAX_DELAY_SECONDS, POLLING_INITIAL_DELAY_SECONDS * (2 ** min(attempt, 5)))
+        return delay + random.uniform(0, POLLING_JITTER_SECONDS)
+    
+    @staticmethod
+    def _check_active(file_info, elapsed: float) -> bool:
+        """
+        True nếu file ACTIVE, False nếu còn PROCESSING.
+        
+        Raises:
+            UploadFailedError: Nếu processing FAILED
+            ProcessingTimeoutError: Nếu quá PROCESSING_TIMEOUT_SECONDS
+        """
+        state = str(file_info.state)
+        
+        # Check if ACTIVE (ready)
+        if "ACTIVE" in state.upper():
+            logger.info("✅ [GEMINI_UPLOADER] %s is ACTIVE and ready", file_info.name)
+            return True
+        
+        # Check for FAILED state
+        if "FAILED" in state.upper():
+            raise UploadFailedError(f"File processing failed: {state}")
+        
+        # Check timeout
+        if elapsed > PROCESSING_TIMEOUT_SECONDS:
+            raise ProcessingTimeoutError(
+                f"File stuck in {state} state for {elapsed:.0f}s. "
+                f"Timeout: {PROCESSING_TIMEOUT_SECONDS}s"
+            )
+        
+        logger.debug("⏳ [GEMINI_UPLOADER] State: %s (%.0fs elapsed)", state, elapsed)
+        return False
+    
     def _wait_for_active(self, file_name: str):
         """
-        Poll trạng thái file đến khi ACTIVE.
+        Poll trạng thái file đến khi ACTIVE (backoff: video ngắn xong sau
+        lần poll đầu, video dài không bị poll dồn dập).
         
         Args:
             file_name: Tên file trên Gemini (files/...)
@@ -337,35 +712,134 @@ class GeminiFileUploader:
         Raises:
             ProcessingTimeoutError: Nếu timeout
         """
-        print(f"   ⏳ Waiting for file to be ready...")
+        logger.debug("⏳ [GEMINI_UPLOADER] Waiting for %s to be ready", file_name)
         
         start_time = time.time()
+        attempt = 0
         
         while True:
             # Get current file state
             file_info = self.client.files.get(name=file_name)
-            state = str(file_info.state)
+            if self._check_active(file_info, time.time() - start_time):
+                return file_info
             
-            # Check if ACTIVE (ready)
-            if "ACTIVE" in state.upper():
-                print(f"   ✅ File is ACTIVE and ready")
+            # Still processing - wait and poll again
+            time.sleep(self._poll_delay(attempt))
+            attempt += 1
+    
+    async def wait_for_active_async(self, file_name: str):
+        """
+        Giống _wait_for_active nhưng chờ bằng asyncio.sleep, để nhiều upload
+        cùng poll trong một event loop mà không giữ thread.
+        """
+        start_time = time.time()
+        attempt = 0
+        
+        while True:
+            file_info = await asyncio.to_thread(self.client.files.get, name=file_name)
+            if self._check_active(file_info, time.time() - start_time):
                 return file_info
             
-            # Check for FAILED state
-            if "FAILED" in state.upper():
-                raise UploadFailedError(f"File processing failed: {state}")
+            await asyncio.sleep(self._poll_delay(attempt))
+            attempt += 1
+    
+    def batch_upload_videos(
+        self,
+        video_paths: List[str],
+        prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        concurrency: int = 4
+    ) -> Dict:
+        """
+        Upload nhiều video song song (dùng chung connection pool), rồi gom
+        thành một file JSONL cho Gemini Batch API.
+        
+        Mỗi dòng JSONL có "key" riêng ("{index:04d}_{tên file}") - Batch API
+        không giữ thứ tự, kết quả phải ghép lại theo key.
+        
+        Args:
+            video_paths: Danh sách file video
+            prompt: Prompt thêm vào mỗi request (optional)
+            model: Nếu có -> tạo batch job (client.batches.create) với model này
+            concurrency: Số upload chạy cùng lúc
+        
+        Returns:
+            {
+                "success": True/False,
+                "uploads": [upload result per video, cùng thứ tự video_paths],
+                "keys": ["0000_a.mp4", ...],
+                "batch_input_file": "files/..." | None,
+                "batch_name": "batches/..." | None
+            }
+        """
+        if not video_paths:
+            return {"success": False, "uploads": [], "keys": [], "batch_input_file": None, "batch_name": None}
+        
+        def _upload_one(video_path):
+            try:
+                return self.upload_video(video_path)
+            except GeminiUploadError as e:
+                return {"success": False, "error": str(e), "error_type": type(e).__name__}
+        
+        # Step 1: Upload các video song song
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(video_paths)))) as pool:
+            uploads = list(pool.map(_upload_one, video_paths))
+        
+        keys = [f"{i:04d}_{os.path.basename(p)}" for i, p in enumerate(video_paths)]
+        result = {
+            "success": False,
+            "uploads": uploads,
+            "keys": keys,
+            "batch_input_file": None,
+            "batch_name": None
+        }
+        
+        # Step 2: Ghi JSONL (chỉ các video upload thành công)
+        jsonl_path = None
+        try:
+            with tempfile.NamedTemporaryFile("w", suffix=".jsonl", encoding="utf-8", delete=False) as f:
+                jsonl_path = f.name
+                rows = 0
+                for key, upload in zip(keys, uploads):
+                    if not upload.get("success"):
+                        continue
+                    parts = [{"fileData": {"mimeType": upload["mime_type"], "fileUri": upload["file_uri"]}}]
+                    if prompt:
+                        parts.append({"text": prompt})
+                    f.write(json.dumps({"key": key, "request": {"contents": [{"parts": parts}]}}) + "\n")
+                    rows += 1
+            
+            if rows == 0:
+                result["error"] = "No video uploaded successfully"
+                return result
+            
+            # Step 3: Upload JSONL + tạo batch job (nếu có model)
+            batch_file = self.client.files.upload(
+                file=jsonl_path,
+                config={"mime_type": "application/jsonl", "display_name": os.path.basename(jsonl_path)}
+            )
+            result["batch_input_file"] = batch_file.name
             
-            # Check timeout
-            elapsed = time.time() - start_time
-            if elapsed > PROCESSING_TIMEOUT_SECONDS:
-                raise ProcessingTimeoutError(
-                    f"File stuck in {state} state for {elapsed:.0f}s. "
-                    f"Timeout: {PROCESSING_TIMEOUT_SECONDS}s"
+            if model:
+                batch_job = self.client.batches.create(
+                    model=model,
+                    src=batch_file.name,
+                    config={"display_name": f"tiktok-batch-{int(time.time())}"}
                 )
+                result["batch_name"] = batch_job.name
             
-            # Still processing - wait and poll again
-            print(f"   ⏳ State: {state} ({elapsed:.0f}s elapsed)...")
-            time.sleep(POLLING_INTERVAL_SECONDS)
+            result["success"] = True
+            logger.info("✅ [GEMINI_UPLOADER] Batch: %d/%d videos -> %s", rows, len(video_paths), result["batch_input_file"])
+            
+        except Exception as e:
+            result["error"] = str(e)
+            logger.warning("⚠️ [GEMINI_UPLOADER] Batch upload failed: %s", e)
+        
+        finally:
+            if jsonl_path and os.path.exists(jsonl_path):
+                os.remove(jsonl_path)
+        
+        return result
     
     def get_file_info(self, file_name: str) -> Dict:
         """
@@ -423,10 +897,11 @@ class GeminiFileUploader:
         """
         try:
             self.client.files.delete(name=file_name)
-            print(f"   🗑️ Deleted file: {file_name}")
+            _evict_upload_cache(file_name)
+            logger.info("🗑️ [GEMINI_UPLOADER] Deleted file: %s", file_name)
             return True
         except Exception as e:
-            print(f"   ⚠️ Failed to delete file: {e}")
+            logger.warning("⚠️ [GEMINI_UPLOADER] Failed to delete file %s: %s", file_name, e)
             return False
     
     def list_files(self) -> list:
@@ -448,8 +923,57 @@ class GeminiFileUploader:
                 for f in files
             ]
         except Exception as e:
-            print(f"   ⚠️ Failed to list files: {e}")
+            logger.warning("⚠️ [GEMINI_UPLOADER] Failed to list files: %s", e)
             return []
+    
+    # ------------------------------------------------------------
+    # Async / bulk: nhiều request song song trên connection pool dùng chung
+    # ------------------------------------------------------------
+    
+    async def get_file_info_async(self, file_name: str) -> Dict:
+        """Bản async của get_file_info (SDK sync chạy trên thread)."""
+        return await asyncio.to_thread(self.get_file_info, file_name)
+    
+    async def delete_file_async(self, file_name: str) -> bool:
+        """Bản async của delete_file."""
+        return await asyncio.to_thread(self.delete_file, file_name)
+    
+    async def list_files_async(self) -> list:
+        """Bản async của list_files."""
+        return await asyncio.to_thread(self.list_files)
+    
+    @staticmethod
+    async def _gather_limited(func, file_names: List[str], concurrency: int) -> list:
+        """Chạy func(name) cho mọi file, tối đa `concurrency` request cùng lúc (giữ thứ tự)."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def run(name):
+            async with semaphore:
+                return await func(name)
+        
+        return await asyncio.gather(*(run(name) for name in file_names))
+    
+    def bulk_get_file_info(self, file_names: List[str], concurrency: int = BULK_REQUEST_CONCURRENCY) -> List[Dict]:
+        """
+        get_file_info cho nhiều file song song.
+        
+        Returns:
+            List info dict, cùng thứ tự với file_names
+        """
+        if not file_names:
+            return []
+        return run_sync(self._gather_limited(self.get_file_info_async, file_names, concurrency))
+    
+    def delete_files_bulk(self, file_names: List[str], concurrency: int = BULK_REQUEST_CONCURRENCY) -> List[bool]:
+        """
+        delete_file cho nhiều file song song (cleanup).
+        
+        Returns:
+            List True/False, cùng thứ tự với file_names
+        """
+        if not file_names:
+            return []
+        return run_sync(self._gather_limited(self.delete_file_async, file_names, concurrency))
 
 
 # ============================================================
@@ -476,6 +1000,8 @@ def upload_video_to_gemini(video_path: str, api_key: str = None) -> Dict:
 # ============================================================
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("=" * 60)
     print("🧪 Gemini File Uploader Test")
     print("=" * 60)
@@ -0,0 +1,45 @@
+# backend/app/services/ingest/media_types.py
+"""
+Video MIME types - detect MIME từ extension và danh sách MIME được hỗ trợ
+(dùng chung cho ingest pipeline và Gemini uploader).
+"""
+
+import os
+import functools
+import mimetypes
+
+# Supported video MIME types
+SUPPORTED_VIDEO_MIMES = frozenset({
+    "video/mp4",
+    "video/mpeg",
+    "video/mov",
+    "video/avi",
+    "video/x-flv",
+    "video/mpg",
+    "video/webm",
+    "video/wmv",
+    "video/3gpp",
+    "video/quicktime",
+})
+
+
+# Default fallback for common video extensions (khi mimetypes không biết)
+_EXT_MIME = {
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".avi": "video/avi",
+    ".webm": "video/webm",
+    ".mkv": "video/x-matroska",
+    ".flv": "video/x-flv",
+    ".wmv": "video/x-ms-wmv",
+    ".3gp": "video/3gpp",
+}
+
+
+@functools.lru_cache(maxsize=512)
+def get_mime_type(video_path: str) -> str:
+    """Detect MIME type từ file extension (memoized per path)."""
+    mime_type, _ = mimetypes.guess_type(video_path)
+    if not mime_type:
+        mime_type = _EXT_MIME.get(os.path.splitext(video_path)[1].lower(), "video/mp4")
+    return mime_type
@@ -5,15 +5,176 @@ Re-encode video về format chuẩn (H.264 + AAC) khi cần
 """
 
 import os
+import asyncio
+import logging
 import subprocess
+import threading
+import wave
+import weakref
 from typing import Optional
 
+from app.core.async_utils import run_sync
 
-def normalize_video(input_path: str, force: bool = False) -> Optional[str]:
+logger = logging.getLogger(__name__)
+
+NORMALIZE_TIMEOUT_SECONDS = 300  # 5 phút / video
+
+# Số encode ffmpeg chạy song song (mỗi encode tự dùng nhiều thread với -threads 0)
+NORMALIZE_CONCURRENCY = max(1, (os.cpu_count() or 2) // 2)
+
+# Semaphore theo từng event loop (asyncio.Semaphore gắn với loop đầu tiên dùng nó,
+# mà wrapper sync tạo loop mới mỗi lần gọi)
+_NORMALIZE_SEMS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _normalize_sem() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    sem = _NORMALIZE_SEMS.get(loop)
+    if sem is None:
+        sem = _NORMALIZE_SEMS[loop] = asyncio.Semaphore(NORMALIZE_CONCURRENCY)
+    return sem
+
+
+# Encoder H.264: (codec, input args, encoder args)
+_LIBX264 = (
+    'libx264',
+    [],
+    ['-preset', 'veryfast', '-tune', 'fastdecode', '-crf', '23', '-threads', '0'],
+)
+
+
+_NVENC = (
+    'h264_nvenc',
+    ['-hwaccel', 'cuda', '-hwaccel_output_format', 'cuda'],
+    ['-preset', 'p4', '-rc', 'vbr', '-cq', '23'],
+)
+_QSV = ('h264_qsv', [], ['-preset', 'medium', '-global_quality', '23'])
+
+# Encoder đã chọn cho process này (None = chưa detect)
+_H264_ENCODER: Optional[tuple] = None
+
+
+def _encoder_works(codec: str) -> bool:
+    """
+    Encode thử 1 frame (nullsrc -> null): encoder có trong -encoders nhưng
+    máy không có GPU / driver thì lệnh này fail ngay.
+    """
+    try:
+        return subprocess.run(
+            ['ffmpeg', '-hide_banner', '-loglevel', 'error',
+             '-f', 'lavfi', '-i', 'nullsrc=s=256x256', '-frames:v', '1',
+             '-c:v', codec, '-f', 'null', '-'],
+            capture_output=True, timeout=15
+        ).returncode == 0
+    except Exception:
+        return False
+
+
+def _best_h264_encoder():
+    """
+    Chọn encoder H.264 nhanh nhất chạy được trên máy (detect 1 lần / process):
+    h264_nvenc (NVIDIA) > h264_qsv (Intel QuickSync) > libx264 (CPU).
+    Với NVENC, decode cũng chạy trên GPU (-hwaccel cuda) để tránh copy frame qua host.
+    """
+    global _H264_ENCODER
+    if _H264_ENCODER is not None:
+        return _H264_ENCODER
+    
+    try:
+        out = subprocess.run(
+            ['ffmpeg', '-hide_banner', '-encoders'],
+            capture_output=True, text=True, timeout=10
+        ).stdout
+    except Exception:
+        out = ''
+    
+    encoder = _LIBX264
+    for candidate in (_NVENC, _QSV):
+        if candidate[0] in out and _encoder_works(candidate[0]):
+            encoder = candidate
+            break
+    
+    _H264_ENCODER = encoder
+    logger.info("🎞️ [NORMALIZER] H.264 encoder: %s", encoder[0])
+    return encoder
+
+
+# Số lần encoder GPU lỗi liên tiếp (libx264 thì OK) trước khi chuyển hẳn sang libx264
+HW_ENCODER_MAX_FAILURES = 3
+_HW_FAILURES = 0
+_HW_FAILURES_LOCK = threading.Lock()
+
+
+def _record_hw_result(codec: str, ok: bool) -> None:
+    """
+    Theo dõi lỗi encoder GPU lúc chạy thật. Một lần lỗi có thể do input lạ
+    hoặc hết session NVENC tạm thời -> chỉ fallback cho video đó. Chuyển hẳn
+    sang libx264 cho các video sau khi probe 1 frame cũng fail, hoặc lỗi
+    HW_ENCODER_MAX_FAILURES lần liên tiếp.
+    """
+    global _H264_ENCODER, _HW_FAILURES
+    if ok:
+        with _HW_FAILURES_LOCK:
+            _HW_FAILURES = 0
+        return
+    
+    probe_ok = _encoder_works(codec)
+    with _HW_FAILURES_LOCK:
+        _HW_FAILURES += 1
+        if _H264_ENCODER is None or _H264_ENCODER[0] != codec:
+            return
+        if not probe_ok or _HW_FAILURES >= HW_ENCODER_MAX_FAILURES:
+            logger.warning("⚠️ [NORMALIZER] %s không ổn định, chuyển sang libx264", codec)
+            _H264_ENCODER = _LIBX264
+
+
+def _normalize_cmd(input_path: str, output_path: str, encoder) -> list:
+    """Build lệnh ffmpeg re-encode H.264 + AAC với encoder đã chọn."""
+    codec, input_args, encoder_args = encoder
+    # -c:a aac             : Audio codec AAC
+    # -b:a 128k            : Audio bitrate
+    # -movflags +faststart : Cho phép streaming
+    # -y                   : Overwrite output
+    return [
+        'ffmpeg',
+        '-hide_banner',
+        '-loglevel', 'error',
+        *input_args,
+        '-i', input_path,
+        '-c:v', codec,
+        *encoder_args,
+        '-c:a', 'aac',
+        '-b:a', '128k',
+        '-movflags', '+faststart',
+        '-y',
+        output_path
+    ]
+
+
+async def _run_ffmpeg(cmd: list):
+    """Chạy ffmpeg async. Returns (returncode, stderr bytes); returncode None = timeout."""
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.PIPE
+    )
+    try:
+        _, stderr = await asyncio.wait_for(proc.communicate(), timeout=NORMALIZE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        return None, b""
+    return proc.returncode, stderr
+
+
+async def normalize_video_async(input_path: str, force: bool = False) -> Optional[str]:
     """
     Re-encode video về format chuẩn: H.264 video + AAC audio.
     Đảm bảo tương thích với mọi player và công cụ xử lý.
     
+    ffmpeg chạy qua asyncio subprocess nên nhiều video có thể normalize
+    song song (giới hạn bởi NORMALIZE_CONCURRENCY) mà không block loop.
+    
     Args:
         input_path: Đường dẫn video gốc
         force: True = luôn normalize, False = chỉ normalize nếu cần
@@ -22,7 +183,7 @@ def normalize_video(input_path: str, force: bool = False) -> Optional[str]:
         Đường dẫn file mới nếu thành công, None nếu thất bại
     """
     if not os.path.exists(input_path):
-        print(f"   ❌ [NORMALIZER] File không tồn tại: {input_path}")
+        logger.error("❌ [NORMALIZER] File không tồn tại: %s", input_path)
         return None
     
     # Tạo tên file output
@@ -31,71 +192,146 @@ def normalize_video(input_path: str, force: bool = False) -> Optional[str]:
     
     # Nếu đã có file normalized, return luôn
     if os.path.exists(output_path) and not force:
-        print(f"   ✅ [NORMALIZER] File đã được normalize trước đó")
+        logger.info("✅ [NORMALIZER] File đã được normalize trước đó: %s", output_path)
         return output_path
     
-    print(f"   🔄 [NORMALIZER] Đang chuẩn hóa video...")
+    # libx264 : -preset veryfast -tune fastdecode -crf 23 -threads 0
+    # GPU     : h264_nvenc / h264_qsv nếu ffmpeg hỗ trợ (xem _best_h264_encoder)
+    encoder = _best_h264_encoder()
     
     try:
-        # FFmpeg command: Re-encode với H.264 + AAC
-        # -c:v libx264 : Video codec H.264
-        # -preset fast : Cân bằng giữa tốc độ và chất lượng
-        # -crf 23      : Chất lượng trung bình-tốt (18-28 range)
-        # -c:a aac     : Audio codec AAC
-        # -b:a 128k    : Audio bitrate
-        # -movflags +faststart : Cho phép streaming
-        # -y           : Overwrite output
-        
-        cmd = [
-            'ffmpeg',
-            '-i', input_path,
-            '-c:v', 'libx264',
-            '-preset', 'fast',
-            '-crf', '23',
-            '-c:a', 'aac',
-            '-b:a', '128k',
-            '-movflags', '+faststart',
-            '-y',
-            output_path
-        ]
+        async with _normalize_sem():
+            returncode, stderr = await _run_ffmpeg(_normalize_cmd(input_path, output_path, encoder))
+            
+            # Encoder GPU lỗi (input lạ, hết session, mất device) -> fallback CPU cho video này
+            if returncode not in (0, None) and encoder is not _LIBX264:
+                hw_codec = encoder[0]
+                logger.warning("⚠️ [NORMALIZER] %s lỗi, fallback libx264", hw_codec)
+                encoder = _LIBX264
+                returncode, stderr = await _run_ffmpeg(_normalize_cmd(input_path, output_path, encoder))
+                if returncode == 0:
+                    # Probe encoder GPU (blocking, ~1 frame) ngoài event loop
+                    await asyncio.get_running_loop().run_in_executor(None, _record_hw_result, hw_codec, False)
+            elif returncode == 0 and encoder is not _LIBX264:
+                _record_hw_result(encoder[0], True)
         
-        # Chạy FFmpeg (ẩn output)
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=300  # 5 phút timeout
-        )
+        if returncode is None:
+            logger.error("❌ [NORMALIZER] Timeout (> 5 phút): %s", input_path)
+            return None
         
-        if result.returncode != 0:
-            print(f"   ❌ [NORMALIZER] FFmpeg error: {result.stderr[-500:]}")  # Last 500 chars
+        if returncode != 0:
+            err = stderr.decode('utf-8', errors='replace')
+            logger.error("❌ [NORMALIZER] FFmpeg error: %s", err[-500:])  # Last 500 chars
             return None
         
         # Verify output file
         if os.path.exists(output_path) and os.path.getsize(output_path) > 1000:
-            print(f"   ✅ [NORMALIZER] Hoàn tất: {output_path}")
+            logger.info("✅ [NORMALIZER] Hoàn tất (%s): %s", encoder[0], output_path)
             return output_path
         else:
-            print(f"   ❌ [NORMALIZER] Output file quá nhỏ hoặc không tồn tại")
+            logger.error("❌ [NORMALIZER] Output file quá nhỏ hoặc không tồn tại: %s", output_path)
             return None
             
-    except subprocess.TimeoutExpired:
-        print(f"   ❌ [NORMALIZER] Timeout (> 5 phút)")
-        return None
     except FileNotFoundError:
-        print(f"   ❌ [NORMALIZER] FFmpeg không được cài đặt hoặc không có trong PATH")
+        logger.error("❌ [NORMALIZER] FFmpeg không được cài đặt hoặc không có trong PATH")
         return None
     except Exception as e:
-        print(f"   ❌ [NORMALIZER] Lỗi: {e}")
+        logger.error("❌ [NORMALIZER] Lỗi: %s", e)
         return None
 
 
+def normalize_video(input_path: str, force: bool = False) -> Optional[str]:
+    """
+    Bản sync của normalize_video_async (giữ API cũ cho pipeline).
+    """
+    return run_sync(normalize_video_async(input_path, force=force))
+
+
+# PCM cho STT: 16kHz mono s16le (stt.extract_audio_bytes dùng extract_audio_stream)
+AUDIO_SAMPLE_RATE = 16000
+AUDIO_CHANNELS = 1
+AUDIO_SAMPLE_WIDTH = 2  # bytes (s16le)
+AUDIO_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _audio_pcm_cmd(video_path: str) -> list:
+    return [
+        'ffmpeg',
+        '-hide_banner',
+        '-loglevel', 'error',
+        '-i', video_path,
+        '-vn',                          # No video
+        '-f', 's16le',                  # Raw PCM
+        '-ar', str(AUDIO_SAMPLE_RATE),  # 16kHz sample rate (tốt cho STT)
+        '-ac', str(AUDIO_CHANNELS),     # Mono
+        'pipe:1'
+    ]
+
+
+def extract_audio_stream(video_path: str) -> Optional[bytes]:
+    """
+    Trích xuất audio từ video thành PCM s16le 16kHz mono qua stdout pipe
+    (không ghi file WAV trung gian ra disk).
+    
+    Returns:
+        Bytes PCM, hoặc None nếu lỗi / video không có audio
+    """
+    if not os.path.exists(video_path):
+        return None
+    
+    try:
+        result = subprocess.run(
+            _audio_pcm_cmd(video_path),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=120
+        )
+        
+        if result.returncode == 0 and result.stdout:
+            return result.stdout
+        
+        # Kiểm tra nếu video không có audio
+        stderr = result.stderr.decode('utf-8', errors='replace')
+        if "does not contain any stream" in stderr or "Output file is empty" in stderr or not result.stdout:
+            logger.warning("⚠️ [NORMALIZER] Video không có audio track: %s", video_path)
+        return None
+        
+    except Exception as e:
+        logger.warning("⚠️ [NORMALIZER] Lỗi trích xuất audio: %s", e)
+        return None
+
+
+async def iter_audio_stream(video_path: str, chunk_size: int = AUDIO_STREAM_CHUNK_SIZE):
+    """
+    Bản async của extract_audio_stream cho file dài: yield PCM theo chunk
+    (mặc định 64 KiB) ngay khi ffmpeg decode xong, không giữ cả audio trong RAM.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *_audio_pcm_cmd(video_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL
+    )
+    try:
+        while True:
+            chunk = await proc.stdout.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+        await proc.wait()
+    finally:
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+
+
 def extract_audio_wav(video_path: str, output_path: str = None) -> Optional[str]:
     """
     Trích xuất audio từ video và convert sang WAV 16kHz mono.
     Chuẩn bị cho STT (Speech-to-Text).
     
+    Chỉ dùng khi caller thực sự cần file; STT lấy audio in-memory qua
+    stt.extract_audio_bytes (dựa trên extract_audio_stream).
+    
     Args:
         video_path: Đường dẫn video
         output_path: Đường dẫn WAV output (optional)
@@ -113,38 +349,20 @@ def extract_audio_wav(video_path: str, output_path: str = None) -> Optional[str]
     if os.path.exists(output_path):
         return output_path
     
-    try:
-        cmd = [
-            'ffmpeg',
-            '-i', video_path,
-            '-vn',              # No video
-            '-acodec', 'pcm_s16le',  # WAV format
-            '-ar', '16000',     # 16kHz sample rate (tốt cho STT)
-            '-ac', '1',         # Mono
-            '-y',
-            output_path
-        ]
-        
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.PIPE,
-            text=True,
-            timeout=120
-        )
-        
-        if result.returncode == 0 and os.path.exists(output_path):
-            return output_path
-        
-        # Kiểm tra nếu video không có audio
-        if "does not contain any stream" in result.stderr or "Output file is empty" in result.stderr:
-            print(f"   ⚠️ [NORMALIZER] Video không có audio track")
-            return None
-            
+    pcm = extract_audio_stream(video_path)
+    if not pcm:
         return None
+    
+    try:
+        with wave.open(output_path, 'wb') as wav:
+            wav.setnchannels(AUDIO_CHANNELS)
+            wav.setsampwidth(AUDIO_SAMPLE_WIDTH)
+            wav.setframerate(AUDIO_SAMPLE_RATE)
+            wav.writeframes(pcm)
+        return output_path
         
     except Exception as e:
-        print(f"   ⚠️ [NORMALIZER] Lỗi trích xuất audio: {e}")
+        logger.warning("⚠️ [NORMALIZER] Lỗi ghi WAV: %s", e)
         return None
 
 
@@ -164,6 +382,8 @@ def check_ffmpeg_installed() -> bool:
 
 # === TEST ===
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     print("🧪 Video Normalizer Test")
     print("=" * 50)
     
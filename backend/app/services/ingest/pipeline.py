@@ -0,0 +1,54 @@
+# backend/app/services/ingest/pipeline.py
+"""
+Ingest Pipeline - Phase 1: Tiếp nhận & Chuẩn hóa Video
+
+Gộp các bước kiểm tra file trước khi phân tích (stat + MIME + probe metadata
++ quyết định normalize) vào một lần gọi: file chỉ được stat một lần và
+header chỉ được probe một lần (PyAV/FFprobe, có cache).
+"""
+
+import os
+import logging
+from typing import Any, Dict, Tuple
+
+from app.services.ingest.media_types import SUPPORTED_VIDEO_MIMES, get_mime_type
+from app.services.ingest.validator import validate_video, should_normalize
+
+logger = logging.getLogger(__name__)
+
+
+def ingest_and_probe(video_path: str, scraper_metadata: Dict = None) -> Tuple[Dict[str, Any], bool, str]:
+    """
+    Validate video và quyết định có cần normalize hay không trong một pass.
+    
+    Args:
+        video_path: Đường dẫn tới file video
+        scraper_metadata: Metadata từ scraper JSON (optional, để cross-check)
+    
+    Returns:
+        (validation_result, needs_normalize, mime_type)
+        - validation_result: cùng format với validator.validate_video
+        - needs_normalize: True nếu codec/container cần re-encode
+        - mime_type: MIME detect từ extension
+    """
+    mime_type = get_mime_type(video_path)
+    
+    try:
+        st = os.stat(video_path)
+    except OSError:
+        # validate_video trả về kết quả file_not_found
+        return validate_video(video_path, scraper_metadata), False, mime_type
+    
+    validation = validate_video(video_path, scraper_metadata, st=st)
+    
+    # Container không nằm trong danh sách Gemini hỗ trợ -> re-encode về MP4
+    needs_normalize = should_normalize(validation) or (
+        validation["is_valid"] and mime_type not in SUPPORTED_VIDEO_MIMES
+    )
+    
+    logger.debug(
+        "🔍 [INGEST] %s: mime=%s, normalize=%s",
+        os.path.basename(video_path), mime_type, needs_normalize
+    )
+    
+    return validation, needs_normalize, mime_type
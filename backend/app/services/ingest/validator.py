@@ -7,58 +7,164 @@ Xử lý các edge cases: video quá ngắn/dài, không có audio, codec lỗi
 import os
 import subprocess
 import json
+import logging
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 
+try:
+    import av
+except ImportError:
+    av = None
+
+logger = logging.getLogger(__name__)
+
 # Cấu hình Validation
 MIN_DURATION = 3        # Video < 3s = low_confidence
 MAX_DURATION = 600      # Video > 10 phút = warning (vẫn xử lý)
-VALID_CODECS = ["h264", "hevc", "h265", "vp9", "av1", "mpeg4"]
+VALID_CODECS = frozenset({"h264", "hevc", "h265", "vp9", "av1", "mpeg4"})
+
+# LRU cache metadata theo (realpath, mtime_ns, size): file không đổi -> không probe lại
+META_CACHE_SIZE = 4096
+_META_CACHE: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_META_CACHE_LOCK = threading.Lock()
 
 
-def get_video_metadata(video_path: str) -> Optional[Dict[str, Any]]:
+def get_video_metadata(video_path: str, st: Optional[os.stat_result] = None) -> Optional[Dict[str, Any]]:
     """
-    Sử dụng FFprobe để trích xuất metadata từ video file.
+    Trích xuất metadata từ video file.
+    Dùng PyAV (đọc header trong process, không fork ffprobe) nếu có,
+    fallback về FFprobe khi PyAV không cài hoặc lỗi.
+    Kết quả được cache theo (path, mtime, size), nên gọi lại trên file
+    chưa đổi không tốn thêm lần probe nào.
+    
+    Args:
+        st: os.stat() của file nếu caller đã có (tránh stat lại)
     Returns: Dict chứa duration, fps, codec, has_audio, resolution
     """
-    if not os.path.exists(video_path):
-        return None
+    if st is None:
+        try:
+            st = os.stat(video_path)
+        except OSError:
+            return None
+    
+    key = (os.path.realpath(video_path), st.st_mtime_ns, st.st_size)
+    with _META_CACHE_LOCK:
+        cached = _META_CACHE.get(key)
+        if cached is not None:
+            _META_CACHE.move_to_end(key)
+            return dict(cached)
+    
+    metadata = None
+    if av is not None:
+        try:
+            metadata = _get_video_metadata_pyav(video_path)
+        except Exception as e:
+            logger.warning("⚠️ [VALIDATOR] PyAV probe failed, fallback FFprobe: %s", e)
     
+    if metadata is None:
+        metadata = _get_video_metadata_ffprobe(video_path)
+    
+    # Không cache lỗi (file có thể đang được ghi dở)
+    if metadata is not None:
+        with _META_CACHE_LOCK:
+            _META_CACHE[key] = dict(metadata)
+            _META_CACHE.move_to_end(key)
+            while len(_META_CACHE) > META_CACHE_SIZE:
+                _META_CACHE.popitem(last=False)
+    
+    return metadata
+
+
+def _get_video_metadata_pyav(video_path: str) -> Dict[str, Any]:
+    """Đọc metadata bằng PyAV (chỉ mở container header, không decode frame)."""
+    with av.open(video_path, metadata_errors='ignore') as container:
+        video_stream = next((s for s in container.streams if s.type == 'video'), None)
+        has_audio = any(s.type == 'audio' for s in container.streams)
+        
+        duration = container.duration / av.time_base if container.duration else 0.0
+        if duration == 0 and video_stream is not None and video_stream.duration and video_stream.time_base:
+            duration = float(video_stream.duration * video_stream.time_base)
+        
+        fps = 0
+        codec = 'unknown'
+        width = height = 0
+        if video_stream is not None:
+            if video_stream.average_rate:
+                fps = round(float(video_stream.average_rate), 2)
+            codec = video_stream.codec_context.name or 'unknown'
+            width = video_stream.codec_context.width or 0
+            height = video_stream.codec_context.height or 0
+        
+        return {
+            "duration": round(duration, 2),
+            "fps": fps,
+            "codec": codec,
+            "has_audio": has_audio,
+            "width": int(width),
+            "height": int(height),
+            "bitrate": int(container.bit_rate or 0),
+            "file_size": int(container.size or 0)
+        }
+
+
+# Chỉ lấy các field cần thiết, output compact "key=value|key=value" (mỗi section 1 dòng)
+_FFPROBE_ENTRIES = "stream=codec_type,codec_name,width,height,r_frame_rate,duration:format=duration,bit_rate,size"
+
+
+def _to_number(value: Optional[str], cast=float):
+    """Parse số từ output ffprobe ('N/A' / thiếu -> 0)."""
     try:
-        # FFprobe command để lấy thông tin video và audio streams
+        return cast(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _get_video_metadata_ffprobe(video_path: str) -> Optional[Dict[str, Any]]:
+    """Đọc metadata bằng subprocess FFprobe (output compact, không parse JSON)."""
+    try:
+        # FFprobe command: 1 dòng / stream + 1 dòng format
         cmd = [
             'ffprobe',
             '-v', 'quiet',
-            '-print_format', 'json',
-            '-show_format',
-            '-show_streams',
+            '-of', 'compact=p=0',
+            '-show_entries', _FFPROBE_ENTRIES,
             video_path
         ]
         
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
         
         if result.returncode != 0:
-            print(f"   ⚠️ [VALIDATOR] FFprobe error: {result.stderr}")
+            logger.warning("⚠️ [VALIDATOR] FFprobe error: %s", result.stderr)
             return None
         
-        data = json.loads(result.stdout)
-        
-        # Tìm video stream
+        # Tìm video stream / audio stream / format
         video_stream = None
         audio_stream = None
+        format_info = {}
         
-        for stream in data.get('streams', []):
-            if stream.get('codec_type') == 'video' and video_stream is None:
-                video_stream = stream
-            elif stream.get('codec_type') == 'audio' and audio_stream is None:
-                audio_stream = stream
+        for line in result.stdout.splitlines():
+            if not line:
+                continue
+            fields = dict(item.split('=', 1) for item in line.split('|') if '=' in item)
+            codec_type = fields.get('codec_type')
+            if codec_type == 'video' and video_stream is None:
+                video_stream = fields
+            elif codec_type == 'audio' and audio_stream is None:
+                audio_stream = fields
+            elif codec_type is None:
+                format_info = fields
+        
+        if video_stream is None and not format_info:
+            logger.warning("⚠️ [VALIDATOR] FFprobe output parse error")
+            return None
         
         # Trích xuất thông tin
-        format_info = data.get('format', {})
-        duration = float(format_info.get('duration', 0))
+        duration = _to_number(format_info.get('duration'))
         
         # Nếu duration từ format không có, thử lấy từ video stream
         if duration == 0 and video_stream:
-            duration = float(video_stream.get('duration', 0))
+            duration = _to_number(video_stream.get('duration'))
         
         # FPS calculation
         fps = 0
@@ -66,40 +172,42 @@ def get_video_metadata(video_path: str) -> Optional[Dict[str, Any]]:
             fps_str = video_stream.get('r_frame_rate', '0/1')
             if '/' in fps_str:
                 num, den = fps_str.split('/')
-                if int(den) > 0:
-                    fps = round(int(num) / int(den), 2)
+                if _to_number(den, int) > 0:
+                    fps = round(_to_number(num, int) / int(den), 2)
         
         metadata = {
             "duration": round(duration, 2),
             "fps": fps,
             "codec": video_stream.get('codec_name', 'unknown') if video_stream else 'unknown',
             "has_audio": audio_stream is not None,
-            "width": int(video_stream.get('width', 0)) if video_stream else 0,
-            "height": int(video_stream.get('height', 0)) if video_stream else 0,
-            "bitrate": int(format_info.get('bit_rate', 0)),
-            "file_size": int(format_info.get('size', 0))
+            "width": _to_number(video_stream.get('width'), int) if video_stream else 0,
+            "height": _to_number(video_stream.get('height'), int) if video_stream else 0,
+            "bitrate": _to_number(format_info.get('bit_rate'), int),
+            "file_size": _to_number(format_info.get('size'), int)
         }
         
         return metadata
         
     except subprocess.TimeoutExpired:
-        print(f"   ⚠️ [VALIDATOR] FFprobe timeout")
-        return None
-    except json.JSONDecodeError:
-        print(f"   ⚠️ [VALIDATOR] FFprobe output parse error")
+        logger.warning("⚠️ [VALIDATOR] FFprobe timeout")
         return None
     except Exception as e:
-        print(f"   ⚠️ [VALIDATOR] FFprobe error: {e}")
+        logger.warning("⚠️ [VALIDATOR] FFprobe error: %s", e)
         return None
 
 
-def validate_video(video_path: str, scraper_metadata: Dict = None) -> Dict[str, Any]:
+def validate_video(
+    video_path: str,
+    scraper_metadata: Dict = None,
+    st: Optional[os.stat_result] = None
+) -> Dict[str, Any]:
     """
     Validate video và trả về kết quả với confidence level.
     
     Args:
         video_path: Đường dẫn tới file video
         scraper_metadata: Metadata từ scraper JSON (optional, để cross-check)
+        st: os.stat() của file nếu caller đã có (bỏ qua check tồn tại)
     
     Returns:
         {
@@ -117,14 +225,14 @@ def validate_video(video_path: str, scraper_metadata: Dict = None) -> Dict[str,
     }
     
     # Kiểm tra file tồn tại
-    if not os.path.exists(video_path):
+    if st is None and not os.path.exists(video_path):
         result["is_valid"] = False
         result["confidence"] = "low"
         result["warnings"].append("file_not_found")
         return result
     
     # Lấy metadata từ FFprobe
-    metadata = get_video_metadata(video_path)
+    metadata = get_video_metadata(video_path, st=st)
     
     if metadata is None:
         # Thử dùng scraper metadata nếu FFprobe thất bại
@@ -157,21 +265,21 @@ def validate_video(video_path: str, scraper_metadata: Dict = None) -> Dict[str,
     if duration < MIN_DURATION:
         result["confidence"] = "low"
         result["warnings"].append("video_too_short")
-        print(f"   ⚠️ [VALIDATOR] Video quá ngắn: {duration}s < {MIN_DURATION}s")
+        logger.debug("⚠️ [VALIDATOR] Video quá ngắn: %ss < %ss", duration, MIN_DURATION)
     
     if duration > MAX_DURATION:
         # Vẫn valid nhưng cảnh báo
         if result["confidence"] == "high":
             result["confidence"] = "medium"
         result["warnings"].append("video_too_long")
-        print(f"   ⚠️ [VALIDATOR] Video dài: {duration}s > {MAX_DURATION}s (10 phút)")
+        logger.debug("⚠️ [VALIDATOR] Video dài: %ss > %ss (10 phút)", duration, MAX_DURATION)
     
     # 2. Check audio
     if not metadata.get("has_audio", True):
         if result["confidence"] == "high":
             result["confidence"] = "medium"
         result["warnings"].append("no_audio")
-        print(f"   ⚠️ [VALIDATOR] Video không có audio - sẽ bỏ qua STT")
+        logger.debug("⚠️ [VALIDATOR] Video không có audio - sẽ bỏ qua STT")
     
     # 3. Check codec
     codec = metadata.get("codec", "unknown").lower()
@@ -179,7 +287,7 @@ def validate_video(video_path: str, scraper_metadata: Dict = None) -> Dict[str,
         if result["confidence"] == "high":
             result["confidence"] = "medium"
         result["warnings"].append("unusual_codec")
-        print(f"   ⚠️ [VALIDATOR] Codec không phổ biến: {codec} - có thể cần normalize")
+        logger.debug("⚠️ [VALIDATOR] Codec không phổ biến: %s - có thể cần normalize", codec)
     
     # 4. Check resolution (sanity check)
     width = metadata.get("width", 0)
@@ -190,9 +298,11 @@ def validate_video(video_path: str, scraper_metadata: Dict = None) -> Dict[str,
         result["confidence"] = "low"
     
     # Tổng kết
-    print(f"   ✅ [VALIDATOR] Kết quả: valid={result['is_valid']}, confidence={result['confidence']}")
-    if result["warnings"]:
-        print(f"   ⚠️ [VALIDATOR] Warnings: {', '.join(result['warnings'])}")
+    # Một record cho cả lần validate (warnings chi tiết ở trên là DEBUG)
+    logger.info(
+        "✅ [VALIDATOR] Kết quả: valid=%s, confidence=%s, warnings=%s",
+        result["is_valid"], result["confidence"], ",".join(result["warnings"]) or "-"
+    )
     
     return result
 
@@ -211,6 +321,8 @@ def should_normalize(validation_result: Dict) -> bool:
 
 # === TEST ===
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     # Test với video mẫu
     test_path = r"E:\Tiktok_content_AI\scraper_data\content_files\tiktok_video_7296055437135252738.mp4"
     
@@ -1,7 +1,10 @@
 # backend/app/services/pipeline.py
 import time
 import traceback
+import queue
+import threading
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 import os
 import sys
 
@@ -12,36 +15,41 @@ if BACKEND_DIR not in sys.path:
 
 # New structure imports (Ingest -> Analysis -> Processing)
 from app.services.ingest.downloader import download_tiktok_full_data
-from app.services.ingest.validator import validate_video, should_normalize
+from app.services.ingest.pipeline import ingest_and_probe
 from app.services.ingest.normalizer import normalize_video
 from app.services.analysis.orchestrator import process_phase2 as process_analysis
 from app.services.processing.synthesizer import process_phase3 as process_core
 
 
-def process_tiktok(url: str):
+# Số video chờ tối đa giữa 2 stage trong batch (không tải trước quá xa)
+BATCH_STAGE_QUEUE_SIZE = 2
+
+
+def _ingest(url: str) -> Dict:
     """
-    Orchestrates the Professional Content Pipeline:
-    1. Ingest (Download, Validate, Normalize)
-    2. Analysis (Multimodal Processing)
-    3. Core (Content Synthesis & Reasoning)
+    STEP 1: Ingest (Download, Validate, Normalize).
+    
+    Returns context dict cho các stage sau:
+    {"url", "video_id", "video_info", "local_path", "error"}
+    (video_info None + error nếu thất bại)
     """
-    print(f"\n🎬 [PIPELINE] Started processing: {url}")
+    ctx = {"url": url, "video_id": None, "video_info": None, "local_path": None, "error": None}
     
-    # ==================================================================================
-    # STEP 1: INGEST LAYER
-    # ==================================================================================
     print(f"\n{'='*40}\n📍 STEP 1: INGEST & NORMALIZATION\n{'='*40}")
     
     try:
-        dl = download_tiktok_full_data(url)
+        # MP3 riêng không dùng trong pipeline (STT tự tách audio từ video)
+        dl = download_tiktok_full_data(url, extract_audio=False)
     except Exception as e:
         print(f"❌ [INGEST] Download error: {e}")
         traceback.print_exc()
-        return None, f"Download error: {str(e)}"
+        ctx["error"] = f"Download error: {str(e)}"
+        return ctx
     
     if not dl:
         print("❌ [INGEST] Download returned None")
-        return None, "Download failed"
+        ctx["error"] = "Download failed"
+        return ctx
 
     # Base Video Info
     video_info = dl["metadata"]
@@ -49,14 +57,12 @@ def process_tiktok(url: str):
     video_info["filename"] = dl["filename"]
     video_info["type"] = "video"
     video_info["processed_at"] = datetime.now()
-    
-
 
     local_path = dl["local_path"]
 
-    # Validation
+    # Validation (+ quyết định normalize, một lần probe)
     print("   🔍 [INGEST] Validating video...")
-    validation = validate_video(local_path)
+    validation, needs_normalize, _ = ingest_and_probe(local_path)
     video_info["validation"] = validation
     
     # Update metadata from validation if available
@@ -71,7 +77,7 @@ def process_tiktok(url: str):
             }
     
     # Normalization
-    if should_normalize(validation):
+    if needs_normalize:
         print("   🔄 [INGEST] Normalizing video...")
         normalized_path = normalize_video(local_path)
         if normalized_path:
@@ -79,29 +85,40 @@ def process_tiktok(url: str):
             video_info["normalized"] = True
             print("   ✅ [INGEST] Normalized successfully")
 
-    # ==================================================================================
-    # STEP 2: ANALYSIS LAYER
-    # ==================================================================================
+    ctx["video_id"] = video_info["video_id"]
+    ctx["video_info"] = video_info
+    ctx["local_path"] = local_path
+    return ctx
+
+
+def _analyze(ctx: Dict) -> Dict:
+    """STEP 2: Analysis (Multimodal Processing). Ghi ctx["analysis_output"]."""
     print(f"\n{'='*40}\n📍 STEP 2: MULTIMODAL ANALYSIS\n{'='*40}")
     
     # Validate strictly before Analysis
-    if not os.path.exists(local_path):
-         return None, "Video file not found after Ingest"
+    if not os.path.exists(ctx["local_path"]):
+        ctx["error"] = "Video file not found after Ingest"
+        return ctx
 
     # Call Analysis Orchestrator
-    analysis_output = process_analysis(local_path, video_info)
-    video_info["analysis_data"] = analysis_output
+    analysis_output = process_analysis(ctx["local_path"], ctx["video_info"])
+    ctx["video_info"]["analysis_data"] = analysis_output
+    ctx["analysis_output"] = analysis_output
     
     if not analysis_output["success"]:
         print(f"❌ [ANALYSIS] Failed: {analysis_output.get('error')}")
+    
+    return ctx
 
-    # ==================================================================================
-    # STEP 3: CORE LAYER (CONTENT)
-    # ==================================================================================
+
+def _synthesize(ctx: Dict) -> Tuple[Dict, str]:
+    """STEP 3: Core (Content Synthesis & Reasoning). Returns (video_info, "OK")."""
     print(f"\n{'='*40}\n📍 STEP 3: CONTENT SYNTHESIS\n{'='*40}")
     
+    video_info = ctx["video_info"]
+    
     # Call Core Synthesizer
-    core_output = process_core(analysis_output)
+    core_output = process_core(ctx["analysis_output"])
     video_info["core_data"] = core_output
     
     # Flatten key fields
@@ -111,3 +128,97 @@ def process_tiktok(url: str):
 
     # Return pure data
     return video_info, "OK"
+
+
+def process_tiktok(url: str):
+    """
+    Orchestrates the Professional Content Pipeline:
+    1. Ingest (Download, Validate, Normalize)
+    2. Analysis (Multimodal Processing)
+    3. Core (Content Synthesis & Reasoning)
+    """
+    print(f"\n🎬 [PIPELINE] Started processing: {url}")
+    
+    ctx = _ingest(url)
+    if ctx["error"]:
+        return None, ctx["error"]
+    
+    ctx = _analyze(ctx)
+    if ctx["error"]:
+        return None, ctx["error"]
+    
+    return _synthesize(ctx)
+
+
+def process_tiktok_batch(urls: List[str]) -> List[Tuple[Optional[Dict], str]]:
+    """
+    Chạy pipeline cho nhiều URL, 3 stage chồng lên nhau (producer/consumer):
+    trong lúc video N đang Analysis, video N+1 đã được tải và video N-1
+    đang Synthesis. Mỗi stage có 1 worker thread, nối nhau bằng queue.
+    
+    Wall time ~ tổng của stage chậm nhất thay vì tổng cả 3 stage.
+    
+    Returns:
+        List (video_info, "OK") hoặc (None, error), cùng thứ tự với urls
+    """
+    results: List[Tuple[Optional[Dict], str]] = [(None, "Not processed")] * len(urls)
+    if not urls:
+        return results
+    
+    print(f"\n🎬 [PIPELINE] Batch: {len(urls)} URLs (ingest | analysis | synthesis overlapped)")
+    
+    analyze_queue: "queue.Queue" = queue.Queue(maxsize=BATCH_STAGE_QUEUE_SIZE)
+    synth_queue: "queue.Queue" = queue.Queue(maxsize=BATCH_STAGE_QUEUE_SIZE)
+    
+    def ingest_worker():
+        try:
+            for index, url in enumerate(urls):
+                try:
+                    ctx = _ingest(url)
+                except Exception as e:
+                    traceback.print_exc()
+                    ctx = {"url": url, "video_id": None, "error": f"Ingest error: {str(e)}"}
+                if ctx["error"]:
+                    results[index] = (None, ctx["error"])
+                else:
+                    analyze_queue.put((index, ctx))
+        finally:
+            analyze_queue.put(None)
+    
+    def analyze_worker():
+        try:
+            while (item := analyze_queue.get()) is not None:
+                index, ctx = item
+                try:
+                    ctx = _analyze(ctx)
+                except Exception as e:
+                    traceback.print_exc()
+                    ctx["error"] = f"Analysis error: {str(e)}"
+                if ctx["error"]:
+                    results[index] = (None, ctx["error"])
+                else:
+                    synth_queue.put((index, ctx))
+        finally:
+            synth_queue.put(None)
+    
+    def synth_worker():
+        while (item := synth_queue.get()) is not None:
+            index, ctx = item
+            try:
+                results[index] = _synthesize(ctx)
+            except Exception as e:
+                traceback.print_exc()
+                results[index] = (None, f"Synthesis error: {str(e)}")
+    
+    workers = [
+        threading.Thread(target=target, name=f"pipeline-{name}", daemon=True)
+        for name, target in (("ingest", ingest_worker), ("analysis", analyze_worker), ("synthesis", synth_worker))
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    ok = sum(1 for _, status in results if status == "OK")
+    print(f"\n✅ [PIPELINE] Batch complete: {ok}/{len(urls)} OK")
+    return results
@@ -69,7 +69,9 @@ def align_content_to_timeline(
             "duration": item.get("duration", item.get("end_time", 0) - item.get("start_time", 0)),
             "stt_text": stt_text,
             "ocr_text": ocr_text,
-            "stt_segments": item.get("stt_segments", []),
+            "stt_starts": item.get("stt_starts", []),
+            "stt_ends": item.get("stt_ends", []),
+            "stt_texts": item.get("stt_texts", []),
             "ocr_items": item.get("ocr_items", []),
             "source": source,
             "has_stt": has_stt,
@@ -217,7 +219,9 @@ if __name__ == "__main__":
             "duration": 5.0,
             "stt_text": "Xin chào các bạn.",
             "ocr_text": "Bước 1: Chuẩn bị",
-            "stt_segments": [],
+            "stt_starts": [],
+            "stt_ends": [],
+            "stt_texts": [],
             "ocr_items": []
         },
         {
@@ -227,7 +231,9 @@ if __name__ == "__main__":
             "duration": 7.0,
             "stt_text": "Hôm nay mình sẽ hướng dẫn.",
             "ocr_text": "",
-            "stt_segments": [],
+            "stt_starts": [],
+            "stt_ends": [],
+            "stt_texts": [],
             "ocr_items": []
         },
         {
@@ -237,7 +243,9 @@ if __name__ == "__main__":
             "duration": 8.0,
             "stt_text": "",
             "ocr_text": "Bước 2: Thực hiện",
-            "stt_segments": [],
+            "stt_starts": [],
+            "stt_ends": [],
+            "stt_texts": [],
             "ocr_items": []
         }
     ]
@@ -66,10 +66,33 @@ def compile_patterns(patterns: List[str]) -> List[re.Pattern]:
     return [re.compile(p, re.IGNORECASE) for p in patterns]
 
 
-FILLER_REGEX = compile_patterns(FILLER_VI + FILLER_EN)
-NOISE_REGEX = compile_patterns(NOISE_PATTERNS)
-WATERMARK_REGEX = compile_patterns(WATERMARK_PATTERNS)
-MEANINGLESS_REGEX = compile_patterns(MEANINGLESS_PATTERNS)
+def compile_union(patterns: List[str]) -> re.Pattern:
+    """
+    Compile all patterns into one case-insensitive alternation, so a single
+    sub()/finditer() pass replaces one full-string scan per pattern.
+    """
+    return re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE)
+
+
+FILLER_UNION = compile_union(FILLER_VI + FILLER_EN)
+NOISE_UNION = compile_union(NOISE_PATTERNS)
+WATERMARK_UNION = compile_union(WATERMARK_PATTERNS)
+MEANINGLESS_UNION = compile_union(MEANINGLESS_PATTERNS)
+
+def sub_until_stable(pattern: re.Pattern, text: str) -> str:
+    """
+    Remove all matches of a union pattern. Removing one match can expose
+    another ("cũng à là" -> "cũng là"), which the old one-regex-at-a-time
+    loop partly caught, so repeat until nothing matches (usually 1-2 passes).
+    """
+    result, count = pattern.subn('', text)
+    while count:
+        result, count = pattern.subn('', result)
+    return result
+
+
+_WS = re.compile(r'\s+')
+_BLANK_LINES = re.compile(r'\n\s*\n')
 
 
 # ============================================================
@@ -81,13 +104,10 @@ def remove_fillers(text: str) -> str:
     if not text:
         return ""
     
-    result = text
-    for pattern in FILLER_REGEX:
-        result = pattern.sub('', result)
+    result = sub_until_stable(FILLER_UNION, text)
     
     # Clean up extra spaces
-    result = re.sub(r'\s+', ' ', result).strip()
-    return result
+    return _WS.sub(' ', result).strip()
 
 
 def remove_noise(text: str) -> str:
@@ -103,23 +123,16 @@ def remove_noise(text: str) -> str:
         if not line:
             continue
         
-        # Check if entire line is noise
-        is_noise = False
-        line_lower = line.lower()
-        
-        for pattern in NOISE_REGEX:
-            if pattern.search(line_lower):
-                # If noise is > 50% of line, skip it
-                match = pattern.search(line_lower)
-                if match and len(match.group()) > len(line) * 0.5:
-                    is_noise = True
-                    break
+        # Check if entire line is noise: one noise match > 50% of line -> skip it
+        threshold = len(line) * 0.5
+        is_noise = any(
+            match.end() - match.start() > threshold
+            for match in NOISE_UNION.finditer(line.lower())
+        )
         
         if not is_noise:
             # Remove inline noise
-            for pattern in NOISE_REGEX:
-                line = pattern.sub('', line)
-            line = line.strip()
+            line = sub_until_stable(NOISE_UNION, line).strip()
             if line:
                 clean_lines.append(line)
     
@@ -131,11 +144,9 @@ def remove_watermarks(text: str) -> str:
     if not text:
         return ""
     
-    result = text
-    for pattern in WATERMARK_REGEX:
-        result = pattern.sub('', result)
+    result = sub_until_stable(WATERMARK_UNION, text)
     
-    return re.sub(r'\s+', ' ', result).strip()
+    return _WS.sub(' ', result).strip()
 
 
 def remove_meaningless(text: str) -> str:
@@ -151,19 +162,11 @@ def remove_meaningless(text: str) -> str:
         if not line:
             continue
         
-        # Check if line is meaningless
-        is_meaningless = False
-        for pattern in MEANINGLESS_REGEX:
-            if pattern.match(line):
-                is_meaningless = True
-                break
-        
-        # Also skip very short lines (< 3 chars)
-        if len(line) < 3:
-            is_meaningless = True
+        # Check if line is meaningless (also skip very short lines < 3 chars)
+        if len(line) < 3 or MEANINGLESS_UNION.match(line):
+            continue
         
-        if not is_meaningless:
-            clean_lines.append(line)
+        clean_lines.append(line)
     
     return '\n'.join(clean_lines)
 
@@ -191,8 +194,8 @@ def clean_content(text: str) -> str:
     result = remove_meaningless(result)
     
     # Final cleanup
-    result = re.sub(r'\n\s*\n', '\n', result)  # Remove empty lines
-    result = re.sub(r'\s+', ' ', result.replace('\n', ' [SEP] ')).strip()
+    result = _BLANK_LINES.sub('\n', result)  # Remove empty lines
+    result = _WS.sub(' ', result.replace('\n', ' [SEP] ')).strip()
     result = result.replace(' [SEP] ', '\n')
     
     return result
@@ -10,6 +10,7 @@ Features:
 """
 
 import re
+from collections import Counter
 from typing import Dict, List, Tuple, Optional
 from difflib import SequenceMatcher
 
@@ -28,6 +29,39 @@ def normalize_for_comparison(text: str) -> str:
     return text.strip()
 
 
+# Below this length (normalized chars) character-level SequenceMatcher is
+# cheap and more informative than word overlap (OCR fragments, short captions)
+SHORT_TEXT_CHARS = 40
+
+
+def _tokenize(text: str) -> List[str]:
+    """Normalized word tokens, shared by similarity and keyword matching"""
+    return normalize_for_comparison(text).split()
+
+
+def _similarity_from_tokens(tokens1: List[str], tokens2: List[str]) -> float:
+    """
+    Word-multiset Dice coefficient: 2 * |common words| / (|words1| + |words2|).
+    Same 2M/T form as SequenceMatcher.ratio() but order-free and O(N+M).
+    """
+    if not tokens1 or not tokens2:
+        return 0.0
+    
+    norm1 = " ".join(tokens1)
+    norm2 = " ".join(tokens2)
+    if len(norm1) < SHORT_TEXT_CHARS or len(norm2) < SHORT_TEXT_CHARS:
+        return round(SequenceMatcher(None, norm1, norm2).ratio(), 3)
+    
+    common = sum((Counter(tokens1) & Counter(tokens2)).values())
+    return round(2 * common / (len(tokens1) + len(tokens2)), 3)
+
+
+def _common_keywords_from_tokens(tokens1: List[str], tokens2: List[str], min_word_len: int = 3) -> List[str]:
+    words1 = {w for w in tokens1 if len(w) >= min_word_len}
+    words2 = {w for w in tokens2 if len(w) >= min_word_len}
+    return list(words1 & words2)
+
+
 def calculate_text_similarity(text1: str, text2: str) -> float:
     """
     Calculate similarity between two texts.
@@ -36,16 +70,7 @@ def calculate_text_similarity(text1: str, text2: str) -> float:
     if not text1 or not text2:
         return 0.0
     
-    norm1 = normalize_for_comparison(text1)
-    norm2 = normalize_for_comparison(text2)
-    
-    if not norm1 or not norm2:
-        return 0.0
-    
-    # Use SequenceMatcher for similarity
-    similarity = SequenceMatcher(None, norm1, norm2).ratio()
-    
-    return round(similarity, 3)
+    return _similarity_from_tokens(_tokenize(text1), _tokenize(text2))
 
 
 def find_common_keywords(text1: str, text2: str, min_word_len: int = 3) -> List[str]:
@@ -53,11 +78,7 @@ def find_common_keywords(text1: str, text2: str, min_word_len: int = 3) -> List[
     if not text1 or not text2:
         return []
     
-    words1 = set(w.lower() for w in text1.split() if len(w) >= min_word_len)
-    words2 = set(w.lower() for w in text2.split() if len(w) >= min_word_len)
-    
-    common = words1 & words2
-    return list(common)
+    return _common_keywords_from_tokens(_tokenize(text1), _tokenize(text2), min_word_len)
 
 
 # ============================================================
@@ -112,8 +133,10 @@ def compare_stt_ocr(stt_text: str, ocr_text: str) -> Dict:
         }
     
     # Calculate similarity
-    similarity = calculate_text_similarity(stt_text, ocr_text)
-    common_keywords = find_common_keywords(stt_text, ocr_text)
+    stt_tokens = _tokenize(stt_text)
+    ocr_tokens = _tokenize(ocr_text)
+    similarity = _similarity_from_tokens(stt_tokens, ocr_tokens)
+    common_keywords = _common_keywords_from_tokens(stt_tokens, ocr_tokens)
     
     # Determine relation
     if similarity >= 0.6:
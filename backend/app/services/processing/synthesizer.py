@@ -293,7 +293,9 @@ if __name__ == "__main__":
                 "duration": 5.0,
                 "stt_text": "Xin chào các bạn, ừm, hôm nay mình sẽ hướng dẫn.",
                 "ocr_text": "Hướng dẫn nấu ăn",
-                "stt_segments": [],
+                "stt_starts": [],
+                "stt_ends": [],
+                "stt_texts": [],
                 "ocr_items": []
             },
             {
@@ -303,7 +305,9 @@ if __name__ == "__main__":
                 "duration": 7.0,
                 "stt_text": "Bước 1 là chuẩn bị nguyên liệu cần thiết.",
                 "ocr_text": "Bước 1: Chuẩn bị",
-                "stt_segments": [],
+                "stt_starts": [],
+                "stt_ends": [],
+                "stt_texts": [],
                 "ocr_items": []
             },
             {
@@ -313,7 +317,9 @@ if __name__ == "__main__":
                 "duration": 8.0,
                 "stt_text": "Like và subscribe nhé!",
                 "ocr_text": "@user123 #cooking",
-                "stt_segments": [],
+                "stt_starts": [],
+                "stt_ends": [],
+                "stt_texts": [],
                 "ocr_items": []
             }
         ],